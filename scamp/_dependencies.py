@@ -75,6 +75,12 @@ except ImportError:
     rtmidi = None
     logging.warning("python-rtmidi was not found; streaming midi input / output will not be available.")
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+    logging.warning("numpy was not found; quantization will fall back to slower, pure-python routines.")
+
 
 # On Mac and Windows, try to add LilyPond to PATH, if it is installed, so that abjad can just work.
 # This is hardly fool-proof, but should work if the user just installed LilyPond in the standard way
@@ -0,0 +1,702 @@
+"""
+Lightweight objects for writing out LilyPond code directly, without going through abjad. The classes here mirror the
+small subset of abjad's component model that the score module makes use of (notes, chords, rests, skips, tuplets,
+containers and contexts), and format themselves exactly as abjad would, so that the LilyPond code produced by
+:func:`~scamp.score.ScoreComponent.to_lilypond` is the same whichever path generates it. It also handles compiling
+finished LilyPond files with the LilyPond executable (see :func:`render_lilypond_files`), several at a time and with
+the results optionally cached on disk.
+"""
+
+from abc import ABC, abstractmethod
+from fractions import Fraction
+from multiprocessing.pool import ThreadPool
+import functools
+import glob
+import hashlib
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+from typing import Sequence, Tuple, List
+
+
+class LilyPondFormattingError(ValueError):
+    """
+    Raised when something cannot be written out by this module (e.g. a duration that is not expressible as a single
+    note value). The score module responds by falling back to the abjad-based conversion.
+    """
+    pass
+
+
+class LilyPondRenderingError(RuntimeError):
+    """
+    Raised when the LilyPond executable cannot be found, or fails to compile a file.
+    """
+    pass
+
+
+_INDENT = "    "
+
+_step_numbers = {"c": 0, "d": 1, "e": 2, "f": 3, "g": 4, "a": 5, "b": 6}
+
+_alteration_suffixes = {
+    0: "", 0.5: "qs", 1: "s", 1.5: "tqs", 2: "ss",
+    -0.5: "qf", -1: "f", -1.5: "tqf", -2: "ff",
+}
+
+_text_span_start_template = "\n".join([
+    r"- \tweak bound-details.left.text \markup {{",
+    r"    \concat",
+    r"        {{",
+    r"            {}",
+    r"            \hspace",
+    r"                #0.5",
+    r"        }}",
+    r"    }}",
+    r"\startTextSpan",
+])
+
+
+##################################################################################################################
+#                                             Formatting Utilities
+##################################################################################################################
+
+
+def _is_power_of_two(n: int) -> bool:
+    return n > 0 and n & (n - 1) == 0
+
+
+def format_duration(duration) -> str:
+    """
+    Formats a duration (in whole notes) as a LilyPond duration string, e.g. "4." for a dotted quarter.
+
+    :param duration: the duration, as a Fraction of a whole note
+    :raises LilyPondFormattingError: if the duration cannot be written as a single (possibly dotted) note value
+    """
+    duration = Fraction(duration)
+    numerator, denominator = duration.numerator, duration.denominator
+    odd_part = numerator
+    while odd_part % 2 == 0:
+        odd_part //= 2
+    if not 0 < duration < 16 or not _is_power_of_two(denominator) or not _is_power_of_two(odd_part + 1):
+        raise LilyPondFormattingError("Duration {} is not assignable to a single note value.".format(duration))
+    num_dots = bin(numerator).count("1") - 1
+    undotted_length = Fraction(2 ** (numerator.bit_length() - 1), denominator)
+    if undotted_length == 8:
+        undotted_string = r"\maxima"
+    elif undotted_length == 4:
+        undotted_string = r"\longa"
+    elif undotted_length == 2:
+        undotted_string = r"\breve"
+    else:
+        undotted_string = str(undotted_length.denominator)
+    return undotted_string + "." * num_dots
+
+
+def format_scheme_string(value, force_quotes: bool = False) -> str:
+    """
+    Formats a string as a Scheme value (including the leading "#"), quoting it where necessary.
+    """
+    if value is None:
+        string = "#f"
+    else:
+        string = str(value).replace('"', r'\"')
+        if not string.startswith(("#", "\\")) and (force_quotes or " " in string or "#" in string):
+            string = '"{}"'.format(string)
+    return string if string.startswith("#") and string not in ("#t", "#f") else "#" + string
+
+
+def format_markup(text: str) -> str:
+    """
+    Formats a plain text string as a one-line LilyPond markup.
+
+    :raises LilyPondFormattingError: if the text contains characters that would need to be parsed as LilyPond
+    """
+    if any(c in text for c in '\\#{}"') or len(text.split()) == 0:
+        raise LilyPondFormattingError("Cannot write \"{}\" as a simple markup.".format(text))
+    words = text.split()
+    return r"\markup {{ {} }}".format(words[0] if len(words) == 1 else '"{}"'.format(" ".join(words)))
+
+
+def _indent_lines(strings: Sequence[str]) -> list:
+    return ["" if string.isspace() else _INDENT + string for string in strings]
+
+
+def _join_lines(pieces: Sequence[str]) -> str:
+    # like abjad, we blank out any lines consisting only of whitespace
+    return "\n".join("" if line.isspace() else line for line in "\n".join(pieces).split("\n"))
+
+
+@functools.lru_cache(1)
+def get_lilypond_version_string() -> str:
+    """
+    The version of the installed LilyPond (as reported by "lilypond --version"), or an empty string if LilyPond
+    cannot be found. This is looked up on first use and then remembered.
+    """
+    lilypond = shutil.which("lilypond") or "lilypond"
+    try:
+        output = subprocess.run([lilypond, "--version"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL).stdout
+    except OSError:
+        return ""
+    first_line = output.decode().split("\n")[0] + "\n" if len(output) > 0 else ""
+    return first_line.split(" ")[-1].strip()
+
+
+##################################################################################################################
+#                                                  Leaves
+##################################################################################################################
+
+
+class NoteHead:
+
+    """
+    A single pitched note head, as used in a Note or a Chord.
+
+    :param name: the letter name of the pitch (e.g. "c")
+    :param octave: the octave, with 4 being the octave starting at middle C
+    :param alteration: the alteration in semitones (multiples of 0.5 between -2 and 2)
+    :param style: a note head style to apply with a tweak, or None for a normal note head
+    """
+
+    __slots__ = ("pitch", "sort_key", "style")
+
+    def __init__(self, name: str, octave: int, alteration: float, style: str = None):
+        if alteration not in _alteration_suffixes:
+            raise LilyPondFormattingError("Cannot write alteration of {} semitones.".format(alteration))
+        octave_ticks = "'" * (octave - 3) if octave > 3 else "," * (3 - octave)
+        self.pitch = name + _alteration_suffixes[alteration] + octave_ticks
+        self.sort_key = (octave * 7 + _step_numbers[name], alteration)
+        self.style = style
+
+    def format(self) -> str:
+        if self.style is None:
+            return self.pitch
+        return "\\tweak style {}\n{}".format("#'" + self.style if " " not in self.style
+                                             else format_scheme_string(self.style), self.pitch)
+
+
+class Leaf(ABC):
+
+    """
+    Base class for all of the leaves. Indicators are not attached as objects, as they are in abjad; instead each leaf
+    keeps lists of the pre-formatted strings that go in each of the different format slots.
+
+    :param duration: written duration in whole notes
+    :param multiplier: optional duration multiplier (formatted after the duration, e.g. "R1 * 5/8")
+    """
+
+    def __init__(self, duration, multiplier=None):
+        self.duration = Fraction(duration)
+        self.multiplier = multiplier
+        self.before_comments = []
+        self.opening_indicators = []
+        self.opening_commands = []
+        self.articulations = []
+        self.spanner_stops = []
+        self.spanner_starts = []
+        self.after_commands = []
+        self.after_grace_container = None
+        self._formatted_duration = format_duration(self.duration) + \
+            (" * {}".format(multiplier) if multiplier is not None else "")
+
+    def total_duration(self) -> Fraction:
+        return self.duration * (self.multiplier if self.multiplier is not None else 1)
+
+    @abstractmethod
+    def _format_body(self) -> str:
+        """The leaf itself (e.g. "c'4" or "r8"), without any indicators."""
+        pass
+
+    def format_pieces(self) -> list:
+        pieces = list(self.before_comments)
+        pieces.extend(self.opening_indicators)
+        pieces.extend(self.opening_commands)
+        if self.after_grace_container is not None:
+            pieces.append(r"\afterGrace")
+        pieces.append(self._format_body())
+        pieces.extend(self.articulations)
+        pieces.extend(self.spanner_stops)
+        pieces.extend(self.spanner_starts)
+        pieces.extend(self.after_commands)
+        if self.after_grace_container is not None:
+            pieces.append(self.after_grace_container.format())
+        return "\n".join(pieces).split("\n")
+
+    def format(self) -> str:
+        return _join_lines(self.format_pieces())
+
+    def add_articulation(self, articulation: str) -> None:
+        self.articulations.append("- \\" + articulation)
+
+    def add_tie(self) -> None:
+        self.spanner_starts.append("~")
+
+    def start_slur(self) -> None:
+        self.spanner_starts.append("(")
+
+    def stop_slur(self) -> None:
+        self.spanner_stops.append(")")
+
+    def start_text_span(self, text: str) -> None:
+        self.spanner_starts.append(_text_span_start_template.format(text))
+
+    def stop_text_span(self) -> None:
+        self.spanner_stops.append(r"\stopTextSpan")
+
+    def add_metronome_mark(self, beat_duration, units_per_minute: int, textual_indication: str = None) -> None:
+        self.opening_indicators.append(r"\tempo {}{}={}".format(
+            "" if textual_indication is None else '"{}" '.format(textual_indication),
+            format_duration(beat_duration), units_per_minute
+        ))
+
+
+class Note(Leaf):
+
+    """A single note, with a NoteHead."""
+
+    def __init__(self, note_head: NoteHead, duration):
+        super().__init__(duration)
+        self.note_head = note_head
+
+    def pitch_key(self):
+        return self.note_head.pitch
+
+    def _format_body(self) -> str:
+        return self.note_head.format() + self._formatted_duration
+
+
+class Chord(Leaf):
+
+    """A chord, whose note heads are kept sorted from low to high, as in abjad."""
+
+    def __init__(self, note_heads: Sequence[NoteHead], duration):
+        super().__init__(duration)
+        self.note_heads = sorted(note_heads, key=lambda note_head: note_head.sort_key)
+
+    def pitch_key(self):
+        return tuple(note_head.pitch for note_head in self.note_heads)
+
+    def _format_body(self) -> str:
+        if any(note_head.style is not None for note_head in self.note_heads):
+            lines = ["<"]
+            for note_head in self.note_heads:
+                lines.extend(_INDENT + line for line in note_head.format().split("\n"))
+            return "\n".join(lines) + "\n>" + self._formatted_duration
+        return "<{}>{}".format(" ".join(note_head.pitch for note_head in self.note_heads), self._formatted_duration)
+
+
+class Rest(Leaf):
+
+    def _format_body(self) -> str:
+        return "r" + self._formatted_duration
+
+
+class MultimeasureRest(Leaf):
+
+    def _format_body(self) -> str:
+        return "R" + self._formatted_duration
+
+
+class Skip(Leaf):
+
+    def _format_body(self) -> str:
+        return "s" + self._formatted_duration
+
+
+##################################################################################################################
+#                                                Containers
+##################################################################################################################
+
+
+class Container:
+
+    """
+    A sequential or simultaneous container of leaves and/or other containers.
+
+    :param contents: the contained components
+    :param simultaneous: if True, formats as a simultaneous music expression (<< >>) rather than a sequential one
+    """
+
+    def __init__(self, contents=None, simultaneous: bool = False):
+        self.contents = list(contents) if contents is not None else []
+        self.simultaneous = simultaneous
+        self.opening_commands = []
+
+    def append(self, component) -> None:
+        self.contents.append(component)
+
+    def __iter__(self):
+        return iter(self.contents)
+
+    def leaves(self):
+        """Iterates through the leaves in this container, not including after-grace notes."""
+        for component in self.contents:
+            if isinstance(component, Leaf):
+                yield component
+            else:
+                yield from component.leaves()
+
+    def _format_open_brackets(self) -> list:
+        return ["<<" if self.simultaneous else "{"]
+
+    def _format_close_brackets(self) -> list:
+        return [">>" if self.simultaneous else "}"]
+
+    def _format_opening(self) -> list:
+        return _indent_lines(self.opening_commands)
+
+    def format_pieces(self) -> list:
+        pieces = self._format_open_brackets()
+        pieces.extend(self._format_opening())
+        for component in self.contents:
+            pieces.extend(_indent_lines(component.format().split("\n")))
+        pieces.extend(self._format_close_brackets())
+        return pieces
+
+    def format(self) -> str:
+        return _join_lines(self.format_pieces())
+
+
+class Tuplet(Container):
+
+    """
+    A tuplet, scaling its contents by the given multiplier.
+
+    :param multiplier: Fraction by which the written durations of the contents are multiplied (e.g. 2/3 for a triplet)
+    :param contents: the contained leaves
+    """
+
+    def __init__(self, multiplier: Fraction, contents=None):
+        super().__init__(contents)
+        self.multiplier = Fraction(multiplier)
+
+    def _format_open_brackets(self) -> list:
+        pieces = []
+        if self.multiplier > 1 or not _is_power_of_two(self.multiplier.numerator) or self.multiplier.denominator == 1:
+            pieces.append(r"\tweak text #tuplet-number::calc-fraction-text")
+        if not _is_power_of_two((self.multiplier * sum(leaf.total_duration() for leaf in self.contents)).denominator):
+            pieces.append(r"\tweak edge-height #'(0.7 . 0)")
+        pieces.append(r"\times {}/{} {{".format(self.multiplier.numerator, self.multiplier.denominator))
+        return pieces
+
+    def _format_close_brackets(self) -> list:
+        return ["}"]
+
+
+class Context(Container):
+
+    """
+    A named (or anonymous) LilyPond context, such as a Voice, Staff, StaffGroup or Score.
+
+    :param lilypond_type: the type of context, e.g. "Staff"
+    :param contents: the contained components
+    :param name: name of the context; if None, it is created anonymously with \\new
+    :param simultaneous: whether the contents are simultaneous
+    :param instrument_name: if given, sets the instrumentName property in a \\with block
+    """
+
+    def __init__(self, lilypond_type: str, contents=None, name: str = None, simultaneous: bool = False,
+                 instrument_name=False):
+        super().__init__(contents, simultaneous)
+        self.lilypond_type = lilypond_type
+        self.name = name
+        self.instrument_name = instrument_name
+
+    def _format_invocation(self) -> str:
+        if self.name is not None:
+            return r'\context {} = "{}"'.format(self.lilypond_type, self.name)
+        return r"\new {}".format(self.lilypond_type)
+
+    def _format_open_brackets(self) -> list:
+        open_bracket = super()._format_open_brackets()[0]
+        if self.instrument_name is False:
+            return [self._format_invocation(), open_bracket]
+        return [self._format_invocation(), r"\with", "{",
+                _INDENT + "instrumentName = " + format_scheme_string(self.instrument_name, force_quotes=True),
+                "}", open_bracket]
+
+
+class Voice(Context):
+
+    def __init__(self, contents=None, name: str = None):
+        super().__init__("Voice", contents, name=name)
+
+
+class Staff(Context):
+
+    def __init__(self, contents=None, name: str = None, instrument_name=False):
+        super().__init__("Staff", contents, name=name, instrument_name=instrument_name)
+
+
+class StaffGroup(Context):
+
+    def __init__(self, contents=None):
+        super().__init__("StaffGroup", contents, simultaneous=True)
+
+
+class Score(Context):
+
+    def __init__(self, contents=None):
+        super().__init__("Score", contents, simultaneous=True)
+
+
+##################################################################################################################
+#                                                  Files
+##################################################################################################################
+
+
+# abjad marks the lines it generates for a LilyPondFile with these tags, naming the functions that produced them.
+# They don't refer to anything in this module, and LilyPond treats them as comments; they are only reproduced so that
+# files written here are byte-for-byte identical to the ones written via abjad.
+_format_tag_suffix = "%! abjad.LilyPondFile._get_format_pieces()"
+_blocks_tag_suffix = "%! abjad.LilyPondFile._get_formatted_blocks()"
+
+
+def format_lilypond_file(music, title: str = None, composer: str = None, extra_definitions: str = None) -> str:
+    """
+    Wraps the given music up as a full LilyPond file, in the same layout that abjad's LilyPondFile.new uses.
+
+    :param music: a Leaf or Container
+    :param title: title to put in the header block (if any)
+    :param composer: composer to put in the header block (if any)
+    :param extra_definitions: code to place just before the score block (if any)
+    """
+    includes = [r'\version "{}"'.format(get_lilypond_version_string()), r'\language "english"']
+    width = max(len(x) for x in includes)
+    sections = ["\n".join(x + " " * (width - len(x)) + " " + _format_tag_suffix for x in includes)]
+
+    header_lines = [r"\header { " + _blocks_tag_suffix, _INDENT + "tagline = ##f"]
+    if title is not None:
+        header_lines.append(_INDENT + "title = " + format_markup(title))
+    if composer is not None:
+        header_lines.append(_INDENT + "composer = " + format_markup(composer))
+    header_lines.append("} " + _blocks_tag_suffix)
+    sections.extend(["\n".join(header_lines), r"\layout {}", r"\paper {}"])
+
+    if extra_definitions is not None:
+        sections.append(extra_definitions)
+
+    if isinstance(music, Leaf):
+        music_lines = [_INDENT + "{"] + [_INDENT * 2 + x if not x.isspace() else "" for x in music.format_pieces()] \
+                      + [_INDENT + "}"]
+    else:
+        music_lines = _indent_lines(music.format_pieces())
+    sections.append("\n".join([r"\score { " + _blocks_tag_suffix] + music_lines + ["} " + _blocks_tag_suffix]))
+    return "\n\n".join(sections)
+
+
+##################################################################################################################
+#                                                 Rendering
+##################################################################################################################
+
+
+#: File extension for each output format, along with the command line flags that get LilyPond to produce it
+_output_format_flags = {
+    "pdf": ["--pdf"],
+    "png": ["--png"],
+    "svg": ["-dbackend=svg"],
+}
+
+
+def _get_output_files(directory: str, base_name: str, output_format: str) -> List[str]:
+    # LilyPond names its output "<base_name>.<format>", except when producing several pages of images, in which case
+    # they are named "<base_name>-page1.<format>", etc.
+    return sorted(glob.glob(os.path.join(glob.escape(directory), glob.escape(base_name) + "*." + output_format)))
+
+
+class _RenderCache:
+    """
+    On-disk cache of LilyPond output. Each entry is a sub-directory of the cache directory, named by a hash of the
+    LilyPond source together with the LilyPond version and output format, and holding the files that LilyPond
+    produced. Entries are written to a temporary directory and then moved into place, so that a partially written entry
+    is never read, and the least recently used entries are evicted once there are more than max_entries of them.
+
+    :param cache_directory: path of the directory in which to store the cached output
+    :param max_entries: how many rendered files to keep in the cache directory
+    """
+
+    #: Bumped whenever a change to the way files are rendered would make previously cached output wrong
+    format_version = 1
+
+    entry_suffix = ".rendered"
+
+    def __init__(self, cache_directory: str, max_entries: int):
+        self.cache_directory = os.path.expanduser(cache_directory)
+        self.max_entries = max_entries
+        # in case max_entries has been lowered since the cache directory was last written to
+        self._evict()
+
+    @staticmethod
+    def get_key(lilypond_source: str, output_format: str) -> str:
+        """
+        Returns the hash under which the output of rendering the given source in the given format is stored.
+        """
+        key_contents = "\n".join([str(_RenderCache.format_version), get_lilypond_version_string(), output_format,
+                                  lilypond_source])
+        return hashlib.sha256(key_contents.encode()).hexdigest()
+
+    def get(self, key: str) -> List[str]:
+        """
+        Returns the paths of the cached output files stored under the given key (an empty list if there are none).
+        """
+        entry_directory = os.path.join(self.cache_directory, key + _RenderCache.entry_suffix)
+        if not os.path.isdir(entry_directory):
+            return []
+        try:
+            # touch the entry, so that eviction treats it as recently used
+            os.utime(entry_directory)
+        except OSError:
+            pass
+        return sorted(os.path.join(entry_directory, file_name) for file_name in os.listdir(entry_directory))
+
+    def put(self, key: str, output_files: Sequence[str]) -> None:
+        """
+        Copies the given output files into the cache under the given key.
+        """
+        entry_directory = os.path.join(self.cache_directory, key + _RenderCache.entry_suffix)
+        temporary_directory = "{}.{}.{}.tmp".format(entry_directory, os.getpid(), id(output_files))
+        try:
+            os.makedirs(temporary_directory, exist_ok=True)
+            for output_file in output_files:
+                shutil.copyfile(output_file, os.path.join(temporary_directory, os.path.basename(output_file)))
+            try:
+                os.rename(temporary_directory, entry_directory)
+            except OSError:
+                # another worker got there first; its entry is just as good as ours
+                shutil.rmtree(temporary_directory, ignore_errors=True)
+            self._evict()
+        except OSError as e:
+            shutil.rmtree(temporary_directory, ignore_errors=True)
+            logging.warning("Could not write to LilyPond cache directory {}: {}".format(self.cache_directory, e))
+
+    def clear(self) -> None:
+        """
+        Deletes all of the entries in the cache directory.
+        """
+        for entry_directory in self._get_entries():
+            shutil.rmtree(entry_directory, ignore_errors=True)
+
+    def _get_entries(self):
+        if not os.path.isdir(self.cache_directory):
+            return []
+        return [os.path.join(self.cache_directory, file_name) for file_name in os.listdir(self.cache_directory)
+                if file_name.endswith(_RenderCache.entry_suffix)]
+
+    def _evict(self):
+        entries = self._get_entries()
+        num_to_remove = len(entries) - max(self.max_entries, 0)
+        if num_to_remove <= 0:
+            return
+        entries.sort(key=os.path.getmtime)
+        for entry_directory in entries[:num_to_remove]:
+            shutil.rmtree(entry_directory, ignore_errors=True)
+
+
+def _get_lilypond_executable() -> str:
+    lilypond = shutil.which("lilypond")
+    if lilypond is None:
+        raise LilyPondRenderingError("Could not find the LilyPond executable; LilyPond must be installed and on the "
+                                     "PATH in order to render scores.")
+    return lilypond
+
+
+def _compile_lilypond_source(lilypond_source: str, output_format: str, working_directory: str) -> List[str]:
+    """
+    Runs LilyPond on the given source within the given directory, returning the paths of the files it produced.
+    """
+    source_path = os.path.join(working_directory, "score.ly")
+    with open(source_path, "w") as source_file:
+        source_file.write(lilypond_source)
+    completed_process = subprocess.run(
+        [_get_lilypond_executable()] + _output_format_flags[output_format] +
+        ["-o", os.path.join(working_directory, "score"), source_path],
+        cwd=working_directory, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+    )
+    output_files = _get_output_files(working_directory, "score", output_format)
+    if completed_process.returncode != 0 or len(output_files) == 0:
+        raise LilyPondRenderingError("LilyPond failed to compile the score:\n{}".format(
+            completed_process.stdout.decode(errors="replace")
+        ))
+    return output_files
+
+
+def _render_lilypond_file(lilypond_source: str, file_path: str, output_format: str,
+                          cache: _RenderCache = None) -> List[str]:
+    """
+    Renders a single LilyPond file, using the cache (if given) to skip compilation when the same source has been
+    rendered before. See :func:`render_lilypond_files`.
+    """
+    file_path = os.path.expanduser(file_path)
+    base_path = file_path[:-len(output_format) - 1] if file_path.endswith("." + output_format) else file_path
+
+    key = None if cache is None else _RenderCache.get_key(lilypond_source, output_format)
+    cached_files = [] if cache is None else cache.get(key)
+
+    with tempfile.TemporaryDirectory() as working_directory:
+        if len(cached_files) > 0:
+            output_files = cached_files
+        else:
+            output_files = _compile_lilypond_source(lilypond_source, output_format, working_directory)
+            if cache is not None:
+                cache.put(key, output_files)
+
+        written_paths = []
+        for output_file in output_files:
+            # carry over any "-page1" suffix that LilyPond added to the file name
+            suffix = os.path.basename(output_file)[len("score"):]
+            written_path = base_path + suffix
+            if os.path.dirname(written_path) != "":
+                os.makedirs(os.path.dirname(written_path), exist_ok=True)
+            shutil.copyfile(output_file, written_path)
+            written_paths.append(written_path)
+    return written_paths
+
+
+def render_lilypond_files(jobs: Sequence[Tuple[str, str]], output_format: str = "pdf", workers: int = None,
+                          cache_directory: str = None, cache_max_entries: int = 256) -> List[List[str]]:
+    """
+    Compiles several LilyPond files, running up to the given number of LilyPond processes at once.
+
+    :param jobs: list of (LilyPond source, output file path) tuples. The output path may be given with or without the
+        extension; if LilyPond produces several files (e.g. one png per page), they are given suffixes like "-page1".
+    :param output_format: one of "pdf", "png" or "svg"
+    :param workers: the maximum number of LilyPond processes to run at once; if None, uses the number of CPUs
+    :param cache_directory: path of a directory in which to cache LilyPond output, keyed by a hash of the source, so
+        that files whose source hasn't changed are copied from there instead of being compiled again. If None, there is
+        no caching.
+    :param cache_max_entries: how many rendered files to keep in the cache directory
+    :return: for each job, the list of file paths that were written
+    """
+    if output_format not in _output_format_flags:
+        raise ValueError("Output format must be one of {}.".format(", ".join(_output_format_flags)))
+    if len(jobs) == 0:
+        return []
+    # fail early (rather than once per job) if LilyPond is missing
+    _get_lilypond_executable()
+
+    cache = None if cache_directory is None else _RenderCache(cache_directory, cache_max_entries)
+    workers = min(workers if workers is not None else (os.cpu_count() or 1), len(jobs))
+
+    if workers <= 1:
+        return [_render_lilypond_file(lilypond_source, file_path, output_format, cache)
+                for lilypond_source, file_path in jobs]
+    # the work happens in LilyPond subprocesses, so threads are all we need to keep several of them going at once
+    with ThreadPool(workers) as pool:
+        return pool.starmap(_render_lilypond_file,
+                            [(lilypond_source, file_path, output_format, cache) for lilypond_source, file_path in jobs])
+
+
+def open_with_default_application(file_path: str) -> None:
+    """
+    Opens the given file with the application that the operating system uses for that type of file.
+
+    :param file_path: path of the file to open
+    """
+    platform_system = platform.system().lower()
+    if platform_system == "windows":
+        os.startfile(file_path)
+    else:
+        subprocess.Popen(["open" if platform_system == "darwin" else "xdg-open", file_path],
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
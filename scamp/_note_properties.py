@@ -74,6 +74,14 @@ class NotePropertiesDictionary(UserDict, SavesToJSON):
         if not isinstance(dictionary[key_name], (list, tuple)):
             dictionary[key_name] = [dictionary[key_name]]
 
+    @classmethod
+    def _new_default(cls) -> 'NotePropertiesDictionary':
+        # quick equivalent of cls(), for when a great many default dictionaries are needed (e.g. when loading files)
+        properties = cls.__new__(cls)
+        properties.data = {"articulations": [], "noteheads": ["normal"], "notations": [], "texts": [],
+                           "playback_adjustments": [], "spelling_policy": None, "temp": {}}
+        return properties
+
     @classmethod
     def from_unknown_format(cls, properties):
         """
@@ -318,6 +326,17 @@ class NotePropertiesDictionary(UserDict, SavesToJSON):
                self.playback_adjustments == other_properties_dict.playback_adjustments and \
                self.text == other_properties_dict.text
 
+    def _light_copy(self) -> 'NotePropertiesDictionary':
+        """
+        Copies this dictionary one level deep: the lists of articulations, noteheads, etc. and the temp dictionary are
+        copied, so that adding to or removing from them leaves the original untouched, but the objects within them
+        (playback adjustments, spelling policies, parameter envelopes) are shared rather than duplicated.
+        """
+        light_copy = NotePropertiesDictionary.__new__(NotePropertiesDictionary)
+        light_copy.data = {key: list(value) if isinstance(value, list) else dict(value) if isinstance(value, dict)
+                           else value for key, value in self.data.items()}
+        return light_copy
+
     def _to_dict(self) -> dict:
         json_friendly_dict = dict(deepcopy(self))
         del json_friendly_dict["temp"]
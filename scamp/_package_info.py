@@ -21,7 +21,8 @@ install_requires = ['pymusicxml >= 0.3.2', 'expenvelope >= 0.6.0', 'clockblocks
 extras_require = {
     'lilypond': 'abjad==3.1',
     'midistream': 'python-rtmidi',
-    'mouse and keyboard input': 'pynput'
+    'mouse and keyboard input': 'pynput',
+    'fast quantization': 'numpy'
 }
 
 package_data = {
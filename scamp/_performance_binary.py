@@ -0,0 +1,336 @@
+"""
+Compact binary file format for :class:`~scamp.performance.Performance` objects, used by
+:func:`~scamp.performance.Performance.save_to_binary` and :func:`~scamp.performance.Performance.load_from_binary`.
+
+Rather than one JSON object per note, a file consists of:
+
+- the magic bytes ``SCAMPPRF``, followed by the length of the header as a little-endian unsigned 64-bit integer
+- the header: a JSON object containing the format version, the tempo envelope, and, for each part, its name,
+  instrument id, clef preference and quantization records, along with the range of rows occupied by each of its voices
+- the note table (padded to start on a multiple of 8 bytes): one fixed-width record per note (see
+  :data:`NOTE_RECORD`), holding the start beat, length, pitch and volume as doubles, along with references into the
+  object pool for anything that isn't a single number, and flags recording which numbers were ints
+- the object pool: a table of offsets, followed by the compact JSON of each envelope, chord, list of tied segment
+  lengths and set of (non-default) note properties. Identical entries are only stored once, so that, for instance, the
+  properties shared by many notes take up the space of one.
+
+The notes of each voice occupy a contiguous run of rows, in order of start beat, so a reader can memory-map the file
+and bisect on the start beats to find just the notes it is interested in, without parsing (or even reading) the rest.
+"""
+
+from .utilities import SavesToJSON
+from ._note_properties import NotePropertiesDictionary
+from ._dependencies import numpy
+from numbers import Real
+import json
+import mmap
+import struct
+from typing import Sequence, Tuple, Iterator, Union
+
+MAGIC = b"SCAMPPRF"
+FORMAT_VERSION = 1
+
+#: start_beat, length, pitch, volume (doubles), followed by length_ref, pitch_ref, volume_ref, properties_ref (indices
+#: into the object pool, or -1 if there is no object), a byte of flags, and three bytes of padding
+NOTE_RECORD = struct.Struct("<ddddiiiiB3x")
+_HEADER_LENGTH = struct.Struct("<Q")
+_POOL_OFFSET = struct.Struct("<Q")
+_START_BEAT = struct.Struct("<d")
+
+_START_BEAT_IS_INT, _LENGTH_IS_INT, _PITCH_IS_INT, _VOLUME_IS_INT, _LENGTH_IS_TUPLE, _PITCH_IS_TUPLE = \
+    1, 2, 4, 8, 16, 32
+
+if numpy is not None:
+    _NOTE_RECORD_DTYPE = numpy.dtype([
+        ("start_beat", "<f8"), ("length", "<f8"), ("pitch", "<f8"), ("volume", "<f8"),
+        ("length_ref", "<i4"), ("pitch_ref", "<i4"), ("volume_ref", "<i4"), ("properties_ref", "<i4"),
+        ("flags", "u1"), ("padding", "V3")
+    ])
+    assert _NOTE_RECORD_DTYPE.itemsize == NOTE_RECORD.size
+
+
+def _padded(num_bytes):
+    return num_bytes + (-num_bytes % 8)
+
+
+def _encode(value) -> bytes:
+    return json.dumps(value, default=SavesToJSON._encoder_default, sort_keys=True, separators=(",", ":")).encode()
+
+
+def _decode(encoded: bytes):
+    return json.loads(encoded.decode(), object_hook=SavesToJSON._decoder_object_hook)
+
+
+_DEFAULT_PROPERTIES = NotePropertiesDictionary()
+_DEFAULT_PROPERTIES_ENCODING = _encode(_DEFAULT_PROPERTIES)
+
+
+class _ObjectPool:
+    """
+    Collects the encoded objects to be written to a file, giving each distinct one an index.
+    """
+
+    def __init__(self):
+        self.entries = []
+        self._indices = {}
+
+    def add(self, encoded: bytes) -> int:
+        if encoded not in self._indices:
+            self._indices[encoded] = len(self.entries)
+            self.entries.append(encoded)
+        return self._indices[encoded]
+
+
+def _pack_note(note, pool: _ObjectPool) -> bytes:
+    flags = 0
+    if isinstance(note.start_beat, int):
+        flags |= _START_BEAT_IS_INT
+
+    if hasattr(note.length, "__len__"):
+        length, length_ref = sum(note.length), pool.add(_encode(list(note.length)))
+        if isinstance(note.length, tuple):
+            flags |= _LENGTH_IS_TUPLE
+    else:
+        length, length_ref = note.length, -1
+        if isinstance(length, int):
+            flags |= _LENGTH_IS_INT
+
+    if isinstance(note.pitch, Real):
+        pitch, pitch_ref = note.pitch, -1
+        if isinstance(pitch, int):
+            flags |= _PITCH_IS_INT
+    else:
+        # envelopes, chords and rests (whose pitch is None) all go in the pool
+        pitch, pitch_ref = float("nan"), pool.add(_encode(note.pitch))
+        if isinstance(note.pitch, tuple):
+            flags |= _PITCH_IS_TUPLE
+
+    if isinstance(note.volume, Real):
+        volume, volume_ref = note.volume, -1
+        if isinstance(volume, int):
+            flags |= _VOLUME_IS_INT
+    else:
+        volume, volume_ref = float("nan"), pool.add(_encode(note.volume))
+
+    if note.properties == _DEFAULT_PROPERTIES:
+        # (most notes have default properties, so it's worth checking for them before encoding)
+        properties_ref = -1
+    else:
+        encoded_properties = _encode(note.properties)
+        properties_ref = -1 if encoded_properties == _DEFAULT_PROPERTIES_ENCODING else pool.add(encoded_properties)
+
+    return NOTE_RECORD.pack(note.start_beat, length, pitch, volume, length_ref, pitch_ref, volume_ref,
+                            properties_ref, flags)
+
+
+def write_performance_file(file_path: str, tempo_envelope, parts: Sequence[Tuple[dict, dict]]) -> None:
+    """
+    Writes a performance to the binary format described above.
+
+    :param file_path: path of the file to write
+    :param tempo_envelope: the performance's tempo envelope
+    :param parts: list of (part info, voices) tuples, where part info is a JSON-serializable dictionary of everything
+        about the part other than its notes, and voices is a dictionary mapping voice names to iterables of the
+        notes in each voice
+    """
+    note_table = bytearray()
+    pool = _ObjectPool()
+
+    part_headers = []
+    row = 0
+    for part_info, voices in parts:
+        voice_headers = []
+        for voice_name, voice in voices.items():
+            first_row = row
+            previous_start_beat = None
+            is_sorted = True
+            for note in voice:
+                note_table += _pack_note(note, pool)
+                if previous_start_beat is not None and note.start_beat < previous_start_beat:
+                    is_sorted = False
+                previous_start_beat = note.start_beat
+                row += 1
+            voice_headers.append({"name": voice_name, "first_row": first_row, "num_rows": row - first_row,
+                                  "sorted": is_sorted})
+        part_header = dict(part_info)
+        part_header["voices"] = voice_headers
+        part_headers.append(part_header)
+
+    header = _encode({
+        "format_version": FORMAT_VERSION,
+        "tempo_envelope": tempo_envelope,
+        "parts": part_headers,
+        "num_notes": row,
+        "num_pool_entries": len(pool.entries)
+    })
+
+    pool_offsets = bytearray(_POOL_OFFSET.size * (len(pool.entries) + 1))
+    offset = 0
+    for i, entry in enumerate(pool.entries):
+        _POOL_OFFSET.pack_into(pool_offsets, _POOL_OFFSET.size * i, offset)
+        offset += len(entry)
+    _POOL_OFFSET.pack_into(pool_offsets, _POOL_OFFSET.size * len(pool.entries), offset)
+
+    with open(file_path, "wb") as file:
+        file.write(MAGIC)
+        file.write(_HEADER_LENGTH.pack(len(header)))
+        file.write(header)
+        file.write(bytes(_padded(len(header)) - len(header)))
+        file.write(note_table)
+        file.write(bytes(_padded(len(note_table)) - len(note_table)))
+        file.write(pool_offsets)
+        for entry in pool.entries:
+            file.write(entry)
+
+
+class PerformanceFileReader:
+    """
+    Reads from a file written by :func:`write_performance_file`. The file is memory-mapped, and only the parts of it
+    that are asked for are read and decoded. Can be used as a context manager, which closes the file at the end.
+
+    :param file_path: path of the file to read
+    :ivar header: the decoded header of the file (see module documentation)
+    """
+
+    def __init__(self, file_path: str):
+        self._file = open(file_path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # (empty files can't be memory-mapped)
+            self._file.close()
+            raise ValueError("{} is not a SCAMP binary performance file.".format(file_path))
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError("{} is not a SCAMP binary performance file.".format(file_path))
+
+        header_length, = _HEADER_LENGTH.unpack_from(self._map, len(MAGIC))
+        header_start = len(MAGIC) + _HEADER_LENGTH.size
+        self.header = _decode(self._map[header_start:header_start + header_length])
+        if self.header["format_version"] > FORMAT_VERSION:
+            self.close()
+            raise ValueError("{} was written with a newer version of the format (version {}).".format(
+                file_path, self.header["format_version"]
+            ))
+
+        self._note_table_offset = header_start + _padded(header_length)
+        self._pool_offsets_offset = self._note_table_offset + _padded(NOTE_RECORD.size * self.header["num_notes"])
+        self._pool_offset = self._pool_offsets_offset + _POOL_OFFSET.size * (self.header["num_pool_entries"] + 1)
+
+    def _get_start_beat(self, row):
+        return _START_BEAT.unpack_from(self._map, self._note_table_offset + NOTE_RECORD.size * row)[0]
+
+    def _bisect(self, beat, lo, hi):
+        # first row in [lo, hi) whose start beat is not less than the given beat (the rows must be sorted)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._get_start_beat(mid) < beat:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _get_rows(self, voice_header: dict, start_beat: float, stop_beat: float) -> Union[range, Sequence[int]]:
+        # rows of the given voice whose notes start in the range [start_beat, stop_beat)
+        first_row = voice_header["first_row"]
+        end_row = first_row + voice_header["num_rows"]
+        if voice_header["sorted"]:
+            if start_beat is not None:
+                first_row = self._bisect(start_beat, first_row, end_row)
+            if stop_beat is not None:
+                end_row = self._bisect(stop_beat, first_row, end_row)
+            return range(first_row, end_row)
+        return [row for row in range(first_row, end_row)
+                if (start_beat is None or self._get_start_beat(row) >= start_beat) and
+                (stop_beat is None or self._get_start_beat(row) < stop_beat)]
+
+    def _get_pool_entry(self, index: int):
+        start, end = struct.unpack_from("<QQ", self._map, self._pool_offsets_offset + _POOL_OFFSET.size * index)
+        return _decode(self._map[self._pool_offset + start:self._pool_offset + end])
+
+    def _unpack_row(self, row):
+        return NOTE_RECORD.unpack_from(self._map, self._note_table_offset + NOTE_RECORD.size * row)
+
+    def _get_object(self, ref, flags, tuple_flag):
+        value = self._get_pool_entry(ref)
+        return tuple(value) if flags & tuple_flag else value
+
+    def read_notes(self, voice_header: dict, start_beat: float = None,
+                   stop_beat: float = None) -> Iterator[Tuple[float, Union[float, Sequence], object, object, object]]:
+        """
+        Reads the notes of a voice that start within the given range, in the order in which they were written.
+
+        :param voice_header: the entry for the voice in the header's part list
+        :param start_beat: only notes starting at or after this beat are read (if None, no lower bound)
+        :param stop_beat: only notes starting before this beat are read (if None, no upper bound)
+        :return: iterator of (start_beat, length, pitch, volume, properties) tuples, where properties is a
+            NotePropertiesDictionary
+        """
+        rows = self._get_rows(voice_header, start_beat, stop_beat)
+        if isinstance(rows, range) and len(rows) > 0:
+            records = NOTE_RECORD.iter_unpack(self._map[self._note_table_offset + NOTE_RECORD.size * rows.start:
+                                                        self._note_table_offset + NOTE_RECORD.size * rows.stop])
+        else:
+            records = (self._unpack_row(row) for row in rows)
+        new_default_properties = NotePropertiesDictionary._new_default
+
+        for start, length, pitch, volume, length_ref, pitch_ref, volume_ref, properties_ref, flags in records:
+            yield (
+                int(start) if flags & _START_BEAT_IS_INT else start,
+                self._get_object(length_ref, flags, _LENGTH_IS_TUPLE) if length_ref >= 0
+                else int(length) if flags & _LENGTH_IS_INT else length,
+                self._get_object(pitch_ref, flags, _PITCH_IS_TUPLE) if pitch_ref >= 0
+                else int(pitch) if flags & _PITCH_IS_INT else pitch,
+                self._get_pool_entry(volume_ref) if volume_ref >= 0
+                else int(volume) if flags & _VOLUME_IS_INT else volume,
+                self._get_pool_entry(properties_ref) if properties_ref >= 0 else new_default_properties()
+            )
+
+    def read_columns(self, voice_header: dict, start_beat: float = None, stop_beat: float = None) -> Tuple:
+        """
+        Reads the notes of a voice that start within the given range as numpy arrays, along with side tables for
+        whatever doesn't fit in the arrays (which match the storage of :class:`~scamp.performance.ColumnarVoice`).
+        The numbers are read as floats, alongside the flags recording which of them were ints. Requires numpy.
+
+        :param voice_header: the entry for the voice in the header's part list
+        :param start_beat: only notes starting at or after this beat are read (if None, no lower bound)
+        :param stop_beat: only notes starting before this beat are read (if None, no upper bound)
+        :return: tuple of (start_beats, lengths, pitches, volumes, int_flags, length_tuples, pitch_objects,
+            volume_objects, properties), where the first four are float arrays, int_flags is an array of bit flags
+            recording which of the numbers in each row were ints, and the last four are dictionaries mapping row
+            indices (within the notes read) to tied segment lengths, pitch objects, volume objects and
+            non-default NotePropertiesDictionaries, respectively.
+        """
+        assert numpy is not None, "numpy is required to read columns."
+        all_records = numpy.frombuffer(self._map, dtype=_NOTE_RECORD_DTYPE, count=self.header["num_notes"],
+                                       offset=self._note_table_offset)
+        rows = self._get_rows(voice_header, start_beat, stop_beat)
+        # copy the selected records out of the memory map, so that it can be closed
+        records = all_records[rows.start:rows.stop].copy() if isinstance(rows, range) \
+            else all_records[numpy.array(rows, dtype=numpy.int64)]
+        del all_records
+
+        side_tables = []
+        for ref_column, tuple_flag in (("length_ref", _LENGTH_IS_TUPLE), ("pitch_ref", _PITCH_IS_TUPLE),
+                                       ("volume_ref", 0), ("properties_ref", 0)):
+            refs, flags = records[ref_column], records["flags"]
+            side_tables.append({
+                int(row): self._get_object(int(refs[row]), int(flags[row]), tuple_flag)
+                for row in numpy.flatnonzero(refs >= 0)
+            })
+        int_flags = records["flags"] & (_START_BEAT_IS_INT | _LENGTH_IS_INT | _PITCH_IS_INT | _VOLUME_IS_INT)
+        return (records["start_beat"].copy(), records["length"].copy(), records["pitch"].copy(),
+                records["volume"].copy(), int_flags, *side_tables)
+
+    def close(self) -> None:
+        """
+        Closes the memory map and the underlying file.
+        """
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
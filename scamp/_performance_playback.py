@@ -0,0 +1,156 @@
+"""
+Playback engine used by :func:`~scamp.performance.Performance.play` and :func:`~scamp.performance.PerformancePart.play`.
+Rather than forking a clock for every note (each of which waits out the length of its note before ending it), the
+engine merges the starts, splits and ends of all of the notes being played into a single time-ordered schedule, and
+works through it on one clock. This way, the number of threads involved stays the same however dense the music is.
+"""
+
+from clockblocks.clock import Clock, ClockKilledError
+from expenvelope import Envelope
+from .instruments import ScampInstrument
+from copy import deepcopy
+import heapq
+import itertools
+from typing import Sequence, Tuple, Iterator, Callable
+
+
+class PlaybackEngine:
+    """
+    Plays back the notes from one or more note iterators (each paired with the instrument to play its notes on) as a
+    single schedule of events on one clock. Notes are started when their start beat comes around, at which point the
+    events that split and end them are added to the schedule. Playback adjustments, chords and fast-forwarding are
+    handled just as they are by :func:`~scamp.instruments.ScampInstrument.play_note`.
+
+    Pitch and volume envelopes (and envelopes on extra parameters) are animated by the instrument itself, as they
+    always have been, so that a transcription of the playback captures them exactly. Notes whose pitch and volume are
+    fixed involve no threads beyond the one running the engine.
+
+    :param note_sources: list of (note iterator, instrument) tuples, each iterator giving notes in order of start beat
+    :param start_beat: the beat at which playback starts (i.e. the beat that corresponds to the moment run is called)
+    :param note_filter: optional function that takes each PerformanceNote just before it is played and returns the
+        (possibly modified) note to play in its place
+    """
+
+    # at a given beat, notes are split and ended before any new notes are started
+    _SPLIT_OR_END, _START = 0, 1
+
+    def __init__(self, note_sources: Sequence[Tuple[Iterator['PerformanceNote'], ScampInstrument]],
+                 start_beat: float = 0,
+                 note_filter: Callable[['PerformanceNote'], 'PerformanceNote'] = None):
+        self.notes = heapq.merge(
+            *(zip(note_iterator, itertools.repeat(instrument)) for note_iterator, instrument in note_sources),
+            key=lambda note_and_instrument: note_and_instrument[0].start_beat
+        )
+        self.start_beat = start_beat
+        self.note_filter = note_filter
+        # heap of (beat, _SPLIT_OR_END, sequence number, note handle, "split" or "end") for the notes that are playing
+        self._scheduled_events = []
+        self._sequence_numbers = itertools.count()
+        self._sounding_handles = set()
+
+    def run(self, clock: Clock) -> None:
+        """
+        Plays everything, returning once the last note has ended. This should be called from the process running on
+        the given clock (usually by forking it).
+
+        :param clock: the clock to play back on
+        """
+        beat = self.start_beat
+        next_note = next(self.notes, None)
+        try:
+            while next_note is not None or len(self._scheduled_events) > 0:
+                if next_note is None or len(self._scheduled_events) > 0 and \
+                        (self._scheduled_events[0][0], PlaybackEngine._SPLIT_OR_END) <= \
+                        (next_note[0].start_beat, PlaybackEngine._START):
+                    event_beat, _, _, note_handle, action = heapq.heappop(self._scheduled_events)
+                    if event_beat > beat:
+                        clock.wait(event_beat - beat)
+                        beat = event_beat
+                    if action == "split":
+                        note_handle.split()
+                    else:
+                        note_handle.end()
+                        self._sounding_handles.discard(note_handle)
+                else:
+                    note, instrument = next_note
+                    if note.start_beat > beat:
+                        clock.wait(note.start_beat - beat)
+                        beat = note.start_beat
+                    self._start_performance_note(clock, beat, note, instrument)
+                    next_note = next(self.notes, None)
+        except ClockKilledError as e:
+            for note_handle in self._sounding_handles:
+                note_handle.end()
+            raise e
+
+    def _start_performance_note(self, clock, beat, note, instrument):
+        # mirrors PerformanceNote.play, and in turn play_chord / play_note
+        if self.note_filter is not None:
+            note = self.note_filter(note)
+        properties = instrument._standardize_properties(note.properties)
+
+        if isinstance(note.pitch, tuple):
+            if not (len(properties.noteheads) == len(note.pitch) or len(properties.noteheads) == 1):
+                raise ValueError("Wrong number of noteheads for chord.")
+            for i, pitch in enumerate(note.pitch):
+                pitch_properties = deepcopy(properties) if i < len(note.pitch) - 1 else properties
+                if len(properties.noteheads) > 1:
+                    pitch_properties.noteheads = [properties.noteheads[i]]
+                self._start_note(clock, beat, instrument, pitch, note.volume, note.length, pitch_properties)
+        else:
+            self._start_note(clock, beat, instrument, note.pitch, note.volume, note.length, properties)
+
+    def _start_note(self, clock, beat, instrument, pitch, volume, length, properties):
+        # mirrors ScampInstrument.play_note: if there are playback adjustments, the adjusted note is played but not
+        # transcribed, and the unadjusted note is transcribed but not played
+        pitch = Envelope.from_list(pitch) if hasattr(pitch, "__len__") else pitch
+        volume = Envelope.from_list(volume) if hasattr(volume, "__len__") else volume
+
+        adjusted_pitch, adjusted_volume, adjusted_length, did_an_adjustment = \
+            properties.apply_playback_adjustments(pitch, volume, length)
+
+        if did_an_adjustment:
+            adjusted_pitch = Envelope.from_list(adjusted_pitch) \
+                if hasattr(adjusted_pitch, "__len__") else adjusted_pitch
+            adjusted_volume = Envelope.from_list(adjusted_volume) \
+                if hasattr(adjusted_volume, "__len__") else adjusted_volume
+            if not clock.is_fast_forwarding():
+                self._start_sounding(clock, beat, instrument, adjusted_pitch, adjusted_volume, adjusted_length,
+                                     properties, ["no_transcribe"])
+            self._start_sounding(clock, beat, instrument, pitch, volume, length, properties, ["silent"])
+        else:
+            self._start_sounding(clock, beat, instrument, pitch, volume, length, properties,
+                                 ["silent"] if clock.is_fast_forwarding() else [])
+
+    def _start_sounding(self, clock, beat, instrument, pitch, volume, length, properties, note_flags):
+        # mirrors ScampInstrument._do_play_note, except that instead of waiting for the note to finish, we schedule
+        # the events that split and end it
+        sum_length = sum(length) if hasattr(length, "__len__") else length
+
+        # normalize all envelopes to the duration of the note
+        if isinstance(pitch, Envelope):
+            pitch.normalize_to_duration(sum_length)
+        if isinstance(volume, Envelope):
+            volume.normalize_to_duration(sum_length)
+        for param, value in properties.iterate_extra_parameters_and_values():
+            if isinstance(value, Envelope):
+                value.normalize_to_duration(sum_length)
+
+        if not isinstance(pitch, Envelope) and not isinstance(volume, Envelope):
+            note_flags = note_flags + ["fixed"]
+
+        note_handle = instrument.start_note(
+            pitch, volume, properties, clock=clock, flags=note_flags,
+            max_volume=volume.max_level() if isinstance(volume, Envelope) else volume
+        )
+        self._sounding_handles.add(note_handle)
+
+        # a note with tied segments is split at the end of each segment (including the last), and then ended
+        if hasattr(length, "__len__"):
+            for segment_end in itertools.accumulate(length):
+                self._schedule(beat + segment_end, note_handle, "split")
+        self._schedule(beat + sum_length, note_handle, "end")
+
+    def _schedule(self, beat, note_handle, action):
+        heapq.heappush(self._scheduled_events,
+                       (beat, PlaybackEngine._SPLIT_OR_END, next(self._sequence_numbers), note_handle, action))
@@ -6,22 +6,47 @@ into the notation-based classes in the score module.
 """
 
 import bisect
-from functools import total_ordering
+from functools import total_ordering, lru_cache
+from copy import deepcopy
 from numbers import Real
 from expenvelope import Envelope
 from ._note_properties import NotePropertiesDictionary
 from .settings import engraving_settings
-from .quantization import quantize_performance_part, QuantizationRecord, QuantizationScheme
+from .quantization import quantize_performance_part, QuantizationRecord, QuantizationScheme, \
+    _quantize_performance_parts
 from .settings import quantization_settings
 from clockblocks import Clock, TempoEnvelope, current_clock
 from .instruments import Ensemble, ScampInstrument
 from .score import Score, StaffGroup
 from .utilities import SavesToJSON
+from ._performance_playback import PlaybackEngine
+from ._performance_binary import write_performance_file, PerformanceFileReader, _START_BEAT_IS_INT, _LENGTH_IS_INT, \
+    _PITCH_IS_INT, _VOLUME_IS_INT
+from ._dependencies import numpy
+from collections.abc import MutableSequence
 import logging
-from copy import deepcopy
 import itertools
+import heapq
 import textwrap
-from typing import Union, Sequence, Tuple, Iterator, Callable
+from typing import Union, Sequence, Tuple, Iterator, Callable, Iterable
+
+
+class _TimingAttribute:
+    """
+    Descriptor for the start beat and length of a :class:`PerformanceNote`, which lets the note index of the part
+    holding the note (if any) know that it has been moved or resized. It only defines __set__, so reading the
+    attribute still goes straight to the instance dictionary, at no extra cost.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __set__(self, instance, value):
+        instance_dict = instance.__dict__
+        instance_dict[self.name] = value
+        note_index = instance_dict.get("_note_index")
+        if note_index is not None:
+            note_index.timing_edited = True
 
 
 @total_ordering
@@ -43,17 +68,35 @@ class PerformanceNote(SavesToJSON):
     :ivar properties: dictionary of note properties, or string representing those properties
     """
 
+    start_beat = _TimingAttribute()
+    length = _TimingAttribute()
+
     def __init__(self, start_beat: float, length: Union[float, Tuple[float]], pitch: Union[float, Envelope, Sequence],
                  volume: Union[float, Envelope], properties: dict):
-        self.start_beat = start_beat
+        # (a new note isn't in any note index yet, so there's no need to go through the _TimingAttribute)
+        note_dict = self.__dict__
+        note_dict["start_beat"] = start_beat
         # if length is a tuple, this indicates that the note is to be split into tied segments
-        self.length = length
+        note_dict["length"] = length
         # if pitch is a tuple, this indicates a chord
         self.pitch = pitch
         self.volume = volume
         self.properties = properties if isinstance(properties, NotePropertiesDictionary) \
             else NotePropertiesDictionary.from_unknown_format(properties)
 
+    def __getstate__(self):
+        # copies (and pickles) of a note don't belong to the note index that the original belongs to
+        if "_note_index" in self.__dict__:
+            state = dict(self.__dict__)
+            del state["_note_index"]
+            return state
+        return self.__dict__
+
+    def _light_copy(self) -> 'PerformanceNote':
+        # a cheap alternative to deepcopy for when the copy is going to be split, shifted, or have its properties
+        # altered, but its pitch and volume envelopes will only ever be replaced, never modified in place
+        return PerformanceNote(self.start_beat, self.length, self.pitch, self.volume, self.properties._light_copy())
+
     def length_sum(self) -> float:
         """
         Total length of this note, adding together any tied segments.
@@ -324,6 +367,694 @@ class PerformanceNote(SavesToJSON):
         )
 
 
+class _ColumnarNote(PerformanceNote):
+    """
+    A PerformanceNote that has no data of its own, but reads and writes a row of a :class:`ColumnarVoice`. These are
+    created on the fly when notes are accessed, so two accesses to the same note give two different objects, both of
+    which read from (and write to) the same place. Copying or pickling one gives an ordinary PerformanceNote.
+    """
+
+    def __init__(self, columnar_voice: 'ColumnarVoice', row: int):
+        self._columnar_voice = columnar_voice
+        self._row = row
+
+    @property
+    def start_beat(self):
+        return self._columnar_voice._get_number(self._columnar_voice._start_beats, self._row, _START_BEAT_IS_INT)
+
+    @start_beat.setter
+    def start_beat(self, value):
+        self._columnar_voice._timing_version += 1
+        self._columnar_voice._set_number(self._columnar_voice._start_beats, self._row, _START_BEAT_IS_INT, value)
+
+    @property
+    def length(self):
+        length_tuples = self._columnar_voice._length_tuples
+        return length_tuples[self._row] if self._row in length_tuples \
+            else self._columnar_voice._get_number(self._columnar_voice._lengths, self._row, _LENGTH_IS_INT)
+
+    @length.setter
+    def length(self, value):
+        self._columnar_voice._timing_version += 1
+        self._columnar_voice._set_length(self._row, value)
+
+    @property
+    def pitch(self):
+        return self._columnar_voice._get_scalar_or_object(self._columnar_voice._pitches,
+                                                          self._columnar_voice._pitch_objects, self._row, _PITCH_IS_INT)
+
+    @pitch.setter
+    def pitch(self, value):
+        self._columnar_voice._set_scalar_or_object(self._columnar_voice._pitches, self._columnar_voice._pitch_objects,
+                                                   self._row, _PITCH_IS_INT, value)
+
+    @property
+    def volume(self):
+        return self._columnar_voice._get_scalar_or_object(self._columnar_voice._volumes,
+                                                          self._columnar_voice._volume_objects, self._row,
+                                                          _VOLUME_IS_INT)
+
+    @volume.setter
+    def volume(self, value):
+        self._columnar_voice._set_scalar_or_object(self._columnar_voice._volumes, self._columnar_voice._volume_objects,
+                                                   self._row, _VOLUME_IS_INT, value)
+
+    @property
+    def properties(self):
+        return self._columnar_voice._get_properties(self._row)
+
+    @properties.setter
+    def properties(self, value):
+        self._columnar_voice._properties[self._row] = value if isinstance(value, NotePropertiesDictionary) \
+            else NotePropertiesDictionary.from_unknown_format(value)
+
+    def _to_plain_note(self) -> PerformanceNote:
+        return PerformanceNote(self.start_beat, self.length, self.pitch, self.volume, self.properties)
+
+    def __copy__(self):
+        return self._to_plain_note()
+
+    def __deepcopy__(self, memo):
+        return deepcopy(self._to_plain_note(), memo)
+
+    def __reduce__(self):
+        return PerformanceNote, (self.start_beat, self.length, self.pitch, self.volume, self.properties)
+
+
+class _DetachedNoteProperties(NotePropertiesDictionary):
+    """
+    The default properties of a row of a :class:`ColumnarVoice` that has none stored, as returned when they are read.
+    Nothing is stored in the voice unless this dictionary (or one of the lists or the temp dictionary within it) is
+    altered, at which point it stores itself as the properties of that row. (If the row has been given other
+    properties in the meantime, it is left alone, just as altering a note's old properties dictionary after replacing
+    it would have no effect on the note.) Copying or pickling one gives an ordinary NotePropertiesDictionary.
+    """
+
+    def __init__(self, columnar_voice: 'ColumnarVoice', row: int):
+        # (NotePropertiesDictionary.__init__ is skipped, since the contents are known to be the defaults)
+        self._columnar_voice = columnar_voice
+        self._row = row
+        self.data = {"articulations": _AttachOnWriteList(self), "noteheads": _AttachOnWriteList(self, ["normal"]),
+                     "notations": _AttachOnWriteList(self), "texts": _AttachOnWriteList(self),
+                     "playback_adjustments": _AttachOnWriteList(self), "spelling_policy": None,
+                     "temp": _AttachOnWriteDict(self)}
+
+    def _attach(self):
+        if self._columnar_voice is not None:
+            if self._row not in self._columnar_voice._properties:
+                self._columnar_voice._properties[self._row] = self
+            self._columnar_voice = None
+
+    def __setitem__(self, key, value):
+        self._attach()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._attach()
+        super().__delitem__(key)
+
+    def __copy__(self):
+        return self._light_copy()
+
+    def __reduce_ex__(self, protocol):
+        return NotePropertiesDictionary.from_unknown_format, (self._light_copy().data, )
+
+
+class _AttachOnWriteList(list):
+    # a list within a _DetachedNoteProperties, which attaches it to its voice before being altered
+
+    def __init__(self, owner: _DetachedNoteProperties, contents=()):
+        super().__init__(contents)
+        self._owner = owner
+
+    def __reduce_ex__(self, protocol):
+        return list, (list(self), )
+
+
+class _AttachOnWriteDict(dict):
+    # the temp dictionary within a _DetachedNoteProperties, which attaches it to its voice before being altered
+
+    def __init__(self, owner: _DetachedNoteProperties):
+        super().__init__()
+        self._owner = owner
+
+    def __reduce_ex__(self, protocol):
+        return dict, (dict(self), )
+
+
+def _attach_before(method):
+    def attaching_method(self, *args, **kwargs):
+        self._owner._attach()
+        return method(self, *args, **kwargs)
+    attaching_method.__name__ = method.__name__
+    return attaching_method
+
+
+for _method_name in ("__setitem__", "__delitem__", "__iadd__", "__imul__", "append", "extend", "insert", "remove",
+                     "pop", "clear", "sort", "reverse"):
+    setattr(_AttachOnWriteList, _method_name, _attach_before(getattr(list, _method_name)))
+for _method_name in ("__setitem__", "__delitem__", "update", "setdefault", "pop", "popitem", "clear"):
+    setattr(_AttachOnWriteDict, _method_name, _attach_before(getattr(dict, _method_name)))
+
+
+class ColumnarVoice(MutableSequence):
+    """
+    A voice (i.e. a list of PerformanceNotes) that stores its notes column by column in numpy arrays, rather than as
+    a list of separate objects. Start beats, lengths, and scalar pitches and volumes are kept in float arrays; pitch
+    and volume envelopes, chords, tied-segment lengths and non-default note properties are kept in side tables indexed
+    by row. This takes a small fraction of the memory of a list of PerformanceNotes, and allows bulk analysis and
+    filtering at array speed (see :attr:`start_beats`, :attr:`pitches`, :meth:`select`, etc.).
+
+    A ColumnarVoice behaves just like a list of PerformanceNotes: the notes are created on access, and altering one
+    alters the data stored here. (Numbers are stored as floats, along with a flag recording whether they were ints, so
+    that an int pitch, for instance, comes back as an int. The arrays themselves are all floats.) Since it's the
+    rows that are kept in order, and not the notes themselves, a note obtained from a ColumnarVoice keeps pointing to
+    the same data after the voice is sorted or has notes added to it. Requires numpy.
+
+    :param notes: the PerformanceNotes to start out with, in order
+    """
+
+    def __init__(self, notes: Iterable[PerformanceNote] = ()):
+        assert numpy is not None, "numpy is required for columnar storage."
+        self._start_beats = numpy.empty(0)
+        self._lengths = numpy.empty(0)
+        self._pitches = numpy.empty(0)
+        self._volumes = numpy.empty(0)
+        # for each row, bit flags recording which of its numbers were ints (the same flags as in the binary format)
+        self._int_flags = numpy.empty(0, dtype=numpy.uint8)
+        self._num_rows = 0
+        # row indices, in the order of the notes in this voice
+        self._order = numpy.empty(0, dtype=numpy.int64)
+        self._num_notes = 0
+        # side tables, mapping row indices to data that can't be stored in the arrays
+        self._length_tuples = {}
+        self._pitch_objects = {}
+        self._volume_objects = {}
+        self._properties = {}
+        # incremented whenever the start beat or length of a note is changed in place, so that a note index can tell
+        # that it is out of date
+        self._timing_version = 0
+        self.extend(notes)
+
+    @classmethod
+    def _from_columns(cls, start_beats, lengths, pitches, volumes, int_flags, length_tuples: dict, pitch_objects: dict,
+                      volume_objects: dict, properties: dict) -> 'ColumnarVoice':
+        # makes a ColumnarVoice directly out of arrays and side tables (e.g. read from a binary file), in order
+        voice = cls()
+        voice._reserve(len(start_beats))
+        for array_name, array in (("_start_beats", start_beats), ("_lengths", lengths), ("_pitches", pitches),
+                                  ("_volumes", volumes), ("_int_flags", int_flags)):
+            getattr(voice, array_name)[:len(array)] = array
+        voice._num_rows = voice._num_notes = len(start_beats)
+        voice._order[:len(start_beats)] = numpy.arange(len(start_beats))
+        voice._length_tuples, voice._pitch_objects, voice._volume_objects, voice._properties = \
+            length_tuples, pitch_objects, volume_objects, properties
+        return voice
+
+    def _iter_plain_notes(self) -> Iterator[PerformanceNote]:
+        # like to_notes, but without creating (and storing) a properties dictionary for every note with default
+        # properties; notes with default properties all share the same dictionary, so this is for reading only
+        default_properties = _get_default_note_properties()
+        for row in self._get_rows().tolist():
+            note = _ColumnarNote(self, row)
+            yield PerformanceNote(note.start_beat, note.length, note.pitch, note.volume,
+                                  self._properties.get(row, default_properties))
+
+    def _reserve(self, num_rows):
+        # grow the arrays (doubling their capacity) so that they can hold the given number of rows
+        capacity = len(self._start_beats)
+        if num_rows > capacity:
+            new_capacity = max(num_rows, 2 * capacity, 16)
+            for array_name in ("_start_beats", "_lengths", "_pitches", "_volumes", "_int_flags"):
+                new_array = numpy.empty(new_capacity, dtype=getattr(self, array_name).dtype)
+                new_array[:self._num_rows] = getattr(self, array_name)[:self._num_rows]
+                setattr(self, array_name, new_array)
+        if num_rows > len(self._order):
+            new_order = numpy.empty(max(num_rows, 2 * len(self._order), 16), dtype=numpy.int64)
+            new_order[:self._num_notes] = self._order[:self._num_notes]
+            self._order = new_order
+
+    def _add_rows(self, notes):
+        # stores the given notes in new rows, returning the array of row indices
+        notes = list(notes)
+        first_row = self._num_rows
+        self._reserve(first_row + len(notes))
+        rows = numpy.arange(first_row, first_row + len(notes))
+        self._start_beats[first_row:first_row + len(notes)] = [note.start_beat for note in notes]
+        self._int_flags[first_row:first_row + len(notes)] = \
+            [_START_BEAT_IS_INT if isinstance(note.start_beat, int) else 0 for note in notes]
+        for row, note in zip(rows.tolist(), notes):
+            self._set_length(row, note.length)
+            self._set_scalar_or_object(self._pitches, self._pitch_objects, row, _PITCH_IS_INT, note.pitch)
+            self._set_scalar_or_object(self._volumes, self._volume_objects, row, _VOLUME_IS_INT, note.volume)
+            self._set_properties(row, note.properties)
+        self._num_rows += len(notes)
+        return rows
+
+    def _get_number(self, array, row, int_flag):
+        return int(array[row]) if self._int_flags[row] & int_flag else float(array[row])
+
+    def _set_number(self, array, row, int_flag, value):
+        array[row] = value
+        self._set_int_flag(row, int_flag, isinstance(value, int))
+
+    def _set_int_flag(self, row, int_flag, is_int):
+        flags = int(self._int_flags[row])
+        self._int_flags[row] = flags | int_flag if is_int else flags & ~int_flag
+
+    def _set_length(self, row, value):
+        if hasattr(value, "__len__"):
+            self._length_tuples[row] = tuple(value)
+            self._lengths[row] = sum(value)
+            self._set_int_flag(row, _LENGTH_IS_INT, False)
+        else:
+            self._length_tuples.pop(row, None)
+            self._set_number(self._lengths, row, _LENGTH_IS_INT, value)
+
+    def _get_scalar_or_object(self, array, objects, row, int_flag):
+        return objects[row] if row in objects else self._get_number(array, row, int_flag)
+
+    def _set_scalar_or_object(self, array, objects, row, int_flag, value):
+        if isinstance(value, Real):
+            objects.pop(row, None)
+            self._set_number(array, row, int_flag, value)
+        else:
+            # envelopes, chords (and rests, whose pitch is None) show up as NaN in the array
+            objects[row] = value
+            array[row] = numpy.nan
+            self._set_int_flag(row, int_flag, False)
+
+    def _set_properties(self, row, properties):
+        if properties == _get_default_note_properties():
+            # the vast majority of notes have default properties, so these are only created when asked for
+            self._properties.pop(row, None)
+        else:
+            self._properties[row] = properties if isinstance(properties, NotePropertiesDictionary) \
+                else NotePropertiesDictionary.from_unknown_format(properties)
+
+    def _get_properties(self, row):
+        # (rows with default properties get a detached dictionary, which is only stored here if it gets altered)
+        return self._properties[row] if row in self._properties else _DetachedNoteProperties(self, row)
+
+    def _get_rows(self):
+        return self._order[:self._num_notes]
+
+    def _copy_rows(self, rows) -> 'ColumnarVoice':
+        # makes a new ColumnarVoice holding the data in the given rows, in the given order (array speed, except for
+        # the side tables, which are copied over entry by entry)
+        new_voice = ColumnarVoice()
+        new_voice._reserve(len(rows))
+        for array_name in ("_start_beats", "_lengths", "_pitches", "_volumes", "_int_flags"):
+            getattr(new_voice, array_name)[:len(rows)] = getattr(self, array_name)[rows]
+        new_voice._num_rows = new_voice._num_notes = len(rows)
+        new_voice._order[:len(rows)] = numpy.arange(len(rows))
+        for table_name in ("_length_tuples", "_pitch_objects", "_volume_objects", "_properties"):
+            old_table, new_table = getattr(self, table_name), getattr(new_voice, table_name)
+            if len(old_table) > 0:
+                for new_row, old_row in enumerate(rows.tolist()):
+                    if old_row in old_table:
+                        new_table[new_row] = deepcopy(old_table[old_row])
+        return new_voice
+
+    def __len__(self):
+        return self._num_notes
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [_ColumnarNote(self, row) for row in self._get_rows()[index].tolist()]
+        if index < 0:
+            index += self._num_notes
+        if not 0 <= index < self._num_notes:
+            raise IndexError("ColumnarVoice index out of range")
+        return _ColumnarNote(self, int(self._order[index]))
+
+    def __iter__(self):
+        for row in self._get_rows().tolist():
+            yield _ColumnarNote(self, row)
+
+    def __setitem__(self, index, note):
+        if isinstance(index, slice):
+            raise TypeError("ColumnarVoice does not support slice assignment.")
+        if index < 0:
+            index += self._num_notes
+        if not 0 <= index < self._num_notes:
+            raise IndexError("ColumnarVoice assignment index out of range")
+        if isinstance(note, _ColumnarNote) and note._columnar_voice is self:
+            note = note._to_plain_note()
+        self._order[index] = self._add_rows([note])[0]
+        # (as far as a note index is concerned, this is the same as editing the note that was there)
+        self._timing_version += 1
+
+    def __delitem__(self, index):
+        # (the rows themselves are left in place; they just no longer belong to any note)
+        remaining_rows = numpy.delete(self._get_rows(), index)
+        self._order[:len(remaining_rows)] = remaining_rows
+        self._num_notes = len(remaining_rows)
+
+    def insert(self, index: int, note: PerformanceNote) -> None:
+        """
+        Inserts a note at the given index (just like list.insert).
+        """
+        # (as with a list, out of range indices insert at the start or end)
+        index = min(max(index + self._num_notes if index < 0 else index, 0), self._num_notes)
+        row = self._add_rows([note])[0]
+        self._reserve(self._num_notes + 1)
+        self._order[:self._num_notes + 1] = numpy.insert(self._get_rows(), index, row)
+        self._num_notes += 1
+
+    def append(self, note: PerformanceNote) -> None:
+        """
+        Adds a note to the end of this voice (just like list.append).
+        """
+        self.extend((note, ))
+
+    def extend(self, notes: Iterable[PerformanceNote]) -> None:
+        """
+        Adds several notes to the end of this voice (just like list.extend).
+        """
+        rows = self._add_rows(notes)
+        self._reserve(self._num_notes + len(rows))
+        self._order[self._num_notes:self._num_notes + len(rows)] = rows
+        self._num_notes += len(rows)
+
+    def sort(self) -> None:
+        """
+        Sorts the notes by start beat (just like sorting a list of PerformanceNotes). The sort is stable.
+        """
+        rows = self._get_rows()
+        self._order[:self._num_notes] = rows[numpy.argsort(self._start_beats[rows], kind="stable")]
+
+    @property
+    def start_beats(self) -> 'numpy.ndarray':
+        """
+        Array of the start beats of the notes in this voice, in order.
+        """
+        return self._start_beats[self._get_rows()]
+
+    @property
+    def lengths(self) -> 'numpy.ndarray':
+        """
+        Array of the lengths of the notes in this voice, in order. (Lengths consisting of tied segments are summed.)
+        """
+        return self._lengths[self._get_rows()]
+
+    @property
+    def end_beats(self) -> 'numpy.ndarray':
+        """
+        Array of the end beats of the notes in this voice, in order.
+        """
+        rows = self._get_rows()
+        return self._start_beats[rows] + self._lengths[rows]
+
+    @property
+    def pitches(self) -> 'numpy.ndarray':
+        """
+        Array of the pitches of the notes in this voice, in order. Pitches that are not a single number (envelopes,
+        chords and rests) show up as NaN.
+        """
+        return self._pitches[self._get_rows()]
+
+    @property
+    def volumes(self) -> 'numpy.ndarray':
+        """
+        Array of the volumes of the notes in this voice, in order. Volumes that are envelopes show up as NaN.
+        """
+        return self._volumes[self._get_rows()]
+
+    def select(self, selection: Union['numpy.ndarray', Sequence[int]]) -> 'ColumnarVoice':
+        """
+        Returns a new ColumnarVoice containing a selection of the notes in this one. For instance,
+        `voice.select(voice.pitches > 60)` gives the notes above middle C.
+
+        :param selection: either a boolean mask of the same length as this voice, or an array of note indices
+        :return: a new ColumnarVoice, holding copies of the selected notes
+        """
+        return self._copy_rows(self._get_rows()[numpy.asarray(selection)])
+
+    def to_notes(self) -> Sequence[PerformanceNote]:
+        """
+        Returns the notes in this voice as a list of ordinary PerformanceNotes. These share their envelopes and
+        properties with the data stored here.
+        """
+        return [note._to_plain_note() for note in self]
+
+    def __repr__(self):
+        return "ColumnarVoice({})".format(self.to_notes())
+
+
+@lru_cache(1)
+def _get_default_note_properties():
+    return NotePropertiesDictionary()
+
+
+def _get_voice_state(voice) -> tuple:
+    # what a note index remembers about a voice: the voice object itself, its length, and (for a ColumnarVoice) its
+    # count of timing edits
+    return voice, len(voice), getattr(voice, "_timing_version", None)
+
+
+class _NoteIndex:
+    """
+    Merged index of all of the notes in the voices of a PerformancePart, for answering time-range queries without
+    re-sorting. The notes are kept in order of start beat (in the same order that a stable sort of all the voices,
+    one after another, would give), alongside a list of their start beats for bisecting, and a segment tree of the
+    maximum end beat over ranges of notes, which lets us find the notes sounding at a given beat without looking at
+    those that finish before it.
+
+    The index remembers which voice objects it was built from, and how long they were, so that it can tell when the
+    part's voices have been replaced or altered other than through :func:`PerformancePart.add_note`. It also marks
+    each of its notes as belonging to it, so that changing the start beat or length of one of them in place sets
+    `timing_edited` (see :class:`_TimingAttribute`). ColumnarVoices, whose notes are created on the fly, count such
+    changes themselves, and the index remembers the count for each of them.
+
+    :param voices: the dictionary of voices of the part being indexed
+    """
+
+    def __init__(self, voices: dict):
+        self.voice_snapshot = {voice_name: _get_voice_state(voice) for voice_name, voice in voices.items()}
+        self.timing_edited = False
+        notes = list(itertools.chain(*voices.values()))
+        for note in notes:
+            note._note_index = self
+        voice_names = list(itertools.chain(*([voice_name] * len(voice) for voice_name, voice in voices.items())))
+        start_beats = [note.start_beat for note in notes]
+        order = sorted(range(len(notes)), key=start_beats.__getitem__)
+        self.start_beats = [start_beats[i] for i in order]
+        self.notes = [notes[i] for i in order]
+        self.voice_names = [voice_names[i] for i in order]
+        self.end_beats = [note.start_beat + note.length_sum() for note in self.notes]
+        # (as ever, an empty voice counts as ending at zero)
+        self.max_end_beat = max(self.end_beats + [0]) if any(len(voice) == 0 for voice in voices.values()) \
+            else max(self.end_beats, default=0)
+        # segment tree of maximum end beats; built when first needed
+        self._max_end_tree = None
+        # incremented whenever a note is added, so that anything derived from this index can tell it's out of date
+        self.version = 0
+
+    def is_valid_for(self, voices: dict) -> bool:
+        """
+        Whether this index still describes the given voices (as far as can be checked cheaply).
+        """
+        if self.timing_edited:
+            # one of the notes has been moved or resized since this index was built
+            return False
+        return len(voices) == len(self.voice_snapshot) and all(
+            voice_name in self.voice_snapshot and self.voice_snapshot[voice_name][0] is voice
+            and self.voice_snapshot[voice_name][1:] == _get_voice_state(voice)[1:]
+            for voice_name, voice in voices.items()
+        )
+
+    def add(self, note: PerformanceNote, voice_name: str, voices: dict) -> bool:
+        """
+        Updates the index to account for a note having just been added to the given voice.
+
+        :return: True if the index was updated, or False if it can no longer be used and needs rebuilding
+        """
+        voice_state = _get_voice_state(voices[voice_name])
+        # (a voice we haven't seen before must have just been created for this note)
+        previous_voice, previous_length, previous_timing_version = \
+            self.voice_snapshot.get(voice_name, (voice_state[0], 0, voice_state[2]))
+        if previous_voice is not voice_state[0] or previous_length != voice_state[1] - 1 \
+                or previous_timing_version != voice_state[2]:
+            return False
+        self.voice_snapshot[voice_name] = voice_state
+        if not self.is_valid_for(voices):
+            return False
+        note._note_index = self
+
+        start_beat = note.start_beat
+        index = bisect.bisect_left(self.start_beats, start_beat)
+        if index < len(self.start_beats) and self.start_beats[index] == start_beat:
+            # the order of notes that start together depends on which voice they're in; easier just to rebuild
+            return False
+        end_beat = start_beat + note.length_sum()
+        self.start_beats.insert(index, start_beat)
+        self.notes.insert(index, note)
+        self.voice_names.insert(index, voice_name)
+        self.end_beats.insert(index, end_beat)
+        self.max_end_beat = max(self.max_end_beat, end_beat)
+        self.version += 1
+
+        if self._max_end_tree is not None:
+            tree_size = len(self._max_end_tree) // 2
+            if index == len(self.notes) - 1 and index < tree_size:
+                # appended at the end, with room to spare, so just update the path from the new leaf to the root
+                tree_position = tree_size + index
+                while tree_position >= 1 and self._max_end_tree[tree_position] < end_beat:
+                    self._max_end_tree[tree_position] = end_beat
+                    tree_position //= 2
+            else:
+                self._max_end_tree = None
+        return True
+
+    def get_range(self, start_beat: float, stop_beat: float = None) -> Tuple[int, int]:
+        """
+        Returns the range of indices of the notes starting in [start_beat, stop_beat).
+        """
+        start_index = bisect.bisect_left(self.start_beats, start_beat)
+        stop_index = len(self.start_beats) if stop_beat is None \
+            else max(bisect.bisect_left(self.start_beats, stop_beat), start_index)
+        return start_index, stop_index
+
+    def iterate_notes(self, start_index: int, stop_index: int,
+                      selected_voices: set = None) -> Iterator[PerformanceNote]:
+        """
+        Returns an iterator over the notes with indices in the given range, in order.
+
+        :param start_index: index of the first note
+        :param stop_index: index after the last note
+        :param selected_voices: if given, only notes from voices with these names are included
+        """
+        if selected_voices is None:
+            return iter(self.notes[start_index:stop_index])
+        return iter([note for note, voice_name in zip(self.notes[start_index:stop_index],
+                                                      self.voice_names[start_index:stop_index])
+                     if voice_name in selected_voices])
+
+    def get_indices_sounding_at(self, beat: float) -> Sequence[int]:
+        """
+        Returns the indices of the notes that start at or before the given beat and end after it, in order.
+        """
+        if self._max_end_tree is None:
+            self._build_max_end_tree()
+        tree = self._max_end_tree
+        tree_size = len(tree) // 2
+        # only the notes that start at or before the beat are candidates
+        num_candidates = bisect.bisect_right(self.start_beats, beat)
+        out = []
+        # depth-first walk of the tree, in order, skipping any subtree whose notes all end by the given beat
+        stack = [(1, 0, tree_size)]
+        while stack:
+            tree_position, range_start, range_end = stack.pop()
+            if range_start >= num_candidates or tree[tree_position] <= beat:
+                continue
+            if tree_position >= tree_size:
+                out.append(range_start)
+            else:
+                range_middle = (range_start + range_end) // 2
+                stack.append((2 * tree_position + 1, range_middle, range_end))
+                stack.append((2 * tree_position, range_start, range_middle))
+        return out
+
+    def _build_max_end_tree(self):
+        tree_size = 1
+        while tree_size < len(self.end_beats):
+            tree_size *= 2
+        tree = [float("-inf")] * (2 * tree_size)
+        tree[tree_size:tree_size + len(self.end_beats)] = self.end_beats
+        for tree_position in range(tree_size - 1, 0, -1):
+            tree[tree_position] = max(tree[2 * tree_position], tree[2 * tree_position + 1])
+        self._max_end_tree = tree
+
+
+class _ColumnarNoteIndex(_NoteIndex):
+    """
+    Version of :class:`_NoteIndex` for a part whose voices are all :class:`ColumnarVoice` objects. Rather than holding
+    on to a note object for every note, which would undo the memory savings of columnar storage, it keeps arrays of
+    the start beats, end beats, voices and rows of the notes, and only creates the notes asked for by a query. (It is
+    rebuilt, rather than updated, when a note is added, but building it happens at array speed.)
+
+    :param voices: the dictionary of voices of the part being indexed
+    """
+
+    def __init__(self, voices: dict):
+        self.voice_snapshot = {voice_name: _get_voice_state(voice) for voice_name, voice in voices.items()}
+        # (the notes of a ColumnarVoice count their own edits, so there are none to mark here)
+        self.timing_edited = False
+        self.voice_list = list(voices.values())
+        voice_names = list(voices.keys())
+        start_beats = numpy.concatenate([voice.start_beats for voice in self.voice_list])
+        # (a stable sort gives the same order as the ordinary index)
+        order = numpy.argsort(start_beats, kind="stable")
+        self.start_beats = start_beats[order]
+        self.end_beats = numpy.concatenate([voice.end_beats for voice in self.voice_list])[order]
+        self.voice_numbers = numpy.concatenate([numpy.full(len(voice), i, dtype=numpy.int64)
+                                                for i, voice in enumerate(self.voice_list)])[order]
+        self.rows = numpy.concatenate([voice._get_rows() for voice in self.voice_list])[order]
+        self.notes = _IndexedNotes(self)
+        self.voice_names = _IndexedVoiceNames(self, voice_names)
+        max_end_beat = float(self.end_beats.max()) if len(self.end_beats) > 0 else 0
+        # (as ever, an empty voice counts as ending at zero)
+        self.max_end_beat = max(max_end_beat, 0) if any(len(voice) == 0 for voice in self.voice_list) \
+            else max_end_beat
+        self.version = 0
+
+    def add(self, note: PerformanceNote, voice_name: str, voices: dict) -> bool:
+        return False
+
+    def get_range(self, start_beat: float, stop_beat: float = None) -> Tuple[int, int]:
+        start_index = int(numpy.searchsorted(self.start_beats, start_beat, side="left"))
+        stop_index = len(self.start_beats) if stop_beat is None \
+            else max(int(numpy.searchsorted(self.start_beats, stop_beat, side="left")), start_index)
+        return start_index, stop_index
+
+    def iterate_notes(self, start_index: int, stop_index: int,
+                      selected_voices: set = None) -> Iterator[PerformanceNote]:
+        # (the notes are created one at a time, as the iterator gets to them)
+        voice_list, voice_names = self.voice_list, self.voice_names.names
+        for voice_number, row in zip(self.voice_numbers[start_index:stop_index].tolist(),
+                                     self.rows[start_index:stop_index].tolist()):
+            if selected_voices is None or voice_names[voice_number] in selected_voices:
+                yield _ColumnarNote(voice_list[voice_number], row)
+
+    def get_indices_sounding_at(self, beat: float) -> Sequence[int]:
+        num_candidates = int(numpy.searchsorted(self.start_beats, beat, side="right"))
+        return numpy.flatnonzero(self.end_beats[:num_candidates] > beat).tolist()
+
+
+class _IndexedNotes(Sequence):
+    # the notes of a _ColumnarNoteIndex, in order, created as they are accessed
+
+    def __init__(self, note_index: _ColumnarNoteIndex):
+        self.note_index = note_index
+
+    def __len__(self):
+        return len(self.note_index.rows)
+
+    def __getitem__(self, index):
+        voice_list = self.note_index.voice_list
+        if isinstance(index, slice):
+            return [_ColumnarNote(voice_list[voice_number], row) for voice_number, row in
+                    zip(self.note_index.voice_numbers[index].tolist(), self.note_index.rows[index].tolist())]
+        return _ColumnarNote(voice_list[int(self.note_index.voice_numbers[index])], int(self.note_index.rows[index]))
+
+
+class _IndexedVoiceNames(Sequence):
+    # the voice names of the notes of a _ColumnarNoteIndex, in order
+
+    def __init__(self, note_index: _ColumnarNoteIndex, voice_names: Sequence[str]):
+        self.note_index = note_index
+        self.names = voice_names
+
+    def __len__(self):
+        return len(self.note_index.voice_numbers)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.names[voice_number] for voice_number in self.note_index.voice_numbers[index].tolist()]
+        return self.names[int(self.note_index.voice_numbers[index])]
+
+
 class PerformancePart(SavesToJSON):
 
     """
@@ -391,6 +1122,8 @@ class PerformancePart(SavesToJSON):
 
         # a record of the quantization that was applied to this part, if any
         self.voice_quantization_records = voice_quantization_records
+        # merged index of the notes in all voices, for time-range queries; built when first needed
+        self._note_index = None
 
     def add_note(self, note: PerformanceNote, voice: str = None) -> PerformanceNote:
         """
@@ -400,6 +1133,25 @@ class PerformancePart(SavesToJSON):
         :param voice: name of the voice to which to add it (defaults to "_unspecified_")
         :return: the note you just added (for chaining purposes)
         """
+        voice_name = PerformancePart._get_voice_name(note, voice)
+
+        # make sure we have an entry for the desired voice, or create one if not
+        if voice_name not in self.voices:
+            self.voices[voice_name] = ColumnarVoice() if self.uses_columnar_storage() else []
+        voice = self.voices[voice_name]
+
+        last_note_start_beat = voice[-1].start_beat if len(voice) > 0 else 0
+        voice.append(note)
+        if note.start_beat < last_note_start_beat:
+            # always keep self.notes sorted; if we're appending something that shouldn't be at the
+            # very end, we'll need to sort the list after appending. This probably doesn't come up much.
+            voice.sort()  # they are defined to sort by start_beat
+        if self._note_index is not None and not self._note_index.add(note, voice_name, self.voices):
+            self._note_index = None
+        return note
+
+    @staticmethod
+    def _get_voice_name(note, voice=None):
         # the voice kwarg here is only used when reconstructing this from a json serialization
         if voice is not None:
             # if the voice kwarg is given, use it - it should be a string
@@ -417,19 +1169,7 @@ class PerformancePart(SavesToJSON):
             voice_name = str(int(voice_name))
         except ValueError:
             pass
-
-        # make sure we have an entry for the desired voice, or create one if not
-        if voice_name not in self.voices:
-            self.voices[voice_name] = []
-        voice = self.voices[voice_name]
-
-        last_note_start_beat = voice[-1].start_beat if len(voice) > 0 else 0
-        voice.append(note)
-        if note.start_beat < last_note_start_beat:
-            # always keep self.notes sorted; if we're appending something that shouldn't be at the
-            # very end, we'll need to sort the list after appending. This probably doesn't come up much.
-            voice.sort()  # they are defined to sort by start_beat
-        return note
+        return voice_name
 
     def new_note(self, start_beat: float, length, pitch, volume, properties: dict) -> PerformanceNote:
         """
@@ -453,15 +1193,59 @@ class PerformancePart(SavesToJSON):
         self.instrument = instrument
         self._instrument_id = instrument.name, instrument.name_count
 
+    def __getstate__(self):
+        # the note index isn't copied (or pickled) along with the notes; the copy builds its own when needed, which
+        # marks the copied notes as belonging to it
+        state = dict(self.__dict__)
+        state["_note_index"] = None
+        return state
+
+    def _get_note_index(self) -> _NoteIndex:
+        if self._note_index is None or not self._note_index.is_valid_for(self.voices):
+            self._note_index = _ColumnarNoteIndex(self.voices) if len(self.voices) > 0 and \
+                all(isinstance(voice, ColumnarVoice) for voice in self.voices.values()) else _NoteIndex(self.voices)
+        return self._note_index
+
+    def invalidate_note_index(self) -> None:
+        """
+        This part keeps an index of its notes, so that :func:`get_note_iterator`, :func:`get_notes_sounding_at` and
+        :attr:`end_beat` don't have to look through every note. The index notices when notes are added, when voices
+        are added or replaced, and when the start beat or length of one of its notes is changed, but it has no way of
+        knowing when a note in one of the voice lists is swapped for another (e.g. `voice[3] = other_note`) without
+        changing the number of notes; call this after doing so. (A note is only tracked by the index of one part, so
+        the same goes for editing a note that has since been added to another part.)
+        """
+        self._note_index = None
+
     @property
     def end_beat(self) -> float:
         """
         End beat of the last note in this part.
         """
-        if len(self.voices) == 0:
-            return 0
-        return max(max(n.start_beat + n.length_sum() for n in voice) if len(voice) > 0 else 0
-                   for voice in self.voices.values())
+        return self._get_note_index().max_end_beat
+
+    def use_columnar_storage(self) -> 'PerformancePart':
+        """
+        Converts the voices of this part to :class:`ColumnarVoice` objects, which store their notes in numpy arrays.
+        This greatly reduces the memory used by long performances, and allows for fast bulk analysis and filtering
+        of notes. Any voices created afterwards (e.g. by adding notes to a new voice) are columnar as well. Quantizing
+        the part puts the resulting quantized notes back into ordinary lists. Requires numpy.
+
+        :return: self, for chaining purposes
+        """
+        if self.is_quantized():
+            raise ValueError("Cannot use columnar storage for a quantized PerformancePart, since columnar storage "
+                             "keeps start beats and lengths as floats.")
+        for voice_name, voice in self.voices.items():
+            if not isinstance(voice, ColumnarVoice):
+                self.voices[voice_name] = ColumnarVoice(voice)
+        return self
+
+    def uses_columnar_storage(self) -> bool:
+        """
+        Whether or not this part stores its notes in :class:`ColumnarVoice` objects. (See :func:`use_columnar_storage`)
+        """
+        return any(isinstance(voice, ColumnarVoice) for voice in self.voices.values())
 
     def get_note_iterator(self, start_beat: float = 0, stop_beat: float = None,
                           selected_voices: Sequence[str] = None) -> Iterator[PerformanceNote]:
@@ -473,18 +1257,25 @@ class PerformancePart(SavesToJSON):
         :param selected_voices: which voices to take notes from (defaults to all if None)
         :return: an iterator
         """
+        note_index = self._get_note_index()
+        start_index, stop_index = note_index.get_range(start_beat, stop_beat)
         # we can be given a list of voices to play, or if none is specified, we play all of them
-        selected_voices = self.voices.keys() if selected_voices is None else selected_voices
-        all_notes = list(itertools.chain(*[self.voices[x] for x in selected_voices]))
-        all_notes.sort()
+        return note_index.iterate_notes(start_index, stop_index,
+                                        None if selected_voices is None else set(selected_voices))
 
-        def iterator():
-            note_index = bisect.bisect_left(all_notes, start_beat)
-            while note_index < len(all_notes) and (stop_beat is None or all_notes[note_index].start_beat < stop_beat):
-                yield all_notes[note_index]
-                note_index += 1
+    def get_notes_sounding_at(self, beat: float, selected_voices: Sequence[str] = None) -> Sequence[PerformanceNote]:
+        """
+        Returns all of the notes that are sounding at the given beat (i.e. that start at or before it, and end after
+        it), in order of start beat.
 
-        return iterator()
+        :param beat: the beat in question
+        :param selected_voices: which voices to take notes from (defaults to all if None)
+        :return: a list of notes
+        """
+        note_index = self._get_note_index()
+        selected_voices = None if selected_voices is None else set(selected_voices)
+        return [note_index.notes[i] for i in note_index.get_indices_sounding_at(beat)
+                if selected_voices is None or note_index.voice_names[i] in selected_voices]
 
     def play(self, start_beat: float = 0, stop_beat: float = None, instrument: ScampInstrument = None,
              clock: Clock = None, blocking: bool = True, tempo_envelope: TempoEnvelope = None,
@@ -517,31 +1308,8 @@ class PerformancePart(SavesToJSON):
             raise ValueError("Stop beat must be after start beat.")
 
         def _play_thread(child_clock):
-            note_iterator = self.get_note_iterator(start_beat, stop_beat, selected_voices)
-            self.get_note_iterator(start_beat, stop_beat)
-            try:
-                current_note = next(note_iterator)
-            except StopIteration:
-                return
-
-            child_clock.wait(current_note.start_beat - start_beat)
-
-            while True:
-                assert isinstance(current_note, PerformanceNote)
-                if note_filter is not None:
-                    note_filter(current_note).play(instrument, clock=child_clock, blocking=False)
-                else:
-                    current_note.play(instrument, clock=child_clock, blocking=False)
-
-                try:
-                    next_note = next(note_iterator)
-                    child_clock.wait(next_note.start_beat - current_note.start_beat)
-
-                    current_note = next_note
-                except StopIteration:
-                    # when done, wait for the children to finish
-                    child_clock.wait(current_note.length_sum())
-                    return
+            PlaybackEngine([(self.get_note_iterator(start_beat, stop_beat, selected_voices), instrument)],
+                           start_beat, note_filter).run(child_clock)
 
         if blocking:
             # clock blocked ;-)
@@ -569,7 +1337,7 @@ class PerformancePart(SavesToJSON):
 
     def quantize(self, quantization_scheme: QuantizationScheme = "default",
                  onset_weighting: float = "default",
-                 termination_weighting: float = "default") -> 'PerformancePart':
+                 termination_weighting: float = "default", workers: int = None) -> 'PerformancePart':
         """
         Quantizes this PerformancePart according to the quantization_scheme
 
@@ -579,18 +1347,20 @@ class PerformancePart(SavesToJSON):
             value defined in the quantization_settings.
         :param termination_weighting: how much to weight note terminations in the quantization. If "default", uses the
             default value defined in the quantization_settings.
+        :param workers: if greater than 1, voices are quantized in parallel by a pool of this many worker processes.
+            By default, quantization happens serially in this process.
         :return: this PerformancePart, having been quantized
         """
         if quantization_scheme == "default":
             quantization_scheme = QuantizationScheme.from_time_signature(quantization_settings.default_time_signature)
 
         quantize_performance_part(self, quantization_scheme, onset_weighting=onset_weighting,
-                                  termination_weighting=termination_weighting)
+                                  termination_weighting=termination_weighting, workers=workers)
         return self
 
     def quantized(self, quantization_scheme: QuantizationScheme = "default",
                   onset_weighting: float = "default",
-                  termination_weighting: float = "default") -> 'PerformancePart':
+                  termination_weighting: float = "default", workers: int = None) -> 'PerformancePart':
         """
         Same as quantize, except that it returns a new copy, rather than changing this PerformancePart in place.
 
@@ -600,15 +1370,19 @@ class PerformancePart(SavesToJSON):
             value defined in the quantization_settings.
         :param termination_weighting: how much to weight note terminations in the quantization. If "default", uses the
             default value defined in the quantization_settings.
+        :param workers: if greater than 1, voices are quantized in parallel by a pool of this many worker processes.
+            By default, quantization happens serially in this process.
         :return: a quantized copy of this PerformancePart
         """
         if quantization_scheme == "default":
             quantization_scheme = QuantizationScheme.from_time_signature(quantization_settings.default_time_signature)
 
-        copy = PerformancePart(instrument=self.instrument, name=self.name, voices=deepcopy(self.voices),
+        # the copy starts out sharing this part's voices; only those that actually need quantizing (i.e. that aren't
+        # in the quantization cache) get copied before being altered
+        copy = PerformancePart(instrument=self.instrument, name=self.name, voices=self.voices,
                                instrument_id=self._instrument_id)
-        quantize_performance_part(copy, quantization_scheme, onset_weighting=onset_weighting,
-                                  termination_weighting=termination_weighting)
+        _quantize_performance_parts([copy], quantization_scheme, onset_weighting=onset_weighting,
+                                    termination_weighting=termination_weighting, workers=workers, copy_voices=True)
         return copy
 
     def is_quantized(self) -> bool:
@@ -649,19 +1423,21 @@ class PerformancePart(SavesToJSON):
         return 0 if longest_quantization_record is None else \
             len(self._get_longest_quantization_record().quantized_measures)
 
-    def to_staff_group(self) -> StaffGroup:
+    def to_staff_group(self, workers: int = None) -> StaffGroup:
         """
         Converts this PerformancePart to a StaffGroup object.
         (Quantizes in a default way, if necessary, but it should be quantized already.)
 
+        :param workers: if greater than 1, the measures are constructed in parallel by a pool of this many worker
+            processes.
         :return: a new StaffGroup made from this PerformancePart
         """
         if not self.is_quantized():
             logging.warning("PerformancePart was not quantized before calling to_staff_group(); "
                             "quantizing according to default quantization time_signature")
             quantization_scheme = QuantizationScheme.from_time_signature(quantization_settings.default_time_signature)
-            return self.quantized(quantization_scheme).to_staff_group()
-        return StaffGroup.from_quantized_performance_part(self)
+            return self.quantized(quantization_scheme, workers=workers).to_staff_group(workers=workers)
+        return StaffGroup.from_quantized_performance_part(self, workers=workers)
 
     def name_count(self) -> int:
         """
@@ -676,7 +1452,8 @@ class PerformancePart(SavesToJSON):
             "name": self.name,
             "instrument_id": self._instrument_id,
             "clef_preference": self.clef_preference,
-            "voices": self.voices,
+            "voices": {voice_name: voice.to_notes() if isinstance(voice, ColumnarVoice) else voice
+                       for voice_name, voice in self.voices.items()},
             "voice_quantization_records": self.voice_quantization_records
         }
 
@@ -715,6 +1492,8 @@ class Performance(SavesToJSON):
         self.parts = [] if parts is None else parts
         self.tempo_envelope = TempoEnvelope() if tempo_envelope is None else tempo_envelope
         assert isinstance(self.parts, list) and all(isinstance(x, PerformancePart) for x in self.parts)
+        # cached ordering of the notes of all parts, together with a record of the part indices it came from
+        self._note_ordering = None
 
     def new_part(self, instrument: ScampInstrument = None) -> PerformancePart:
         """
@@ -792,23 +1571,46 @@ class Performance(SavesToJSON):
         :param selected_voices: which voices to take notes from (defaults to all if None)
         :return: an iterator
         """
-        part_note_iterators = [p.get_note_iterator(start_beat, stop_beat, selected_voices) for p in self.parts]
-
-        next_notes = []
-        for part_note_iterator in part_note_iterators:
-            try:
-                next_notes.append(next(part_note_iterator))
-            except StopIteration:
-                next_notes.append(None)
-
-        while not all(x is None for x in next_notes):
-            note_to_pop = min(range(len(next_notes)),
-                              key=lambda i: next_notes[i].start_beat if next_notes[i] is not None else float("inf"))
-            yield(next_notes[note_to_pop])
-            try:
-                next_notes[note_to_pop] = next(part_note_iterators[note_to_pop])
-            except StopIteration:
-                next_notes[note_to_pop] = None
+        if any(isinstance(part._get_note_index(), _ColumnarNoteIndex) for part in self.parts):
+            # columnar parts only create their notes when asked for them, so rather than keeping a merged list of every
+            # note, we merge the parts' iterators as we go
+            return heapq.merge(*(part.get_note_iterator(start_beat, stop_beat, selected_voices) for part in self.parts),
+                               key=lambda note: note.start_beat)
+        start_beats, notes, voice_names = self._get_note_ordering()
+        start_index = bisect.bisect_left(start_beats, start_beat)
+        stop_index = len(start_beats) if stop_beat is None \
+            else max(bisect.bisect_left(start_beats, stop_beat), start_index)
+        if selected_voices is None:
+            return iter(notes[start_index:stop_index])
+        selected_voices = set(selected_voices)
+        return iter([note for note, voice_name in zip(notes[start_index:stop_index],
+                                                      voice_names[start_index:stop_index])
+                     if voice_name in selected_voices])
+
+    def _get_note_ordering(self) -> Tuple[Sequence[float], Sequence[PerformanceNote], Sequence[str]]:
+        """
+        Returns lists of the start beats, notes and voice names of all the notes in all the parts, in order of start
+        beat (and, for notes starting together, in order of part). This is made by a k-way merge of the parts' own
+        note indices, and kept until one of those indices changes or the parts themselves change.
+        """
+        part_note_indices = [part._get_note_index() for part in self.parts]
+        snapshot = [(part, note_index, note_index.version) for part, note_index in zip(self.parts, part_note_indices)]
+        if self._note_ordering is not None and len(self._note_ordering[0]) == len(snapshot) and all(
+                part is cached_part and note_index is cached_note_index and version == cached_version
+                for (part, note_index, version), (cached_part, cached_note_index, cached_version)
+                in zip(snapshot, self._note_ordering[0])):
+            return self._note_ordering[1]
+
+        # merge the parts, whose notes are already in order; heapq.merge takes from the earliest part in a tie
+        merged_entries = list(heapq.merge(
+            *(zip(note_index.start_beats, note_index.notes, note_index.voice_names)
+              for note_index in part_note_indices),
+            key=lambda entry: entry[0]
+        ))
+        ordering = ([entry[0] for entry in merged_entries], [entry[1] for entry in merged_entries],
+                    [entry[2] for entry in merged_entries])
+        self._note_ordering = (snapshot, ordering)
+        return ordering
 
     def apply_note_filter(self, filter_function: Callable[['PerformanceNote'], None],
                           start_beat: float = 0, stop_beat: float = None,
@@ -921,11 +1723,20 @@ class Performance(SavesToJSON):
 
         if stop_beat is None:
             stop_beat = max(p.end_beat for p in self.parts)
+        if not stop_beat >= start_beat:
+            raise ValueError("Stop beat must be after start beat.")
+        if not all(isinstance(p.instrument, ScampInstrument) for p in self.parts):
+            raise ValueError("PerformancePart does not have a valid instrument and cannot play.")
 
         def _performance_playback(performance_playback_clock):
-            for p in self.parts:
-                p.play(start_beat, stop_beat, clock=performance_playback_clock, blocking=False,
-                       tempo_envelope=tempo_envelope, note_filter=note_filter)
+            # all of the parts are played by a single engine, running on a single child clock
+            playback_engine = PlaybackEngine(
+                [(p.get_note_iterator(start_beat, stop_beat), p.instrument) for p in self.parts],
+                start_beat, note_filter
+            )
+            engine_clock = performance_playback_clock.fork(playback_engine.run)
+            if tempo_envelope is not None:
+                engine_clock.tempo_envelope.append_envelope(tempo_envelope)
             performance_playback_clock.wait_for_children_to_finish()
 
         if blocking:
@@ -948,8 +1759,18 @@ class Performance(SavesToJSON):
                 part.set_instrument_from_ensemble(ensemble)
         return self
 
+    def use_columnar_storage(self) -> 'Performance':
+        """
+        Converts every part of this Performance to columnar storage (see :func:`PerformancePart.use_columnar_storage`).
+
+        :return: self, for chaining purposes
+        """
+        for part in self.parts:
+            part.use_columnar_storage()
+        return self
+
     def quantize(self, quantization_scheme: QuantizationScheme = "default", onset_weighting: float = "default",
-                 termination_weighting: float = "default") -> 'Performance':
+                 termination_weighting: float = "default", workers: int = None) -> 'Performance':
         """
         Quantizes all parts according to the quantization_scheme
 
@@ -959,19 +1780,26 @@ class Performance(SavesToJSON):
             value defined in the quantization_settings.
         :param termination_weighting: how much to weight note terminations in the quantization. If "default", uses the
             default value defined in the quantization_settings.
+        :param workers: if greater than 1, the voices of all the parts are quantized in parallel by a pool of this many
+            worker processes. By default, quantization happens serially in this process.
         :return: this Performance, having been quantized
         """
         if quantization_scheme == "default":
             logging.warning("No quantization scheme given; quantizing according to default time signature.")
             quantization_scheme = QuantizationScheme.from_time_signature(quantization_settings.default_time_signature)
 
-        for part in self.parts:
-            part.quantize(quantization_scheme, onset_weighting=onset_weighting,
-                          termination_weighting=termination_weighting)
+        if workers is not None and workers > 1:
+            # quantize the voices of all parts with a single pool of workers
+            _quantize_performance_parts(self.parts, quantization_scheme, onset_weighting=onset_weighting,
+                                        termination_weighting=termination_weighting, workers=workers)
+        else:
+            for part in self.parts:
+                part.quantize(quantization_scheme, onset_weighting=onset_weighting,
+                              termination_weighting=termination_weighting)
         return self
 
     def quantized(self, quantization_scheme: QuantizationScheme = "default", onset_weighting: float = "default",
-                  termination_weighting: float = "default") -> 'Performance':
+                  termination_weighting: float = "default", workers: int = None) -> 'Performance':
         """
         Same as quantize, except that it returns a new copy, rather than changing this Performance in place.
 
@@ -981,11 +1809,22 @@ class Performance(SavesToJSON):
             value defined in the quantization_settings.
         :param termination_weighting: how much to weight note terminations in the quantization. If "default", uses the
             default value defined in the quantization_settings.
+        :param workers: if greater than 1, the voices of all the parts are quantized in parallel by a pool of this many
+            worker processes. By default, quantization happens serially in this process.
         :return: a quantized copy of this Performance
         """
         if quantization_scheme == "default":
             quantization_scheme = QuantizationScheme.from_time_signature(quantization_settings.default_time_signature)
 
+        if workers is not None and workers > 1:
+            copy = Performance([PerformancePart(instrument=part.instrument, name=part.name,
+                                                voices=part.voices, instrument_id=part._instrument_id)
+                                for part in self.parts], tempo_envelope=self.tempo_envelope)
+            _quantize_performance_parts(copy.parts, quantization_scheme, onset_weighting=onset_weighting,
+                                        termination_weighting=termination_weighting, workers=workers,
+                                        copy_voices=True)
+            return copy
+
         return Performance([part.quantized(quantization_scheme, onset_weighting=onset_weighting,
                                            termination_weighting=termination_weighting)
                             for part in self.parts], tempo_envelope=self.tempo_envelope)
@@ -1015,7 +1854,7 @@ class Performance(SavesToJSON):
     def to_score(self, quantization_scheme: QuantizationScheme = None, time_signature: Union[str, Sequence] = None,
                  bar_line_locations: Sequence[float] = None, max_divisor: int = None,
                  max_divisor_indigestibility: int = None, simplicity_preference: float = None, title: str = "default",
-                 composer: str = "default") -> Score:
+                 composer: str = "default", workers: int = None) -> Score:
         """
         Convert this Performance (list of note events in continuous time and pitch) to a Score object, which represents
         the music in traditional western notation. In the process, the music must be quantized, for which two different
@@ -1046,14 +1885,73 @@ class Performance(SavesToJSON):
             error) to infinity, with a typical value somewhere around 1.
         :param title: Title of the piece to be printed on the score.
         :param composer: Composer of the piece to be printed on the score.
+        :param workers: if greater than 1, both the quantization and the construction of the score's measures are
+            carried out in parallel by a pool of this many worker processes.
         :return: the resulting Score object, which can then be rendered either as XML or LilyPond
         """
         return Score.from_performance(
             self, quantization_scheme, time_signature=time_signature, bar_line_locations=bar_line_locations,
             max_divisor=max_divisor, max_divisor_indigestibility=max_divisor_indigestibility,
-            simplicity_preference=simplicity_preference, title=title, composer=composer
+            simplicity_preference=simplicity_preference, title=title, composer=composer, workers=workers
         )
 
+    def save_to_binary(self, file_path: str) -> None:
+        """
+        Save this performance to a compact binary file, as an alternative to :func:`save_to_json`. Notes are stored
+        as fixed-width records, with envelopes, chords and note properties kept in a pool in which each distinct
+        entry is stored only once. This makes for much smaller files, which can be loaded much faster (and in part)
+        with :func:`load_from_binary`. Start beats, lengths, pitches and volumes that are neither ints nor floats
+        (e.g. Fractions) are stored as floats.
+
+        :param file_path: path for saving the file
+        """
+        write_performance_file(file_path, self.tempo_envelope, [
+            ({"name": part.name, "instrument_id": part._instrument_id, "clef_preference": part.clef_preference,
+              "voice_quantization_records": part.voice_quantization_records},
+             {voice_name: voice._iter_plain_notes() if isinstance(voice, ColumnarVoice) else voice
+              for voice_name, voice in part.voices.items()})
+            for part in self.parts
+        ])
+
+    @classmethod
+    def load_from_binary(cls, file_path: str, parts: Sequence[Union[int, str]] = None, start_beat: float = None,
+                         stop_beat: float = None, columnar: bool = False) -> 'Performance':
+        """
+        Load a performance from a file saved with :func:`save_to_binary`. The file is memory-mapped, and only the
+        notes asked for are read, so loading a few parts or a short stretch of time from a large file is quick.
+
+        :param file_path: path for loading the file
+        :param parts: indices and/or names of the parts to load (defaults to all parts)
+        :param start_beat: if given, only notes starting at or after this beat are loaded
+        :param stop_beat: if given, only notes starting before this beat are loaded
+        :param columnar: if True, the notes of each voice are loaded straight into :class:`ColumnarVoice` objects,
+            which is much faster for large files (see :func:`PerformancePart.use_columnar_storage`). Quantized parts
+            are loaded as lists of notes regardless. Requires numpy.
+        :return: the loaded Performance
+        """
+        with PerformanceFileReader(file_path) as reader:
+            part_headers = reader.header["parts"]
+            if parts is not None:
+                part_headers = [part_header for i, part_header in enumerate(part_headers)
+                                if i in parts or part_header["name"] in parts]
+            loaded_parts = []
+            for part_header in part_headers:
+                if columnar and part_header["voice_quantization_records"] is None:
+                    voices = {voice_header["name"]: ColumnarVoice._from_columns(
+                        *reader.read_columns(voice_header, start_beat, stop_beat)
+                    ) for voice_header in part_header["voices"]}
+                else:
+                    voices = {voice_header["name"]: [
+                        PerformanceNote(*note_data) for note_data in
+                        reader.read_notes(voice_header, start_beat, stop_beat)
+                    ] for voice_header in part_header["voices"]}
+                loaded_parts.append(PerformancePart(
+                    name=part_header["name"], voices=voices, instrument_id=part_header["instrument_id"],
+                    voice_quantization_records=part_header["voice_quantization_records"],
+                    clef_preference=part_header["clef_preference"]
+                ))
+            return cls(loaded_parts, reader.header["tempo_envelope"])
+
     def _to_dict(self):
         return {"parts": self.parts, "tempo_envelope": self.tempo_envelope}
 
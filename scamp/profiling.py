@@ -0,0 +1,243 @@
+"""
+Module for profiling the notation pipeline. While profiling is on, each stage of the process of turning a
+:class:`~scamp.performance.Performance` into a score and exporting it (quantization, fragment separation, voice
+construction, beat processing and recombination, MusicXML building and export, and LilyPond/abjad conversion)
+records how long it took, how many times it was called and how many notes it handled. The results can be read as a
+:class:`ProfilingReport` and/or received one stage call at a time through a callback. For instance:
+
+.. code-block:: python
+
+    with scamp.profiling.profiling() as report:
+        performance.to_score().export_music_xml("out.xml")
+    print(report)
+
+When profiling is off (the default), all that each stage does is check whether it is on.
+
+Only work done in this process is recorded: when quantization or measure construction is farmed out to a process
+pool, the work done in the pool shows up as part of the stage that started the pool.
+"""
+
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+
+class StageRecord:
+    """
+    Record of the time spent in a single stage of the notation pipeline.
+
+    :param name: name of the stage
+    :ivar name: name of the stage
+    :ivar calls: number of times the stage was carried out
+    :ivar total_time: total wall time (in seconds) spent in the stage, including any stages nested within it
+    :ivar num_notes: total number of notes handled by the stage (summed over all calls), or None if the stage doesn't
+        keep track of notes
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.total_time = 0.0
+        self.num_notes = None
+
+    @property
+    def mean_time(self) -> float:
+        """
+        Average wall time (in seconds) per call to this stage.
+        """
+        return self.total_time / self.calls if self.calls > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        """
+        Returns the contents of this record as a JSON-friendly dictionary.
+        """
+        return {"calls": self.calls, "total_time": self.total_time, "mean_time": self.mean_time,
+                "num_notes": self.num_notes}
+
+    def __repr__(self):
+        return "StageRecord({}, calls={}, total_time={}, num_notes={})".format(
+            repr(self.name), self.calls, self.total_time, self.num_notes
+        )
+
+
+class ProfilingReport:
+    """
+    Collection of :class:`StageRecord` objects, one for each stage of the notation pipeline that was carried out
+    while profiling. Stages appear in the order in which they were first carried out.
+
+    :ivar stages: dictionary mapping stage names to StageRecords
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage_name: str, duration: float, num_notes: Optional[int] = None) -> None:
+        """
+        Adds a single call of a stage to this report.
+
+        :param stage_name: name of the stage
+        :param duration: wall time (in seconds) that the call took
+        :param num_notes: number of notes that the call handled (or None if not known)
+        """
+        with self._lock:
+            if stage_name not in self.stages:
+                self.stages[stage_name] = StageRecord(stage_name)
+            stage_record = self.stages[stage_name]
+            stage_record.calls += 1
+            stage_record.total_time += duration
+            if num_notes is not None:
+                stage_record.num_notes = num_notes if stage_record.num_notes is None \
+                    else stage_record.num_notes + num_notes
+
+    def clear(self) -> None:
+        """
+        Removes all stage records from this report.
+        """
+        with self._lock:
+            self.stages.clear()
+
+    def to_dict(self) -> dict:
+        """
+        Returns the contents of this report as a JSON-friendly dictionary, mapping stage names to dictionaries of
+        calls, total_time, mean_time and num_notes.
+        """
+        with self._lock:
+            return {stage_name: stage_record.to_dict() for stage_name, stage_record in self.stages.items()}
+
+    def __str__(self):
+        with self._lock:
+            stage_records = list(self.stages.values())
+        if len(stage_records) == 0:
+            return "ProfilingReport(no stages recorded)"
+        name_width = max(len("stage"), max(len(stage_record.name) for stage_record in stage_records))
+        lines = ["{:<{}}  {:>8}  {:>12}  {:>12}  {:>10}".format("stage", name_width, "calls", "total (s)",
+                                                                "mean (s)", "notes")]
+        for stage_record in stage_records:
+            lines.append("{:<{}}  {:>8}  {:>12.6f}  {:>12.6f}  {:>10}".format(
+                stage_record.name, name_width, stage_record.calls, stage_record.total_time, stage_record.mean_time,
+                "-" if stage_record.num_notes is None else stage_record.num_notes
+            ))
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return "ProfilingReport({})".format(list(self.stages.values()))
+
+
+class _Profiler:
+    """
+    The state of an active profiling session: the report being filled in, the callback (if any), and which stages
+    are in progress in each thread, so that a stage that calls itself (or calls another function belonging to the
+    same stage) is only recorded once. It also remembers the process it belongs to, since worker processes forked
+    while profiling inherit it, and shouldn't record anything (or call the callback).
+    """
+
+    def __init__(self, report: ProfilingReport, callback: Optional[Callable[[str, float, Optional[int]], None]]):
+        self.report = report
+        self.callback = callback
+        self.process_id = os.getpid()
+        self._thread_local = threading.local()
+
+    def stages_in_progress(self) -> set:
+        if not hasattr(self._thread_local, "stages_in_progress"):
+            self._thread_local.stages_in_progress = set()
+        return self._thread_local.stages_in_progress
+
+    def record(self, stage_name, duration, num_notes):
+        self.report.record(stage_name, duration, num_notes)
+        if self.callback is not None:
+            self.callback(stage_name, duration, num_notes)
+
+
+# the _Profiler for the active profiling session, or None when profiling is off
+_active_profiler = None
+
+
+def start_profiling(callback: Callable[[str, float, Optional[int]], None] = None,
+                    report: ProfilingReport = None) -> ProfilingReport:
+    """
+    Turns on profiling of the notation pipeline. (If it was already on, the previous session is replaced.)
+
+    :param callback: optional function to be called after each call of each stage, with the arguments (stage_name,
+        duration, num_notes), where duration is the wall time in seconds and num_notes may be None for stages that
+        don't keep track of notes
+    :param report: the ProfilingReport to add to; if None, a new, empty report is created
+    :return: the ProfilingReport that is filled in as stages are carried out
+    """
+    global _active_profiler
+    report = ProfilingReport() if report is None else report
+    _active_profiler = _Profiler(report, callback)
+    return report
+
+
+def stop_profiling() -> Optional[ProfilingReport]:
+    """
+    Turns off profiling of the notation pipeline.
+
+    :return: the ProfilingReport of the session that was stopped, or None if profiling wasn't on
+    """
+    global _active_profiler
+    profiler, _active_profiler = _active_profiler, None
+    return None if profiler is None else profiler.report
+
+
+def is_profiling() -> bool:
+    """
+    Whether or not profiling of the notation pipeline is currently on.
+    """
+    return _active_profiler is not None
+
+
+@contextmanager
+def profiling(callback: Callable[[str, float, Optional[int]], None] = None) -> ProfilingReport:
+    """
+    Context manager that profiles the notation pipeline within its block, yielding the ProfilingReport that is
+    filled in. Whatever profiling session (if any) was active beforehand is restored at the end of the block.
+
+    :param callback: optional function to be called after each call of each stage (see :func:`start_profiling`)
+    """
+    global _active_profiler
+    previous_profiler = _active_profiler
+    report = start_profiling(callback)
+    try:
+        yield report
+    finally:
+        _active_profiler = previous_profiler
+
+
+def _profiled_stage(stage_name: str, count_notes: Callable[..., Optional[int]] = None):
+    """
+    Decorator marking a function as (part of) a stage of the notation pipeline to be profiled. When profiling is off,
+    the decorated function does nothing more than check that this is the case before calling the original.
+
+    :param stage_name: name of the stage, as it appears in the ProfilingReport. Several functions can belong to the
+        same stage, in which case a call to one of them from within another is not recorded separately.
+    :param count_notes: optional function that is passed the same arguments as the decorated function and returns the
+        number of notes being handled. It is only called while profiling.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def profiled_function(*args, **kwargs):
+            profiler = _active_profiler
+            if profiler is None:
+                return function(*args, **kwargs)
+            stages_in_progress = profiler.stages_in_progress()
+            if stage_name in stages_in_progress or profiler.process_id != os.getpid():
+                return function(*args, **kwargs)
+
+            num_notes = count_notes(*args, **kwargs) if count_notes is not None else None
+            stages_in_progress.add(stage_name)
+            start_time = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                duration = time.perf_counter() - start_time
+                stages_in_progress.discard(stage_name)
+                profiler.record(stage_name, duration, num_notes)
+
+        return profiled_function
+
+    return decorator
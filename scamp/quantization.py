@@ -4,16 +4,52 @@ Module containing classes and functions related to the quantization of performan
 """
 
 from fractions import Fraction
+from bisect import bisect_left, bisect_right, insort
 from .utilities import indigestibility, is_multiple, is_x_pow_of_y, round_to_multiple, sum_nested_list, prime_factor, \
-    SavesToJSON, memoize
+    SavesToJSON, LRUCache
 from ._metric_structure import MetricStructure
 from collections import namedtuple
-from .settings import quantization_settings, engraving_settings
+from .settings import quantization_settings, engraving_settings, QuantizationSettings, EngravingSettings
 from expenvelope import Envelope
-from ._dependencies import abjad
+from ._dependencies import abjad, numpy
+from ._package_info import version as _scamp_version
+from .profiling import _profiled_stage
 from numbers import Number
 from typing import Sequence, Union, Tuple, Iterator
 import textwrap
+import heapq
+import hashlib
+import pickle
+import os
+import multiprocessing
+import threading
+import logging
+from copy import deepcopy
+
+
+class _FreezableMixin:
+    """
+    Mixin for objects that get interned and shared between callers (like the schemes constructed by
+    :func:`MeasureQuantizationScheme.from_time_signature`). Once frozen, their attributes can no longer be set, so
+    that one caller can't alter what every other caller sees. Copies (and unpickled objects) are not frozen.
+    """
+
+    _frozen = False
+
+    def _freeze(self):
+        object.__setattr__(self, "_frozen", True)
+        return self
+
+    def __setattr__(self, name, value):
+        if self._frozen:
+            raise AttributeError("Can't set '{}': this {} is interned and shared, so it is read-only. (Make a copy "
+                                 "to alter it.)".format(name, type(self).__name__))
+        super().__setattr__(name, value)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop("_frozen", None)
+        return state
 
 
 ##################################################################################################################
@@ -21,7 +57,7 @@ import textwrap
 ##################################################################################################################
 
 
-class TimeSignature(SavesToJSON):
+class TimeSignature(_FreezableMixin, SavesToJSON):
     """
     Class representing the time signature of a measure
 
@@ -160,7 +196,14 @@ class TimeSignature(SavesToJSON):
 ##################################################################################################################
 
 
-class BeatQuantizationScheme:
+# small caches used to intern quantization schemes (and the values that go into building them), so that constructing
+# the same scheme a second time amounts to a dictionary lookup
+_divisor_indigestibility_cache = LRUCache(256)
+_beat_scheme_cache = LRUCache(256)
+_measure_scheme_cache = LRUCache(128)
+
+
+class BeatQuantizationScheme(_FreezableMixin):
     """
     Scheme for making a decision about which divisor to use to quantize a beat
 
@@ -208,19 +251,29 @@ class BeatQuantizationScheme:
     def from_max_divisor(cls, length: float, max_divisor: int,
                          simplicity_preference: float = "default") -> 'BeatQuantizationScheme':
         """
-        Takes a max divisor argument instead of a list of allowed divisors.
+        Takes a max divisor argument instead of a list of allowed divisors. Schemes constructed this way are interned
+        and shared between callers, so they are read-only.
 
         :param length: In quarter-notes
         :param max_divisor: The largest allowable divisor
         :param simplicity_preference: Preference for simple divisors (see class description)
         """
-        return cls(length, range(2, max_divisor + 1), simplicity_preference)
+        if simplicity_preference == "default":
+            simplicity_preference = quantization_settings.simplicity_preference
+
+        def _create():
+            beat_scheme = cls(length, range(2, max_divisor + 1), simplicity_preference)
+            beat_scheme.quantization_divisions = tuple(beat_scheme.quantization_divisions)
+            return beat_scheme._freeze()
+
+        return _beat_scheme_cache.get_or_create((cls, float(length), max_divisor, None, simplicity_preference), _create)
 
     @classmethod
     def from_max_divisor_indigestibility(cls, length: float, max_divisor: int, max_divisor_indigestibility: float,
                                          simplicity_preference: float = "default") -> 'BeatQuantizationScheme':
         """
-        Takes a max_divisor and max_divisor_indigestibility to determine the list of divisors.
+        Takes a max_divisor and max_divisor_indigestibility to determine the list of divisors. Schemes constructed
+        this way are interned and shared between callers, so they are read-only.
 
         :param length: In quarter-notes
         :param max_divisor: The largest allowable divisor
@@ -232,22 +285,27 @@ class BeatQuantizationScheme:
         if simplicity_preference == "default":
             simplicity_preference = quantization_settings.simplicity_preference
 
-        # look at all possible divisors and the indigestibilities
-        all_divisors = range(2, max_divisor + 1)
-        all_indigestibilities = BeatQuantizationScheme._get_divisor_indigestibilities(length, all_divisors)
-
-        # keep only those that fall below the max_divisor_indigestibility
-        quantization_divisions = []
-        div_indigestibilities = []
-        for div, div_indigestibility in zip(all_divisors, all_indigestibilities):
-            if div_indigestibility <= max_divisor_indigestibility:
-                quantization_divisions.append(div)
-                div_indigestibilities.append(div_indigestibility)
-
-        return cls(length, list(zip(
-            quantization_divisions,
-            BeatQuantizationScheme._get_divisor_undesirabilities(div_indigestibilities, simplicity_preference)
-        )))
+        def _create():
+            # look at all possible divisors and the indigestibilities
+            all_divisors = range(2, max_divisor + 1)
+            all_indigestibilities = BeatQuantizationScheme._get_divisor_indigestibilities(length, all_divisors)
+
+            # keep only those that fall below the max_divisor_indigestibility
+            quantization_divisions = []
+            div_indigestibilities = []
+            for div, div_indigestibility in zip(all_divisors, all_indigestibilities):
+                if div_indigestibility <= max_divisor_indigestibility:
+                    quantization_divisions.append(div)
+                    div_indigestibilities.append(div_indigestibility)
+
+            return cls(length, tuple(zip(
+                quantization_divisions,
+                BeatQuantizationScheme._get_divisor_undesirabilities(div_indigestibilities, simplicity_preference)
+            )))._freeze()
+
+        return _beat_scheme_cache.get_or_create(
+            (cls, float(length), max_divisor, max_divisor_indigestibility, simplicity_preference), _create
+        )
 
     @staticmethod
     def _get_divisor_indigestibilities(length: float, divisors: Sequence[int]) -> Sequence[float]:
@@ -276,19 +334,23 @@ class BeatQuantizationScheme:
         :return: list of relative indigestibilities corresponding to each divisor
         """
 
-        length_fraction = Fraction(length).limit_denominator()
-        out = []
-        for div in divisors:
-            relative_division = Fraction(div, length_fraction.numerator)
-            divisor_indigestibility = indigestibility(relative_division.numerator) + \
-                                      indigestibility(relative_division.denominator)
+        def _calculate():
+            length_fraction = Fraction(length).limit_denominator()
+            out = []
+            for div in divisors:
+                relative_division = Fraction(div, length_fraction.numerator)
+                divisor_indigestibility = indigestibility(relative_division.numerator) + \
+                                          indigestibility(relative_division.denominator)
 
-            # ensures not zeroing out of indigestibility as described in the docstring
-            if length_fraction.numerator > 1:
-                divisor_indigestibility += 1
+                # ensures not zeroing out of indigestibility as described in the docstring
+                if length_fraction.numerator > 1:
+                    divisor_indigestibility += 1
 
-            out.append(divisor_indigestibility)
-        return out
+                out.append(divisor_indigestibility)
+            return tuple(out)
+
+        divisors = tuple(divisors)
+        return list(_divisor_indigestibility_cache.get_or_create((float(length), divisors), _calculate))
 
     @staticmethod
     def _get_divisor_undesirabilities(divisor_indigestibilities, simplicity_preference):
@@ -305,7 +367,7 @@ class BeatQuantizationScheme:
         )
 
 
-class MeasureQuantizationScheme:
+class MeasureQuantizationScheme(_FreezableMixin):
     """
     Scheme for quantizing a measure, including beat lengths and which beat divisors to allow.
 
@@ -331,6 +393,8 @@ class MeasureQuantizationScheme:
             if sum_nested_list(beat_groupings) != len(beat_schemes):
                 raise ValueError("Wrong number of beats in beat groupings.")
             self.beat_groupings = MetricStructure(*beat_groupings)
+        # cache of the results of get_beat_hierarchies, keyed by subdivision length
+        self._beat_hierarchies = {}
 
     @classmethod
     def from_time_signature(cls, time_signature: Union[TimeSignature, str, float], max_divisor: int = "default",
@@ -338,7 +402,9 @@ class MeasureQuantizationScheme:
                             simplicity_preference: float = "default") -> 'MeasureQuantizationScheme':
         """
         Constructs a MeasureQuantizationScheme from a time signature.
-        All beats will follow the same quantization scheme, as dictated by the parameters.
+        All beats will follow the same quantization scheme, as dictated by the parameters. Schemes constructed this
+        way are interned and shared between callers (so building the same one twice is nearly free), and are
+        therefore read-only.
 
         :param time_signature: Either a TimeSignature object or something that can be interpreted as such (e.g. a
             string to parse as a time signature, a measure length)
@@ -348,12 +414,14 @@ class MeasureQuantizationScheme:
         :param simplicity_preference: the simplicity preference for all beats in the is measure
             (see :class:`BeatQuantizationScheme`)
         """
-        # load default settings if not specified (the default simplicity_preference gets loaded
-        # later in the constructor of BeatQuantizationScheme if nothing is specified here)
+        # load default settings if not specified (these are resolved up front, since they form part of the key
+        # under which the resulting scheme is interned)
         if max_divisor == "default":
             max_divisor = quantization_settings.max_divisor
         if max_divisor_indigestibility == "default":
             max_divisor_indigestibility = quantization_settings.max_divisor_indigestibility
+        if simplicity_preference == "default":
+            simplicity_preference = quantization_settings.simplicity_preference
 
         # allow for different formulations of the time signature argument
         if isinstance(time_signature, str):
@@ -365,21 +433,33 @@ class MeasureQuantizationScheme:
 
         assert isinstance(time_signature, TimeSignature)
 
-        # now we convert the beat lengths to BeatQuantizationSchemes and construct our object
-        if max_divisor_indigestibility is None:
-            # no max_divisor_indigestibility, so just use the max divisor
-            beat_schemes = [
-                BeatQuantizationScheme.from_max_divisor(beat_length, max_divisor, simplicity_preference)
-                for beat_length in time_signature.beat_lengths
-            ]
-        else:
-            # using a max_divisor_indigestibility
-            beat_schemes = [
-                BeatQuantizationScheme.from_max_divisor_indigestibility(
-                    beat_length, max_divisor, max_divisor_indigestibility, simplicity_preference)
-                for beat_length in time_signature.beat_lengths
-            ]
-        return cls(beat_schemes, time_signature)
+        def _create():
+            # convert the beat lengths to BeatQuantizationSchemes and construct our object
+            if max_divisor_indigestibility is None:
+                # no max_divisor_indigestibility, so just use the max divisor
+                beat_schemes = tuple(
+                    BeatQuantizationScheme.from_max_divisor(beat_length, max_divisor, simplicity_preference)
+                    for beat_length in time_signature.beat_lengths
+                )
+            else:
+                # using a max_divisor_indigestibility
+                beat_schemes = tuple(
+                    BeatQuantizationScheme.from_max_divisor_indigestibility(
+                        beat_length, max_divisor, max_divisor_indigestibility, simplicity_preference)
+                    for beat_length in time_signature.beat_lengths
+                )
+            # (the scheme gets its own, read-only, copy of the time signature, rather than sharing the first caller's)
+            scheme_time_signature = TimeSignature(
+                tuple(time_signature.numerator) if hasattr(time_signature.numerator, "__len__")
+                else time_signature.numerator, time_signature.denominator, tuple(time_signature.beat_lengths)
+            )._freeze()
+            return cls(beat_schemes, scheme_time_signature)._freeze()
+
+        return _measure_scheme_cache.get_or_create(
+            (cls, time_signature.as_string(), tuple(time_signature.beat_lengths),
+             max_divisor, max_divisor_indigestibility, simplicity_preference),
+            _create
+        )
 
     def _generate_default_beat_groupings(self):
         # break it into groups of beats of the same length
@@ -404,23 +484,27 @@ class MeasureQuantizationScheme:
             for group in groups
         ))
 
-    @memoize
     def get_beat_hierarchies(self, subdivision_length: float) -> Sequence[int]:
         """
         Generates a list of hierarchies representing how nested a subdivision is within the metric structure.
         For instance, if called on a 4/4 measure, with subdivision_length, 0.5, this will return the list
         [0, 3, 2, 3, 1, 3, 2, 3], showing that the first subdivision (downbeat) is the strongest, the 5th (3rd beat)
-        is one level down, etc.
+        is one level down, etc. The result is cached on this scheme, so it should not be modified.
 
         :param subdivision_length: length (in quarter notes) of the subdivision
         """
+        if subdivision_length in self._beat_hierarchies:
+            return self._beat_hierarchies[subdivision_length]
         if not is_x_pow_of_y(subdivision_length, 2):
             raise ValueError("Bad subdivision length.")
         beat_metric_layers = [
             MeasureQuantizationScheme._get_beat_metric_layer(beat_scheme.length, subdivision_length)
             for beat_scheme in self.beat_schemes
         ]
-        return MeasureQuantizationScheme._inscribe_beats(self.beat_groupings, beat_metric_layers).get_beat_depths()
+        beat_hierarchies = MeasureQuantizationScheme._inscribe_beats(
+            self.beat_groupings, beat_metric_layers).get_beat_depths()
+        self._beat_hierarchies[subdivision_length] = beat_hierarchies
+        return beat_hierarchies
 
     @staticmethod
     def _get_beat_metric_layer(beat_length, subdivision_length):
@@ -487,18 +571,39 @@ class QuantizationScheme:
     :param measure_schemes: list of MeasureQuantizationSchemes to use
     :param loop: if True, loops through the list of MeasureQuantizationSchemes; if False, keeps reusing the last
         MeasureQuantizationScheme given after it reaches the end of the list
+    :param mode: how the beat divisors are chosen. In "greedy" mode, each beat gets whichever divisor best fits the
+        onsets, terminations and inner splits within it. In "global" mode, the divisors of all beats are chosen
+        together by dynamic programming (in the spirit of Paul Nauert's Q-Grid), which also takes into account the
+        distortion that results when a short note gets squeezed to nothing and has to be stretched out again.
+    :param beam_width: (only relevant in "global" mode) how many of the candidate divisors of each beat to carry
+        forward in the search. If None, all of them are, and the search is exact; smaller values make it faster. Either
+        way, the cost of the search grows linearly with the number of beats.
+    :ivar measure_schemes: list of MeasureQuantizationSchemes to use
+    :ivar loop: whether or not we loop through the list of MeasureQuantizationSchemes
+    :ivar mode: either "greedy" or "global" (see above)
+    :ivar beam_width: beam width of the search in "global" mode
     """
 
-    def __init__(self, measure_schemes: Sequence[MeasureQuantizationScheme], loop: bool = False):
+    def __init__(self, measure_schemes: Sequence[MeasureQuantizationScheme], loop: bool = False,
+                 mode: str = "greedy", beam_width: int = None):
         assert all(isinstance(x, MeasureQuantizationScheme) for x in measure_schemes)
+        if mode not in ("greedy", "global"):
+            raise ValueError("Quantization mode must be either \"greedy\" or \"global\".")
+        if beam_width is not None and beam_width < 1:
+            raise ValueError("Beam width must be at least 1.")
         self.measure_schemes = measure_schemes
         self.loop = loop
+        self.mode = mode
+        self.beam_width = beam_width
+        # lazily materialized BeatGrid (see get_beat_grid), along with what it was built from
+        self._beat_grid = None
+        self._beat_grid_source = None
 
     @classmethod
     def from_attributes(cls, time_signature: Union[str, TimeSignature, Sequence] = None,
                         bar_line_locations: Sequence[float] = None, max_divisor: int = None,
-                        max_divisor_indigestibility: float = None,
-                        simplicity_preference: float = None) -> 'QuantizationScheme':
+                        max_divisor_indigestibility: float = None, simplicity_preference: float = None,
+                        mode: str = "greedy", beam_width: int = None) -> 'QuantizationScheme':
         """
         Constructs a QuantizationScheme from some key attributes.
 
@@ -512,6 +617,9 @@ class QuantizationScheme:
             (see :class:`BeatQuantizationScheme`)
         :param simplicity_preference: the simplicity preference for all beats in the is measure
             (see :class:`BeatQuantizationScheme`)
+        :param mode: either "greedy" or "global"; determines how beat divisors are chosen (see
+            :class:`QuantizationScheme`)
+        :param beam_width: the beam width used in "global" mode (see :class:`QuantizationScheme`)
         """
         if bar_line_locations is not None:
             if time_signature is not None:
@@ -538,17 +646,17 @@ class QuantizationScheme:
                 loop = True
             quantization_scheme = QuantizationScheme.from_time_signature_list(
                 time_signature, max_divisor=max_divisor, max_divisor_indigestibility=max_divisor_indigestibility,
-                simplicity_preference=simplicity_preference, loop=loop)
+                simplicity_preference=simplicity_preference, loop=loop, mode=mode, beam_width=beam_width)
         else:
             quantization_scheme = QuantizationScheme.from_time_signature(
                 time_signature, max_divisor=max_divisor, max_divisor_indigestibility=max_divisor_indigestibility,
-                simplicity_preference=simplicity_preference)
+                simplicity_preference=simplicity_preference, mode=mode, beam_width=beam_width)
         return quantization_scheme
 
     @classmethod
     def from_time_signature(cls, time_signature: Union[str, TimeSignature], max_divisor: int = "default",
-                            max_divisor_indigestibility: float = "default",
-                            simplicity_preference: float = "default") -> 'QuantizationScheme':
+                            max_divisor_indigestibility: float = "default", simplicity_preference: float = "default",
+                            mode: str = "greedy", beam_width: int = None) -> 'QuantizationScheme':
         """
         Constructs a QuantizationScheme using a single time signature for the whole piece.
 
@@ -559,16 +667,20 @@ class QuantizationScheme:
             (see :class:`BeatQuantizationScheme`)
         :param simplicity_preference: the simplicity preference for all beats in the is measure
             (see :class:`BeatQuantizationScheme`)
+        :param mode: either "greedy" or "global"; determines how beat divisors are chosen (see
+            :class:`QuantizationScheme`)
+        :param beam_width: the beam width used in "global" mode (see :class:`QuantizationScheme`)
         """
         return cls.from_time_signature_list(
             [time_signature], max_divisor=max_divisor, max_divisor_indigestibility=max_divisor_indigestibility,
-            simplicity_preference=simplicity_preference
+            simplicity_preference=simplicity_preference, mode=mode, beam_width=beam_width
         )
 
     @classmethod
     def from_time_signature_list(cls, time_signatures_list: Sequence, loop: bool = False, max_divisor: int = "default",
                                  max_divisor_indigestibility: float = "default",
-                                 simplicity_preference: float = "default") -> 'QuantizationScheme':
+                                 simplicity_preference: float = "default", mode: str = "greedy",
+                                 beam_width: int = None) -> 'QuantizationScheme':
         """
         Constructs a QuantizationScheme using a list of time signatures
 
@@ -581,6 +693,9 @@ class QuantizationScheme:
             (see :class:`BeatQuantizationScheme`)
         :param simplicity_preference: the simplicity preference for all beats in the is measure
             (see :class:`BeatQuantizationScheme`)
+        :param mode: either "greedy" or "global"; determines how beat divisors are chosen (see
+            :class:`QuantizationScheme`)
+        :param beam_width: the beam width used in "global" mode (see :class:`QuantizationScheme`)
         """
         measure_schemes = []
         for time_signature in time_signatures_list:
@@ -589,7 +704,7 @@ class QuantizationScheme:
                                                               max_divisor_indigestibility=max_divisor_indigestibility,
                                                               simplicity_preference=simplicity_preference)
             )
-        return cls(measure_schemes, loop=loop)
+        return cls(measure_schemes, loop=loop, mode=mode, beam_width=beam_width)
 
     def measure_scheme_iterator(self) -> Iterator[Tuple[MeasureQuantizationScheme, float]]:
         """
@@ -616,6 +731,144 @@ class QuantizationScheme:
                 yield beat_scheme, t
                 t += beat_scheme.length
 
+    def get_beat_grid(self, horizon: float) -> 'BeatGrid':
+        """
+        Returns a :class:`BeatGrid` of arrays describing every beat of this QuantizationScheme that starts at or
+        before the given horizon. (These are numpy arrays if numpy is available, and lists otherwise.) The arrays are
+        materialized lazily, in chunks, and reused by later calls, so asking for a horizon that has already been
+        covered costs almost nothing.
+
+        :param horizon: the time (in quarter notes since the start) up to which beats are needed
+        """
+        # the grid is rebuilt if the measure schemes have been changed or reassigned. (We hold on to the measure scheme
+        # objects themselves, rather than their ids, which could be reused by other objects once they are collected.)
+        beat_grid = self._beat_grid
+        if beat_grid is None or not self._beat_grid_source_matches():
+            beat_grid = _BeatGridBuilder(self.measure_schemes, self.loop)
+            self._beat_grid, self._beat_grid_source = beat_grid, (self.loop, tuple(self.measure_schemes))
+        return beat_grid.get(horizon)
+
+    def _beat_grid_source_matches(self) -> bool:
+        loop, measure_schemes = self._beat_grid_source
+        return loop == self.loop and len(measure_schemes) == len(self.measure_schemes) and \
+            all(a is b for a, b in zip(measure_schemes, self.measure_schemes))
+
+
+BeatGrid = namedtuple("BeatGrid", "start_beats lengths scheme_indices beat_schemes")
+BeatGrid.__doc__ = """Parallel arrays describing the beats of a :class:`QuantizationScheme` (named tuple)
+
+:param start_beats: the start beat of each beat, relative to the whole performance
+:param lengths: the length of each beat in quarter notes
+:param scheme_indices: for each beat, the index of its :class:`BeatQuantizationScheme` within beat_schemes
+:param beat_schemes: the distinct positions that a beat can occupy in the quantization scheme (one entry per beat
+    of the measures that are not repeated, followed by one per beat of the measures that are)
+"""
+
+
+class _BeatGridBuilder:
+    """
+    Materializes the beats of a QuantizationScheme as arrays. The beats consist of a prefix that plays once, followed
+    by a cycle that repeats forever (when looping, the prefix is empty and the cycle consists of all the measures;
+    otherwise the prefix is every measure but the last, and the cycle is the last one). Thus the n-th beat of the
+    cycle part can be found directly, by modular indexing, and the arrays can be extended chunk by chunk as needed.
+
+    :param measure_schemes: the measure schemes of the QuantizationScheme
+    :param loop: whether the QuantizationScheme loops
+    """
+
+    #: minimum number of beats to materialize at a time
+    chunk_size = 256
+
+    def __init__(self, measure_schemes, loop):
+        prefix_measures = [] if loop else measure_schemes[:-1]
+        cycle_measures = measure_schemes if loop else measure_schemes[-1:]
+        prefix_beat_schemes = [beat_scheme for measure_scheme in prefix_measures
+                               for beat_scheme in measure_scheme.beat_schemes]
+        cycle_beat_schemes = [beat_scheme for measure_scheme in cycle_measures
+                              for beat_scheme in measure_scheme.beat_schemes]
+        self.beat_schemes = tuple(prefix_beat_schemes + cycle_beat_schemes)
+        self.num_prefix_beats = len(prefix_beat_schemes)
+        self.num_cycle_beats = len(cycle_beat_schemes)
+
+        # start times of the beats of the prefix (relative to the start) and of the cycle (relative to its own start)
+        self.prefix_offsets = []
+        t = 0
+        for beat_scheme in prefix_beat_schemes:
+            self.prefix_offsets.append(t)
+            t += beat_scheme.length
+        self.prefix_length = t
+        self.cycle_offsets = []
+        t = 0
+        for beat_scheme in cycle_beat_schemes:
+            self.cycle_offsets.append(t)
+            t += beat_scheme.length
+        self.cycle_length = t
+
+        self.lengths_by_position = [beat_scheme.length for beat_scheme in self.beat_schemes]
+        # the arrays materialized so far; these are replaced (never altered) when extended, so that a grid that has
+        # been handed out stays valid
+        self._grid = self._materialize(0, 0)
+
+    def get(self, horizon):
+        grid = self._grid
+        num_beats = len(grid.start_beats)
+        if num_beats > 0 and grid.start_beats[-1] + grid.lengths[-1] > horizon:
+            return self._truncate(grid, horizon)
+        # figure out how many beats we need, and materialize in chunks of at least chunk_size
+        needed_num_beats = max(self._num_beats_until(horizon), num_beats + _BeatGridBuilder.chunk_size, 2 * num_beats)
+        new_grid = self._materialize(num_beats, needed_num_beats)
+        if numpy is not None:
+            grid = BeatGrid(numpy.concatenate((grid.start_beats, new_grid.start_beats)),
+                            numpy.concatenate((grid.lengths, new_grid.lengths)),
+                            numpy.concatenate((grid.scheme_indices, new_grid.scheme_indices)), self.beat_schemes)
+        else:
+            grid = BeatGrid(grid.start_beats + new_grid.start_beats, grid.lengths + new_grid.lengths,
+                            grid.scheme_indices + new_grid.scheme_indices, self.beat_schemes)
+        self._grid = grid
+        return self._truncate(grid, horizon)
+
+    def _num_beats_until(self, horizon):
+        # number of beats whose start is at or before the horizon (an overestimate is fine)
+        if horizon < self.prefix_length or self.num_cycle_beats == 0:
+            return self.num_prefix_beats
+        num_cycles = int((horizon - self.prefix_length) // self.cycle_length) + 1
+        return self.num_prefix_beats + num_cycles * self.num_cycle_beats
+
+    def _materialize(self, start_index, end_index):
+        # constructs the arrays for beats start_index through end_index - 1
+        if numpy is not None:
+            beat_indices = numpy.arange(start_index, end_index)
+            in_prefix = beat_indices < self.num_prefix_beats
+            cycle_indices = numpy.maximum(beat_indices - self.num_prefix_beats, 0)
+            cycle_numbers, cycle_positions = numpy.divmod(cycle_indices, max(self.num_cycle_beats, 1))
+            positions = numpy.where(in_prefix, beat_indices, self.num_prefix_beats + cycle_positions).astype(numpy.int32)
+            offsets = numpy.array(self.prefix_offsets + self.cycle_offsets, dtype=float)[positions]
+            start_beats = numpy.where(in_prefix, offsets,
+                                      self.prefix_length + cycle_numbers * self.cycle_length + offsets)
+            lengths = numpy.array(self.lengths_by_position, dtype=float)[positions]
+            return BeatGrid(start_beats, lengths, positions, self.beat_schemes)
+        start_beats, lengths, positions = [], [], []
+        for beat_index in range(start_index, end_index):
+            if beat_index < self.num_prefix_beats:
+                position = beat_index
+                start_beat = self.prefix_offsets[beat_index]
+            else:
+                cycle_number, cycle_position = divmod(beat_index - self.num_prefix_beats, self.num_cycle_beats)
+                position = self.num_prefix_beats + cycle_position
+                start_beat = self.prefix_length + cycle_number * self.cycle_length + self.cycle_offsets[cycle_position]
+            start_beats.append(start_beat)
+            lengths.append(self.lengths_by_position[position])
+            positions.append(position)
+        return BeatGrid(start_beats, lengths, positions, self.beat_schemes)
+
+    @staticmethod
+    def _truncate(grid, horizon):
+        # only those beats that start at or before the horizon
+        num_beats = bisect_right(grid.start_beats, horizon) if numpy is None \
+            else int(numpy.searchsorted(grid.start_beats, horizon, side="right"))
+        return BeatGrid(grid.start_beats[:num_beats], grid.lengths[:num_beats], grid.scheme_indices[:num_beats],
+                        grid.beat_schemes)
+
 
 ##################################################################################################################
 #                                             Quantization Records
@@ -701,7 +954,7 @@ class QuantizationRecord(SavesToJSON):
 
 def quantize_performance_part(part: 'PerformancePart', quantization_scheme: QuantizationScheme,
                               onset_weighting: float = "default",  termination_weighting: float = "default",
-                              inner_split_weighting: float = "default"):
+                              inner_split_weighting: float = "default", workers: int = None):
     """
     Quantizes a performance part (in place) and sets its voice_quantization_records
 
@@ -710,37 +963,172 @@ def quantize_performance_part(part: 'PerformancePart', quantization_scheme: Quan
     :param onset_weighting: How much do we care about accurate onsets
     :param termination_weighting: How much do we care about accurate terminations
     :param inner_split_weighting: How much do we care about inner segmentation timing (e.g. tuple note lengths)
+    :param workers: if greater than 1, the voices of the part are quantized in parallel by a pool of this many worker
+        processes. By default, they are quantized one after another in this process.
     :return: a QuantizationRecord, detailing all of the time signatures, beat divisions selected, etc.
     """
+    _quantize_performance_parts([part], quantization_scheme, onset_weighting, termination_weighting,
+                                inner_split_weighting, workers)
+
+
+@_profiled_stage("quantization", lambda parts, *args, **kwargs: sum(len(voice) for part in parts
+                                                                 for voice in part.voices.values()))
+def _quantize_performance_parts(parts, quantization_scheme, onset_weighting="default", termination_weighting="default",
+                                inner_split_weighting="default", workers=None, copy_voices=False):
+    """
+    Quantizes several performance parts (in place), setting their voice_quantization_records. Since the voices are
+    independent of one another once the quantization scheme is fixed, they can be farmed out to a process pool.
+    Voices that have been quantized the same way before are retrieved from the quantization cache instead.
+
+    :param parts: a list of PerformanceParts
+    :param quantization_scheme: a QuantizationScheme
+    :param onset_weighting: How much do we care about accurate onsets
+    :param termination_weighting: How much do we care about accurate terminations
+    :param inner_split_weighting: How much do we care about inner segmentation timing (e.g. tuple note lengths)
+    :param workers: number of worker processes to use; if None or 1, everything happens in this process.
+    :param copy_voices: if True, the parts' voices are shared with some other part and must be left untouched, so
+        they are copied before being quantized. Otherwise, the notes in the parts are quantized in place, even when
+        the result comes from the cache or a worker process, so that the parts still hold the same note objects.
+    """
     if not isinstance(quantization_scheme, QuantizationScheme):
         raise ValueError("Couldn't understand quantization scheme.")
 
-    part.voice_quantization_records = {}
+    # resolve the defaults here, so that the worker processes don't need to consult their own settings
+    if onset_weighting == "default":
+        onset_weighting = quantization_settings.onset_weighting
+    if termination_weighting == "default":
+        termination_weighting = quantization_settings.termination_weighting
+    if inner_split_weighting == "default":
+        inner_split_weighting = quantization_settings.inner_split_weighting
 
-    for voice_name, voice in list(part.voices.items()):
-        quantization_record = _quantize_performance_voice(voice, quantization_scheme,
-                                                          onset_weighting, termination_weighting, inner_split_weighting)
-        # make any simultaneous notes in the part chords
-        _collapse_chords(voice)
-        # break the voice into a list of non-overlapping voices. If there was no overlap, this has length 1
-        non_overlapping_voices = _separate_into_non_overlapping_voices(voice)
+    # (columnar voices are quantized as ordinary lists of notes, since quantization splits, merges and regroups them)
+    voices_to_quantize = [(part, voice_name, voice.to_notes() if hasattr(voice, "to_notes") else voice)
+                          for part in parts for voice_name, voice in part.voices.items()]
+    quantization_arguments = [(voice, quantization_scheme, onset_weighting, termination_weighting,
+                               inner_split_weighting) for _, _, voice in voices_to_quantize]
+
+    # voices that have been quantized before, in the same way, are simply retrieved from the cache
+    use_cache = _quantization_cache.is_enabled()
+    if use_cache:
+        cache_keys = [_quantization_cache.get_key(*arguments) for arguments in quantization_arguments]
+        results = [_quantization_cache.get(key) for key in cache_keys]
+    else:
+        results = [None] * len(quantization_arguments)
+    uncached_indices = [i for i, result in enumerate(results) if result is None]
+    uncached_arguments = [quantization_arguments[i] for i in uncached_indices]
+
+    if workers is not None and workers > 1 and len(uncached_arguments) > 1:
+        # the workers are handed the settings of this process, in case they were altered after being loaded from file
+        with multiprocessing.Pool(min(workers, len(uncached_arguments)), _initialize_quantization_worker,
+                                  (quantization_settings.json_dumps(), engraving_settings.json_dumps())) as pool:
+            new_results = pool.starmap(_quantize_and_separate_voice, uncached_arguments)
+        results_in_place = False
+    else:
+        if copy_voices:
+            # (this isn't necessary for the process pool, since the voices get copied in being sent to the workers)
+            uncached_arguments = [(deepcopy(voice),) + tuple(other_arguments)
+                                  for voice, *other_arguments in uncached_arguments]
+        new_results = [_quantize_and_separate_voice(*arguments) for arguments in uncached_arguments]
+        results_in_place = not copy_voices
+
+    for i, result in zip(uncached_indices, new_results):
+        results[i] = result
+        if use_cache:
+            _quantization_cache.put(cache_keys[i], result)
+    quantized_in_place = set(uncached_indices) if results_in_place else set()
+
+    for part in parts:
+        part.voice_quantization_records = {}
+
+    for i, ((part, voice_name, voice), result) in enumerate(zip(voices_to_quantize, results)):
+        non_overlapping_voices, quantization_record, source_indices = result
+        if not copy_voices and i not in quantized_in_place:
+            # the result is made up of copies (from the cache or a worker process), but the part's own notes should
+            # end up quantized, just as they are when quantized here
+            non_overlapping_voices = _transfer_quantized_notes(voice, non_overlapping_voices, source_indices)
+        _add_quantized_voices_to_part(part, voice_name, non_overlapping_voices, quantization_record)
+
+
+def _transfer_quantized_notes(original_voice, non_overlapping_voices, source_indices):
+    """
+    Takes the result of quantizing a copy of the given voice (e.g. in a worker process, or retrieved from the cache),
+    and writes the quantized start beats, lengths, pitches, volumes and properties back onto the notes of the original
+    voice, just as if they had been quantized in place.
+
+    :param original_voice: the voice, as it was before quantization
+    :param non_overlapping_voices: the non-overlapping voices resulting from quantizing a copy of it
+    :param source_indices: for each of the non-overlapping voices, the index in the original voice of each note
+    :return: the list of non-overlapping voices, made up of the original notes
+    """
+    transferred_voices = []
+    for quantized_voice, voice_source_indices in zip(non_overlapping_voices, source_indices):
+        transferred_voice = []
+        for quantized_note, source_index in zip(quantized_voice, voice_source_indices):
+            original_note = original_voice[source_index]
+            original_note.start_beat = quantized_note.start_beat
+            original_note.length = quantized_note.length
+            original_note.pitch = quantized_note.pitch
+            original_note.volume = quantized_note.volume
+            original_note.properties = quantized_note.properties
+            transferred_voice.append(original_note)
+        transferred_voices.append(transferred_voice)
+    return transferred_voices
+
+
+def _add_quantized_voices_to_part(part, voice_name, non_overlapping_voices, quantization_record):
+    """
+    Puts the non-overlapping voices that resulted from quantizing a voice into the given part, along with their
+    quantization record.
 
-        for i, new_voice in enumerate(non_overlapping_voices):
-            if i == 0:
-                # the first of the non-overlapping voices just retains the old voice name
-                new_voice_name = voice_name
-            else:
-                # any extra voice created has to be given a related name
-                # we follow the pattern 'original_voice', 'original_voice_2', 'original_voice_3', etc.
-                k = i+1
+    :param part: a PerformancePart, whose voice_quantization_records have been initialized
+    :param voice_name: the name of the voice that was quantized
+    :param non_overlapping_voices: the list of non-overlapping voices that it was separated into
+    :param quantization_record: the QuantizationRecord for that voice
+    """
+    for i, new_voice in enumerate(non_overlapping_voices):
+        if i == 0:
+            # the first of the non-overlapping voices just retains the old voice name
+            new_voice_name = voice_name
+        else:
+            # any extra voice created has to be given a related name
+            # we follow the pattern 'original_voice', 'original_voice_2', 'original_voice_3', etc.
+            k = i+1
+            new_voice_name = voice_name + "_{}".format(str(k))
+            # in the ridiculous case someone names two voices 'voice' and 'voice_2', and the first one needs to
+            # be split up, we'll just have to increment to 'voice_3'
+            while new_voice_name in part.voices:
+                k += 1
                 new_voice_name = voice_name + "_{}".format(str(k))
-                # in the ridiculous case someone names two voices 'voice' and 'voice_2', and the first one needs to
-                # be split up, we'll just have to increment to 'voice_3'
-                while new_voice_name in part.voices:
-                    k += 1
-                    voice_name + "_{}".format(str(k))
-            part.voices[new_voice_name] = new_voice
-            part.voice_quantization_records[new_voice_name] = quantization_record
+        part.voices[new_voice_name] = new_voice
+        part.voice_quantization_records[new_voice_name] = quantization_record
+
+
+def _quantize_and_separate_voice(voice, quantization_scheme, onset_weighting, termination_weighting,
+                                 inner_split_weighting):
+    """
+    Quantizes a voice, collapses simultaneous notes into chords, and breaks it up into non-overlapping voices. This is
+    all of the work done on each voice, and it is module-level so that it can be sent to worker processes.
+
+    :return: tuple of (list of non-overlapping voices, QuantizationRecord, source indices), where the source indices
+        give, for each of the non-overlapping voices, the index in the original voice of each of its notes. (The notes
+        are the original ones, quantized in place; chords take the place of the first of the notes merged into them.)
+    """
+    original_indices = {id(note): i for i, note in enumerate(voice)}
+    quantization_record = _quantize_performance_voice(voice, quantization_scheme, onset_weighting,
+                                                      termination_weighting, inner_split_weighting)
+    # make any simultaneous notes in the part chords
+    _collapse_chords(voice)
+    # break the voice into a list of non-overlapping voices. If there was no overlap, this has length 1
+    non_overlapping_voices = _separate_into_non_overlapping_voices(voice)
+    source_indices = [[original_indices[id(note)] for note in non_overlapping_voice]
+                      for non_overlapping_voice in non_overlapping_voices]
+    return non_overlapping_voices, quantization_record, source_indices
+
+
+def _initialize_quantization_worker(quantization_settings_json, engraving_settings_json):
+    # bring a worker process's settings in line with those of the process that started it
+    vars(quantization_settings).update(vars(QuantizationSettings.json_loads(quantization_settings_json)))
+    vars(engraving_settings).update(vars(EngravingSettings.json_loads(engraving_settings_json)))
 
 
 def _quantize_performance_voice(voice, quantization_scheme, onset_weighting="default", termination_weighting="default",
@@ -785,98 +1173,162 @@ def _quantize_performance_voice(voice, quantization_scheme, onset_weighting="def
     raw_terminations.sort(key=lambda x: x[0])
     raw_inner_splits.sort(key=lambda x: x[0])
 
-    beat_scheme_iterator = quantization_scheme.beat_scheme_iterator()
-    beat_divisors = []
-
-    while len(raw_onsets) + len(raw_inner_splits) + len(raw_terminations) > 0:
-        # First, use all the onsets, inner splits, and terminations in this beat to determine the best divisor
-        beat_scheme, beat_start = next(beat_scheme_iterator)
-        assert isinstance(beat_scheme, BeatQuantizationScheme)
-        beat_end = beat_start + beat_scheme.length
-
-        # find the onsets in this beat
-        onsets_in_this_beat = []
-        while len(raw_onsets) > 0 and raw_onsets[0][0] < beat_end:
-            onsets_in_this_beat.append(raw_onsets.pop(0))
-
-        # find the terminations in this beat
-        terminations_in_this_beat = []
-        while len(raw_terminations) > 0 and raw_terminations[0][0] < beat_end:
-            terminations_in_this_beat.append(raw_terminations.pop(0))
-
-        # find the inner splits in this beat
-        inner_splits_in_this_beat = []
-        while len(raw_inner_splits) > 0 and raw_inner_splits[0][0] < beat_end:
-            inner_splits_in_this_beat.append(raw_inner_splits.pop(0))
-
-        if len(onsets_in_this_beat) + len(terminations_in_this_beat) + len(inner_splits_in_this_beat) == 0:
-            # an empty beat, nothing to see here
-            beat_divisors.append(None)
-            continue
-
-        best_divisor = _get_best_divisor_for_beat(
-            beat_scheme, beat_start, onsets_in_this_beat, terminations_in_this_beat, inner_splits_in_this_beat,
-            onset_weighting, termination_weighting, inner_split_weighting
-        )
-        beat_divisors.append(best_divisor)
-
-        # Now, quantize all of the notes that start or end in this beat accordingly
-        division_length = beat_scheme.length / best_divisor
-        for onset, note in onsets_in_this_beat:
-            divisions_after_beat_start = round((onset - beat_start) / division_length)
-            note.start_beat = beat_start + divisions_after_beat_start * division_length
-
-        for termination, note in terminations_in_this_beat:
-            divisions_after_beat_start = round((termination - beat_start) / division_length)
-            note.end_beat = beat_start + divisions_after_beat_start * division_length
-
-            if note.length_sum() <= 0:
-                # this covers a rare case in which the note has multiple segments, but is getting squeezed by the
-                # quantization into a length of zero. In this case, dispense with the segments, just make it length 0
-                if hasattr(note.length, "__len__") > 0:
-                    note.length = 0
-                # if the quantization collapses the start and end times of a note to the same point,
-                # adjust so the the note is a single division_length long.
-                if note.end_beat + division_length <= beat_end:
-                    # if there's room to, just move the end of the note one division forward
-                    note.length += division_length
-                else:
-                    # otherwise, move the start of the note one division backward
-                    note.start_beat -= division_length
-                    note.length += division_length
-
-        # we take note of where all the inner splits quantize to, and then once all of the start
-        # and end times for the notes are adjusted, we go ahead and put them it.
-        for inner_split, note in inner_splits_in_this_beat:
-            divisions_after_beat_start = round((inner_split - beat_start) / division_length)
-            quantized_split_beat = beat_start + divisions_after_beat_start * division_length
-            if "split_points" in note.properties.temp:
-                note.properties.temp["split_points"].append(quantized_split_beat)
-            else:
-                note.properties.temp["split_points"] = [quantized_split_beat]
+    # just the times, so that we can search for the end of each beat's events
+    onset_times = [x[0] for x in raw_onsets]
+    termination_times = [x[0] for x in raw_terminations]
+    inner_split_times = [x[0] for x in raw_inner_splits]
+
+    # get the grid of beats, up to and including the beat that contains the last event. Each event belongs to the
+    # first beat that ends after it, so for each kind of event, the cut points between beats are given by searching
+    # for the beat end times in the list of event times.
+    last_event_times = [times[-1] for times in (onset_times, termination_times, inner_split_times) if len(times) > 0]
+    # (any events before zero go in the first beat; with no events at all, we don't need any beats)
+    beat_grid = quantization_scheme.get_beat_grid(max(max(last_event_times), 0) if len(last_event_times) > 0 else -1)
+    onset_cut_points, termination_cut_points, inner_split_cut_points = (
+        _get_event_cut_points(times, beat_grid) for times in (onset_times, termination_times, inner_split_times)
+    )
+
+    beat_divisors = [None] * len(beat_grid.start_beats)
+    # list of (beat scheme, beat start, onsets, terminations, inner splits) for each beat that has something in it
+    occupied_beats = []
+    occupied_beat_indices = _get_occupied_beat_indices(onset_cut_points, termination_cut_points,
+                                                       inner_split_cut_points)
+    for beat_index in occupied_beat_indices:
+        occupied_beats.append((
+            beat_grid.beat_schemes[beat_grid.scheme_indices[beat_index]], float(beat_grid.start_beats[beat_index]),
+            raw_onsets[onset_cut_points[beat_index]:onset_cut_points[beat_index + 1]],
+            raw_terminations[termination_cut_points[beat_index]:termination_cut_points[beat_index + 1]],
+            raw_inner_splits[inner_split_cut_points[beat_index]:inner_split_cut_points[beat_index + 1]]
+        ))
+
+    # Next, use the events in each beat to determine the best divisor for every occupied beat at once
+    best_divisors = _choose_beat_divisors(occupied_beats, quantization_scheme, onset_weighting,
+                                          termination_weighting, inner_split_weighting)
+
+    for beat_index, best_divisor, occupied_beat in zip(occupied_beat_indices, best_divisors, occupied_beats):
+        beat_scheme, beat_start, onsets_in_this_beat, terminations_in_this_beat, inner_splits_in_this_beat = \
+            occupied_beat
+        beat_divisors[beat_index] = best_divisor
+
+        _quantize_events_in_beat(beat_scheme, beat_start, best_divisor, onsets_in_this_beat,
+                                 terminations_in_this_beat, inner_splits_in_this_beat)
 
     last_note_end_beat = 0
     for note in voice:
         # now that all the start and end points have been adjusted,
         # we implement the quantized split points where applicable
+        _implement_quantized_split_points(note)
+        last_note_end_beat = max(note.end_beat, last_note_end_beat)
+
+    return _construct_quantization_record(beat_divisors, last_note_end_beat, quantization_scheme)
+
+
+def _get_event_cut_points(event_times, beat_grid):
+    """
+    Given a sorted list of event times and a BeatGrid, returns a list of the indices at which the events of each beat
+    start, with a final entry giving the index at which the events of the last beat end. Thus the events of beat i
+    are the ones from cut_points[i] up to cut_points[i + 1].
+
+    :param event_times: sorted list of event times
+    :param beat_grid: a BeatGrid covering all of the events
+    """
+    if numpy is not None:
+        beat_ends = beat_grid.start_beats + beat_grid.lengths
+        cut_points = numpy.empty(len(beat_ends) + 1, dtype=int)
+        cut_points[0] = 0
+        cut_points[1:] = numpy.searchsorted(numpy.asarray(event_times, dtype=float), beat_ends, side="left")
+        return cut_points.tolist()
+    cut_points = [0]
+    for start_beat, length in zip(beat_grid.start_beats, beat_grid.lengths):
+        cut_points.append(bisect_left(event_times, start_beat + length, cut_points[-1]))
+    return cut_points
+
+
+def _get_occupied_beat_indices(*cut_point_lists):
+    """
+    Returns the indices of the beats that contain any events, given the cut points (see _get_event_cut_points) for
+    each kind of event.
+    """
+    if numpy is not None:
+        event_counts = sum(numpy.diff(cut_points) for cut_points in cut_point_lists)
+        return numpy.flatnonzero(event_counts).tolist()
+    return [i for i in range(len(cut_point_lists[0]) - 1)
+            if any(cut_points[i + 1] > cut_points[i] for cut_points in cut_point_lists)]
+
+
+def _quantize_events_in_beat(beat_scheme, beat_start, divisor, onsets_in_beat, terminations_in_beat,
+                             inner_splits_in_beat):
+    """
+    Quantizes the notes that start, end, or have an inner split within a beat (modifying them in place), given the
+    divisor chosen for that beat. Inner splits are only recorded in the note's temp properties; they are implemented
+    later by _implement_quantized_split_points, once all of the note's start and end points have been adjusted.
+
+    :param beat_scheme: the BeatQuantizationScheme of this beat
+    :param beat_start: the start beat of this beat
+    :param divisor: the divisor chosen for this beat
+    :param onsets_in_beat: list of (onset time, note) tuples falling within this beat
+    :param terminations_in_beat: list of (termination time, note) tuples falling within this beat
+    :param inner_splits_in_beat: list of (inner split time, note) tuples falling within this beat
+    """
+    beat_end = beat_start + beat_scheme.length
+    division_length = beat_scheme.length / divisor
+
+    # quantize all of the notes that start or end in this beat accordingly
+    for onset, note in onsets_in_beat:
+        divisions_after_beat_start = round((onset - beat_start) / division_length)
+        note.start_beat = beat_start + divisions_after_beat_start * division_length
+
+    for termination, note in terminations_in_beat:
+        divisions_after_beat_start = round((termination - beat_start) / division_length)
+        note.end_beat = beat_start + divisions_after_beat_start * division_length
+
+        if note.length_sum() <= 0:
+            # this covers a rare case in which the note has multiple segments, but is getting squeezed by the
+            # quantization into a length of zero. In this case, dispense with the segments, just make it length 0
+            if hasattr(note.length, "__len__") > 0:
+                note.length = 0
+            # if the quantization collapses the start and end times of a note to the same point,
+            # adjust so the the note is a single division_length long.
+            if note.end_beat + division_length <= beat_end:
+                # if there's room to, just move the end of the note one division forward
+                note.length += division_length
+            else:
+                # otherwise, move the start of the note one division backward
+                note.start_beat -= division_length
+                note.length += division_length
+
+    # we take note of where all the inner splits quantize to, and then once all of the start
+    # and end times for the notes are adjusted, we go ahead and put them it.
+    for inner_split, note in inner_splits_in_beat:
+        divisions_after_beat_start = round((inner_split - beat_start) / division_length)
+        quantized_split_beat = beat_start + divisions_after_beat_start * division_length
         if "split_points" in note.properties.temp:
-            last_split_point = note.start_beat
-            new_lengths = []
-            for split_point in sorted(note.properties.temp["split_points"]):
-                if round(split_point - last_split_point, 10) > 0:
-                    new_lengths.append(split_point - last_split_point)
-                last_split_point = split_point
-            if round(note.end_beat - last_split_point, 10) > 0:
-                new_lengths.append(note.end_beat - last_split_point)
-            note.length = tuple(new_lengths)
+            note.properties.temp["split_points"].append(quantized_split_beat)
+        else:
+            note.properties.temp["split_points"] = [quantized_split_beat]
 
-        last_note_end_beat = max(note.end_beat, last_note_end_beat)
 
-        # also normalize the pitch envelopes
-        if isinstance(note.pitch, Envelope):
-            note.pitch.normalize_to_duration(note.length_sum())
+def _implement_quantized_split_points(note):
+    """
+    Once a note's start and end have been quantized, turns the quantized split points recorded in its temp properties
+    into a tuple of segment lengths. Also normalizes the duration of its pitch envelope, if it has one.
 
-    return _construct_quantization_record(beat_divisors, last_note_end_beat, quantization_scheme)
+    :param note: a PerformanceNote whose onset, termination and inner splits have all been quantized
+    """
+    if "split_points" in note.properties.temp:
+        last_split_point = note.start_beat
+        new_lengths = []
+        for split_point in sorted(note.properties.temp["split_points"]):
+            if round(split_point - last_split_point, 10) > 0:
+                new_lengths.append(split_point - last_split_point)
+            last_split_point = split_point
+        if round(note.end_beat - last_split_point, 10) > 0:
+            new_lengths.append(note.end_beat - last_split_point)
+        note.length = tuple(new_lengths)
+
+    # also normalize the pitch envelopes
+    if isinstance(note.pitch, Envelope):
+        note.pitch.normalize_to_duration(note.length_sum())
 
 
 def _collapse_chords(notes):
@@ -886,25 +1338,73 @@ def _collapse_chords(notes):
 
     :param notes: a list of PerformanceNotes
     """
-    i = 1
-    while i < len(notes):
-        if notes[i - 1].attempt_chord_merger_with(notes[i]):
-            # if the merger is successful, notes[i] has been incorporated into notes[i-1]
-            # so we can simply pop notes[i] and not increment
-            notes.pop(i)
-        else:
-            # otherwise, since the merger fails, we simply increment i
-            i += 1
+    if len(notes) < 2:
+        return
+    collapsed_notes = [notes[0]]
+    for note in notes[1:]:
+        # if the merger is successful, note has been incorporated into the previous note, so we simply leave it out;
+        # otherwise it becomes the note that the following ones try to merge with
+        if not collapsed_notes[-1].attempt_chord_merger_with(note):
+            collapsed_notes.append(note)
+    notes[:] = collapsed_notes
 
 
 def _separate_into_non_overlapping_voices(notes, max_overlap=1e-10):
     """
-    Takes a list of PerformanceNotes and breaks it up into separate voices that don't overlap more than max_overlap
+    Takes a list of PerformanceNotes and breaks it up into separate voices that don't overlap more than max_overlap.
+    Each note goes into the first (lowest-numbered) voice that it doesn't conflict with, or into a new voice if there
+    is no such voice.
+
+    :param notes: a list of PerformanceNotes
+    :return: a list of voices, each of which is a non-overlapping list of PerformanceNotes
+    """
+    if any(notes[i].start_beat < notes[i - 1].start_beat for i in range(1, len(notes))):
+        # the heap-based allocation below relies on notes being in order of start time
+        return _separate_unsorted_notes_into_non_overlapping_voices(notes, max_overlap)
+
+    voices = []
+    # heap of (end beat of last note, voice index) for voices that are still sounding, and heap of the indices of
+    # voices that have finished. Since the notes come in order, once a voice has finished it stays available until
+    # we add a note to it, so each note simply takes the lowest-numbered available voice.
+    sounding_voices = []
+    available_voices = []
+    for note in notes:
+        while sounding_voices and sounding_voices[0][0] <= note.start_beat + max_overlap:
+            heapq.heappush(available_voices, heapq.heappop(sounding_voices)[1])
+        if available_voices:
+            voice_index = heapq.heappop(available_voices)
+        else:
+            voice_index = len(voices)
+            voices.append([])
+        voices[voice_index].append(note)
+        heapq.heappush(sounding_voices, (note.end_beat, voice_index))
+
+    return voices
+
+
+def _separate_unsorted_notes_into_non_overlapping_voices(notes, max_overlap=1e-10):
+    """
+    Version of :func:`_separate_into_non_overlapping_voices` that does not assume the notes to be sorted by start time
+    (which can happen when quantization nudges a note's start backwards). Scans every voice for each note.
 
     :param notes: a list of PerformanceNotes
     :return: a list of voices, each of which is a non-overlapping list of PerformanceNotes
     """
     voices = []
+    _add_notes_to_non_overlapping_voices(voices, notes, max_overlap)
+    return voices
+
+
+def _add_notes_to_non_overlapping_voices(voices, notes, max_overlap=1e-10):
+    """
+    Adds each of the given PerformanceNotes to the first of the given voices that it doesn't conflict with, or to a new
+    voice if there is no such voice. (This gives the same result as :func:`_separate_into_non_overlapping_voices`
+    would have if the notes had been part of the list it was given, so it can be used to continue a separation.)
+
+    :param voices: a list of non-overlapping voices, which is altered in place
+    :param notes: a list of PerformanceNotes
+    :param max_overlap: how much notes are allowed to overlap
+    """
     # for each note, find the first non-conflicting voice and add it to that
     # or create a new voice to add it to if none of the existing voices work
     for note in notes:
@@ -919,14 +1419,12 @@ def _separate_into_non_overlapping_voices(notes, max_overlap=1e-10):
             voices.append(voice_to_add_to)
         voice_to_add_to.append(note)
 
-    return voices
 
-
-def _get_best_divisor_for_beat(beat_scheme, beat_start_time, onsets_in_beat, terminations_in_beat, inner_splits_in_beat,
-                               onset_weighting, termination_weighting, inner_split_weighting):
-    # try out each quantization division of a beat and return the best fit
-    best_divisor = None
-    best_error = float("inf")
+def _get_divisor_error_scores_for_beat(beat_scheme, beat_start_time, onsets_in_beat, terminations_in_beat,
+                                       inner_splits_in_beat, onset_weighting, termination_weighting,
+                                       inner_split_weighting):
+    # try out each quantization division of a beat and return the error score of each
+    error_scores = []
 
     for divisor, undesirability in beat_scheme.quantization_divisions:
         division_length = beat_scheme.length / divisor
@@ -952,10 +1450,24 @@ def _get_best_divisor_for_beat(beat_scheme, beat_start_time, onsets_in_beat, ter
             total_squared_inner_split_error += \
                 (time_since_beat_start - round_to_multiple(time_since_beat_start, division_length)) ** 2
 
-        this_div_error_score = undesirability * (termination_weighting * total_squared_termination_error +
-                                                 onset_weighting * total_squared_onset_error +
-                                                 inner_split_weighting * total_squared_inner_split_error)
+        error_scores.append(undesirability * (termination_weighting * total_squared_termination_error +
+                                              onset_weighting * total_squared_onset_error +
+                                              inner_split_weighting * total_squared_inner_split_error))
+
+    return error_scores
+
+
+def _get_best_divisor_for_beat(beat_scheme, beat_start_time, onsets_in_beat, terminations_in_beat, inner_splits_in_beat,
+                               onset_weighting, termination_weighting, inner_split_weighting):
+    # try out each quantization division of a beat and return the best fit
+    best_divisor = None
+    best_error = float("inf")
 
+    error_scores = _get_divisor_error_scores_for_beat(
+        beat_scheme, beat_start_time, onsets_in_beat, terminations_in_beat, inner_splits_in_beat,
+        onset_weighting, termination_weighting, inner_split_weighting
+    )
+    for (divisor, _), this_div_error_score in zip(beat_scheme.quantization_divisions, error_scores):
         if this_div_error_score < best_error:
             best_divisor = divisor
             best_error = this_div_error_score
@@ -963,6 +1475,255 @@ def _get_best_divisor_for_beat(beat_scheme, beat_start_time, onsets_in_beat, ter
     return best_divisor
 
 
+def _get_divisor_error_score_matrices(beats, onset_weighting, termination_weighting, inner_split_weighting):
+    """
+    Scores every allowable divisor of every one of the given beats using numpy. The beats are grouped by length and
+    quantization divisions, and a (beats x divisors) error matrix is built for each group.
+
+    :param beats: list of (beat scheme, beat start, onsets, terminations, inner splits) tuples, where the onsets,
+        terminations and inner splits are lists of (time, note) tuples falling within that beat
+    :param onset_weighting: How much do we care about accurate onsets
+    :param termination_weighting: How much do we care about accurate terminations
+    :param inner_split_weighting: How much do we care about inner segmentation timing (e.g. tuple note lengths)
+    :return: list of (quantization divisions, indices of the beats in the group, error score matrix) tuples
+    """
+    # group together the beats that share the same length and quantization divisions; each group gets one matrix
+    beat_groups = {}
+    for i, (beat_scheme, _, _, _, _) in enumerate(beats):
+        group_key = (beat_scheme.length, tuple(beat_scheme.quantization_divisions))
+        beat_groups.setdefault(group_key, []).append(i)
+
+    out = []
+    for (beat_length, quantization_divisions), beat_indices in beat_groups.items():
+        division_lengths = numpy.array([beat_length / divisor for divisor, _ in quantization_divisions])
+        undesirabilities = numpy.array([undesirability for _, undesirability in quantization_divisions], dtype=float)
+        beat_starts = numpy.array([beats[i][1] for i in beat_indices], dtype=float)
+
+        # total squared error of the onsets, terminations and inner splits respectively, as (beats x divisors) arrays
+        total_squared_errors = []
+        for event_list_index in (2, 3, 4):
+            event_times = []
+            event_beat_numbers = []
+            for beat_number, i in enumerate(beat_indices):
+                for event_time, _ in beats[i][event_list_index]:
+                    event_times.append(event_time)
+                    event_beat_numbers.append(beat_number)
+            event_beat_numbers = numpy.array(event_beat_numbers, dtype=int)
+            times_since_beat_start = (numpy.array(event_times, dtype=float) - beat_starts[event_beat_numbers])[:, None]
+            # squared distance from the closest division of the beat, for every event and every divisor
+            squared_errors = (times_since_beat_start -
+                              numpy.round(times_since_beat_start / division_lengths) * division_lengths) ** 2
+            # accumulate the errors of the events in each beat (in order, just like the pure-python version)
+            total_squared_error = numpy.zeros((len(beat_indices), len(division_lengths)))
+            numpy.add.at(total_squared_error, event_beat_numbers, squared_errors)
+            total_squared_errors.append(total_squared_error)
+
+        total_squared_onset_error, total_squared_termination_error, total_squared_inner_split_error = \
+            total_squared_errors
+        error_scores = undesirabilities * (termination_weighting * total_squared_termination_error +
+                                           onset_weighting * total_squared_onset_error +
+                                           inner_split_weighting * total_squared_inner_split_error)
+        out.append((quantization_divisions, beat_indices, error_scores))
+    return out
+
+
+def _get_divisor_error_scores(beats, onset_weighting, termination_weighting, inner_split_weighting):
+    """
+    Scores every allowable divisor of each of the given beats (with numpy if it is available).
+
+    :param beats: list of (beat scheme, beat start, onsets, terminations, inner splits) tuples (see
+        _get_divisor_error_score_matrices)
+    :param onset_weighting: How much do we care about accurate onsets
+    :param termination_weighting: How much do we care about accurate terminations
+    :param inner_split_weighting: How much do we care about inner segmentation timing (e.g. tuple note lengths)
+    :return: list containing, for each beat, a list of the error scores of its quantization divisions
+    """
+    if numpy is None:
+        return [_get_divisor_error_scores_for_beat(beat_scheme, beat_start, onsets, terminations, inner_splits,
+                                                   onset_weighting, termination_weighting, inner_split_weighting)
+                for beat_scheme, beat_start, onsets, terminations, inner_splits in beats]
+
+    error_scores = [None] * len(beats)
+    for _, beat_indices, error_score_matrix in _get_divisor_error_score_matrices(
+            beats, onset_weighting, termination_weighting, inner_split_weighting):
+        for i, beat_error_scores in zip(beat_indices, error_score_matrix.tolist()):
+            error_scores[i] = beat_error_scores
+    return error_scores
+
+
+def _get_best_divisors_for_beats(beats, onset_weighting, termination_weighting, inner_split_weighting):
+    """
+    Finds the best divisor for each of the given beats. When numpy is available, this scores every allowable divisor
+    of every beat in one go, by building a (beats x divisors) error matrix for each distinct set of quantization
+    divisions in use; otherwise it falls back to calling _get_best_divisor_for_beat on each beat in turn.
+
+    :param beats: list of (beat scheme, beat start, onsets, terminations, inner splits) tuples, where the onsets,
+        terminations and inner splits are lists of (time, note) tuples falling within that beat
+    :param onset_weighting: How much do we care about accurate onsets
+    :param termination_weighting: How much do we care about accurate terminations
+    :param inner_split_weighting: How much do we care about inner segmentation timing (e.g. tuple note lengths)
+    :return: list of the best divisor for each beat
+    """
+    if numpy is None:
+        return [_get_best_divisor_for_beat(beat_scheme, beat_start, onsets, terminations, inner_splits,
+                                           onset_weighting, termination_weighting, inner_split_weighting)
+                for beat_scheme, beat_start, onsets, terminations, inner_splits in beats]
+
+    best_divisors = [None] * len(beats)
+    for quantization_divisions, beat_indices, error_score_matrix in _get_divisor_error_score_matrices(
+            beats, onset_weighting, termination_weighting, inner_split_weighting):
+        # argmin picks the first of any equally good divisors, which matches the pure-python version
+        for i, best_division_index in zip(beat_indices, numpy.argmin(error_score_matrix, axis=1)):
+            best_divisors[i] = quantization_divisions[best_division_index][0]
+
+    return best_divisors
+
+
+def _choose_beat_divisors(beats, quantization_scheme, onset_weighting, termination_weighting, inner_split_weighting):
+    """
+    Chooses the divisor for each of the given beats, in the way specified by the quantization scheme's mode.
+
+    :param beats: list of (beat scheme, beat start, onsets, terminations, inner splits) tuples, where the onsets,
+        terminations and inner splits are lists of (time, note) tuples falling within that beat
+    :param quantization_scheme: the QuantizationScheme being used
+    :param onset_weighting: How much do we care about accurate onsets
+    :param termination_weighting: How much do we care about accurate terminations
+    :param inner_split_weighting: How much do we care about inner segmentation timing (e.g. tuple note lengths)
+    :return: list of the chosen divisor for each beat
+    """
+    if quantization_scheme.mode == "global":
+        return _get_globally_best_divisors(beats, onset_weighting, termination_weighting, inner_split_weighting,
+                                           quantization_scheme.beam_width)
+    else:
+        return _get_best_divisors_for_beats(beats, onset_weighting, termination_weighting, inner_split_weighting)
+
+
+def _get_globally_best_divisors(beats, onset_weighting, termination_weighting, inner_split_weighting,
+                                beam_width=None):
+    """
+    Chooses the divisors for all of the given beats together by dynamic programming, in the spirit of Paul Nauert's
+    Q-Grid quantizer. On top of the error scores used when choosing greedily, this accounts for the extra error that
+    results when a note's onset and termination quantize to the same point, and one of them has to be pushed a division
+    away (see _quantize_events_in_beat). That can only happen when the onset and termination fall in the same beat or
+    in adjacent beats, so the cost of a beat's divisor depends at most on the previous beat's divisor, and a Viterbi
+    search finds the optimal combination. If nothing ever gets squeezed, the result is the same as choosing greedily.
+
+    :param beats: list of (beat scheme, beat start, onsets, terminations, inner splits) tuples, where the onsets,
+        terminations and inner splits are lists of (time, note) tuples falling within that beat
+    :param onset_weighting: How much do we care about accurate onsets
+    :param termination_weighting: How much do we care about accurate terminations
+    :param inner_split_weighting: How much do we care about inner segmentation timing (e.g. tuple note lengths)
+    :param beam_width: the number of candidate divisors for each beat that are carried forward to the next one. If
+        None, all of them are, and the search is exact. The work done is O(beats x beam_width x divisors).
+    :return: list of the chosen divisor for each beat
+    """
+    error_scores = _get_divisor_error_scores(beats, onset_weighting, termination_weighting, inner_split_weighting)
+
+    # record the beat in which each note's onset falls, as id(note) -> (beat number, onset)
+    onset_locations = {}
+    for beat_number, (_, _, onsets, _, _) in enumerate(beats):
+        for onset, note in onsets:
+            onset_locations[id(note)] = (beat_number, onset)
+
+    def quantize(t, beat_number, division_index):
+        # returns where the given time is quantized to, and the length of the division used (as in
+        # _quantize_events_in_beat)
+        beat_scheme, beat_start = beats[beat_number][:2]
+        division_length = beat_scheme.length / beat_scheme.quantization_divisions[division_index][0]
+        return beat_start + round((t - beat_start) / division_length) * division_length, division_length
+
+    def squeeze_penalty(onset, onset_beat, onset_division, termination, termination_beat, termination_division):
+        # the extra error that results if the note's onset and termination are quantized to the same point
+        quantized_onset, _ = quantize(onset, onset_beat, onset_division)
+        quantized_termination, division_length = quantize(termination, termination_beat, termination_division)
+        if quantized_termination - quantized_onset > 0:
+            return 0
+        beat_scheme, beat_start = beats[termination_beat][:2]
+        if quantized_termination + division_length <= beat_start + beat_scheme.length:
+            # the termination gets pushed a division later
+            undesirability = beat_scheme.quantization_divisions[termination_division][1]
+            return undesirability * termination_weighting * (
+                (quantized_termination + division_length - termination) ** 2 - (quantized_termination - termination) ** 2
+            )
+        else:
+            # the onset gets pushed a division earlier
+            undesirability = beats[onset_beat][0].quantization_divisions[onset_division][1]
+            return undesirability * onset_weighting * (
+                (quantized_onset - division_length - onset) ** 2 - (quantized_onset - onset) ** 2
+            )
+
+    largest_division_lengths = [beat_scheme.length / min(divisor for divisor, _ in beat_scheme.quantization_divisions)
+                                for beat_scheme, _, _, _, _ in beats]
+
+    # list of (total cost, division index) for the candidates carried forward from the previous beat
+    candidates = None
+    # for each beat, a dictionary mapping each of its division indices to the best division index of the previous beat
+    back_pointers = []
+
+    for beat_number, (beat_scheme, beat_start, _, terminations, _) in enumerate(beats):
+        beat_costs = list(error_scores[beat_number])
+        previous_beat_is_adjacent = beat_number > 0 and \
+            beats[beat_number - 1][1] + beats[beat_number - 1][0].length == beat_start
+
+        # notes that started in the previous beat and end in this one; their squeeze penalty depends on both divisors
+        straddling_notes = []
+        for termination, note in terminations:
+            if id(note) not in onset_locations:
+                continue
+            onset_beat, onset = onset_locations[id(note)]
+            # an onset and termination can only be quantized to the same point if they are within half of the
+            # largest division length of each of their beats
+            if termination - onset > (largest_division_lengths[onset_beat] +
+                                      largest_division_lengths[beat_number]) / 2:
+                continue
+            if onset_beat == beat_number:
+                for j in range(len(beat_costs)):
+                    beat_costs[j] += squeeze_penalty(onset, beat_number, j, termination, beat_number, j)
+            elif onset_beat == beat_number - 1 and previous_beat_is_adjacent:
+                straddling_notes.append((onset, termination))
+
+        new_candidates = []
+        beat_back_pointers = {}
+        if candidates is None:
+            for j, beat_cost in enumerate(beat_costs):
+                new_candidates.append((beat_cost, j))
+                beat_back_pointers[j] = None
+        elif len(straddling_notes) == 0:
+            # the previous choice has no bearing on this one; just continue from the best candidate so far
+            best_cost_so_far, best_previous_division = candidates[0]
+            for j, beat_cost in enumerate(beat_costs):
+                new_candidates.append((best_cost_so_far + beat_cost, j))
+                beat_back_pointers[j] = best_previous_division
+        else:
+            for j, beat_cost in enumerate(beat_costs):
+                best_cost_so_far, best_previous_division = float("inf"), candidates[0][1]
+                for cost_so_far, i in candidates:
+                    cost_so_far += sum(squeeze_penalty(onset, beat_number - 1, i, termination, beat_number, j)
+                                       for onset, termination in straddling_notes)
+                    if cost_so_far < best_cost_so_far:
+                        best_cost_so_far, best_previous_division = cost_so_far, i
+                new_candidates.append((best_cost_so_far + beat_cost, j))
+                beat_back_pointers[j] = best_previous_division
+
+        # sorting is stable, so equally good candidates stay in order of division, just as when choosing greedily
+        new_candidates.sort(key=lambda x: x[0])
+        candidates = new_candidates if beam_width is None else new_candidates[:beam_width]
+        back_pointers.append(beat_back_pointers)
+
+    if candidates is None:
+        return []
+
+    # trace back the best path through the beats
+    division_index = candidates[0][1]
+    division_indices = [None] * len(beats)
+    for beat_number in reversed(range(len(beats))):
+        division_indices[beat_number] = division_index
+        division_index = back_pointers[beat_number][division_index]
+
+    return [beat_scheme.quantization_divisions[division_index][0]
+            for (beat_scheme, _, _, _, _), division_index in zip(beats, division_indices)]
+
+
 def _construct_quantization_record(beat_divisors, end_beat, quantization_scheme):
     """
     Constructs a QuantizationRecord from the given scheme and divisors
@@ -977,6 +1738,7 @@ def _construct_quantization_record(beat_divisors, end_beat, quantization_scheme)
     """
     assert isinstance(beat_divisors, list)
     quantized_measures = []
+    beat_index = 0
 
     for measure_scheme, t in quantization_scheme.measure_scheme_iterator():
         measure_start_beat = t
@@ -984,7 +1746,8 @@ def _construct_quantization_record(beat_divisors, end_beat, quantization_scheme)
         min_duple_subdivision = float("inf")
 
         for beat_scheme in measure_scheme.beat_schemes:
-            divisor = beat_divisors.pop(0) if len(beat_divisors) > 0 else None
+            divisor = beat_divisors[beat_index] if beat_index < len(beat_divisors) else None
+            beat_index += 1
             beats.append(
                 QuantizedBeat(t, t - measure_start_beat, beat_scheme.length, divisor)
             )
@@ -1002,5 +1765,449 @@ def _construct_quantization_record(beat_divisors, end_beat, quantization_scheme)
 
         quantized_measures.append(quantized_measure)
 
-        if len(beat_divisors) == 0 or t >= end_beat:
+        if beat_index >= len(beat_divisors) or t >= end_beat:
             return QuantizationRecord(quantized_measures)
+
+
+##################################################################################################################
+#                                           Incremental Quantization
+##################################################################################################################
+
+
+class IncrementalQuantizer:
+    """
+    Quantizes notes bit by bit as they come in, rather than all at once at the end. This is used by the
+    :class:`~scamp.transcriber.Transcriber` to quantize a performance while it is still being transcribed. Notes can
+    be added in any order, so long as none of their onsets, terminations or inner splits fall before the point up to
+    which quantization has been finalized. Since the divisor chosen for each beat depends only on the events that fall
+    within that beat, the end result is the same as quantizing all of the notes at once. (In "global" mode, the search
+    for the best divisors takes place separately within each batch of beats that is finalized together.)
+
+    :param quantization_scheme: the QuantizationScheme to use
+    :param onset_weighting: How much do we care about accurate onsets
+    :param termination_weighting: How much do we care about accurate terminations
+    :param inner_split_weighting: How much do we care about inner segmentation timing (e.g. tuple note lengths)
+    :ivar quantization_scheme: the QuantizationScheme being used
+    :ivar finalized_beat: the beat up to which quantization has been finalized
+    :ivar finished: whether or not all notes have been quantized and no more can be added
+    """
+
+    def __init__(self, quantization_scheme: QuantizationScheme, onset_weighting: float = "default",
+                 termination_weighting: float = "default", inner_split_weighting: float = "default"):
+        if not isinstance(quantization_scheme, QuantizationScheme):
+            raise ValueError("Couldn't understand quantization scheme.")
+        self.quantization_scheme = quantization_scheme
+        self.onset_weighting = quantization_settings.onset_weighting \
+            if onset_weighting == "default" else onset_weighting
+        self.termination_weighting = quantization_settings.termination_weighting \
+            if termination_weighting == "default" else termination_weighting
+        self.inner_split_weighting = quantization_settings.inner_split_weighting \
+            if inner_split_weighting == "default" else inner_split_weighting
+        self.finalized_beat = 0
+        self.finished = False
+        self._voices = {}
+        # notes are added from the threads of whatever instruments are playing them, so we need to synchronize
+        self._lock = threading.RLock()
+
+    def add_note(self, voice_name, note: 'PerformanceNote') -> None:
+        """
+        Adds a note to be quantized. Note that the note will be altered in place as it is quantized.
+
+        :param voice_name: any hashable identifier for the voice that this note belongs to
+        :param note: the (unquantized) note to add
+        """
+        with self._lock:
+            if self.finished:
+                raise ValueError("Cannot add notes to an IncrementalQuantizer once it has finished.")
+            if voice_name not in self._voices:
+                self._voices[voice_name] = _IncrementalVoiceQuantizer(self)
+            self._voices[voice_name].add_note(note)
+
+    def finalize_up_to(self, beat: float) -> None:
+        """
+        Chooses divisors for, and quantizes the events in, all beats that end on or before the given beat. The caller
+        is responsible for making sure that no events will be added before this point later.
+
+        :param beat: the beat up to which to finalize quantization
+        """
+        with self._lock:
+            if self.finished or beat <= self.finalized_beat:
+                return
+            for voice in self._voices.values():
+                voice.finalize_up_to(beat)
+            self.finalized_beat = beat
+
+    def finish(self) -> None:
+        """
+        Quantizes everything that remains. No more notes can be added after this is called.
+        """
+        with self._lock:
+            if self.finished:
+                return
+            for voice in self._voices.values():
+                voice.finish()
+            self.finished = True
+
+    @property
+    def voice_names(self) -> Sequence:
+        """
+        The identifiers of all of the voices that notes have been added to, in order of creation.
+        """
+        with self._lock:
+            return tuple(self._voices.keys())
+
+    def get_quantized_voice(self, voice_name) -> Tuple[Sequence[Sequence['PerformanceNote']], QuantizationRecord]:
+        """
+        Returns the result of quantizing the given voice so far. Only notes that have been entirely quantized are
+        included, and the quantization record only covers the beats that have been finalized. Until the quantizer has
+        finished, the notes returned are copies, so that altering them doesn't affect the quantization. (Copies of notes
+        that can no longer change are made only once, and are shared by the results of later calls, so altering them
+        alters those results too; the voice lists themselves are always new.)
+
+        :param voice_name: the identifier of the voice in question
+        :return: tuple of (list of non-overlapping voices, QuantizationRecord), just as produced for each voice of a
+            part by :func:`quantize_performance_part`
+        """
+        with self._lock:
+            return self._voices[voice_name].get_result()
+
+
+class _IncrementalVoiceQuantizer:
+    """
+    Handles the incremental quantization of a single voice on behalf of an :class:`IncrementalQuantizer`.
+
+    Events are stored as (time, note start, note number, note) tuples, so that, just as in _quantize_performance_voice,
+    simultaneous events stay in the order of the notes in the voice, i.e. sorted by start beat and then by order added.
+    """
+
+    def __init__(self, incremental_quantizer: IncrementalQuantizer):
+        self.quantizer = incremental_quantizer
+        self.notes = []
+        # the raw start beats of the notes, parallel to self.notes, used to keep it in order
+        self._note_start_beats = []
+        self._notes_added = 0
+        # unfinalized onsets, terminations and inner splits, each kept sorted
+        self._onsets, self._terminations, self._inner_splits = [], [], []
+        self._beat_scheme_iterator = self.quantizer.quantization_scheme.beat_scheme_iterator()
+        self._next_beat = next(self._beat_scheme_iterator)
+        self.beat_divisors = []
+        self._quantized_note_ids = set()
+        self.last_note_end_beat = 0
+        self._final_result = None
+        # for previews (see get_result): how many notes at the start of self.notes have been settled, i.e. had copies
+        # made, collapsed into chords and sorted into self._settled_voices, none of which will change any more
+        self._num_settled_notes = 0
+        self._settled_voices = []
+
+    def add_note(self, note):
+        if engraving_settings.glissandi.control_point_policy == "split":
+            note._divide_length_at_gliss_control_points()
+
+        start_beat = note.start_beat
+        note_number = self._notes_added
+        self._notes_added += 1
+
+        # keep the notes sorted by start beat, with simultaneous notes in the order they were added
+        index = bisect_right(self._note_start_beats, start_beat)
+        self._note_start_beats.insert(index, start_beat)
+        self.notes.insert(index, note)
+        if index <= self._num_settled_notes:
+            # (only possible when a note is added late) the settled notes might now come out differently
+            self._num_settled_notes = 0
+            self._settled_voices = []
+
+        insort(self._onsets, (start_beat, start_beat, note_number, note))
+        insort(self._terminations, (start_beat + note.length_sum(), start_beat, note_number, note))
+        if hasattr(note.length, "__len__"):
+            t = start_beat
+            for length_segment in note.length[:-1]:
+                t += length_segment
+                insort(self._inner_splits, (t, start_beat, note_number, note))
+
+        if start_beat < self.quantizer.finalized_beat:
+            logging.warning("Note added to IncrementalQuantizer before the point at which quantization was finalized. "
+                            "It will be quantized as part of the next beat.")
+
+    def _has_events(self):
+        return len(self._onsets) + len(self._terminations) + len(self._inner_splits) > 0
+
+    def finalize_up_to(self, beat):
+        self._quantize_beats(stop_beat=beat)
+
+    def finish(self):
+        self._quantize_beats()
+        # trailing empty beats would not have been considered by _quantize_performance_voice
+        while len(self.beat_divisors) > 0 and self.beat_divisors[-1] is None:
+            self.beat_divisors.pop()
+
+    def _quantize_beats(self, stop_beat=None):
+        """
+        Quantizes all beats that end on or before stop_beat, or, if stop_beat is None, all remaining beats with events.
+        """
+        occupied_beats = []
+        occupied_beat_indices = []
+
+        while (self._has_events() if stop_beat is None
+               else self._next_beat[1] + self._next_beat[0].length <= stop_beat):
+            beat_scheme, beat_start = self._next_beat
+            self._next_beat = next(self._beat_scheme_iterator)
+            beat_end = beat_start + beat_scheme.length
+
+            beat_events = []
+            for events in (self._onsets, self._terminations, self._inner_splits):
+                end_index = bisect_left(events, (beat_end, ))
+                beat_events.append([(event[0], event[3]) for event in events[:end_index]])
+                del events[:end_index]
+            onsets_in_this_beat, terminations_in_this_beat, inner_splits_in_this_beat = beat_events
+
+            if len(onsets_in_this_beat) + len(terminations_in_this_beat) + len(inner_splits_in_this_beat) == 0:
+                self.beat_divisors.append(None)
+                continue
+
+            occupied_beat_indices.append(len(self.beat_divisors))
+            self.beat_divisors.append(None)
+            occupied_beats.append(
+                (beat_scheme, beat_start, onsets_in_this_beat, terminations_in_this_beat, inner_splits_in_this_beat)
+            )
+
+        best_divisors = _choose_beat_divisors(occupied_beats, self.quantizer.quantization_scheme,
+                                              self.quantizer.onset_weighting, self.quantizer.termination_weighting,
+                                              self.quantizer.inner_split_weighting)
+
+        for beat_index, best_divisor, occupied_beat in zip(occupied_beat_indices, best_divisors, occupied_beats):
+            beat_scheme, beat_start, onsets_in_this_beat, terminations_in_this_beat, inner_splits_in_this_beat = \
+                occupied_beat
+            self.beat_divisors[beat_index] = best_divisor
+            _quantize_events_in_beat(beat_scheme, beat_start, best_divisor, onsets_in_this_beat,
+                                     terminations_in_this_beat, inner_splits_in_this_beat)
+            # a note's termination is its last event, so once it has been quantized, the note is done
+            for _, note in terminations_in_this_beat:
+                _implement_quantized_split_points(note)
+                self._quantized_note_ids.add(id(note))
+                self.last_note_end_beat = max(note.end_beat, self.last_note_end_beat)
+
+    def get_result(self):
+        if self._final_result is not None:
+            return self._final_result
+        quantization_record = _construct_quantization_record(
+            self.beat_divisors, self.last_note_end_beat, self.quantizer.quantization_scheme
+        )
+        if self.quantizer.finished:
+            # no more changes are coming, so we can hand over the notes themselves
+            voice = list(self.notes)
+            _collapse_chords(voice)
+            self._final_result = _separate_into_non_overlapping_voices(voice), quantization_record
+            return self._final_result
+
+        # for a preview, only the notes after the settled ones need to be copied, collapsed and sorted into voices
+        self._settle_notes()
+        unsettled_notes = deepcopy([note for note in self.notes[self._num_settled_notes:]
+                                    if id(note) in self._quantized_note_ids])
+        _collapse_chords(unsettled_notes)
+        if len(unsettled_notes) > 0 and self._num_settled_notes > 0 and \
+                unsettled_notes[0].start_beat == self.notes[self._num_settled_notes - 1].start_beat:
+            # the first of these could have formed a chord with the last settled note (which can only happen if
+            # quantization nudged a start beat backwards), so fall back to doing everything from scratch
+            voice = deepcopy([note for note in self.notes if id(note) in self._quantized_note_ids])
+            _collapse_chords(voice)
+            return _separate_into_non_overlapping_voices(voice), quantization_record
+        voices = [list(voice) for voice in self._settled_voices]
+        _add_notes_to_non_overlapping_voices(voices, unsettled_notes)
+        return voices, quantization_record
+
+    def _settle_notes(self):
+        """
+        Settles the notes following the ones already settled, up to the first note that has not been fully quantized.
+        The last run of these that start together is held back, since a note yet to be quantized might still join them
+        in a chord; this way, none of the settled notes can form a chord with a note that comes after them.
+        """
+        num_quantized = self._num_settled_notes
+        while num_quantized < len(self.notes) and id(self.notes[num_quantized]) in self._quantized_note_ids:
+            num_quantized += 1
+        num_to_settle = num_quantized
+        while num_to_settle > self._num_settled_notes and \
+                self.notes[num_to_settle - 1].start_beat == self.notes[num_quantized - 1].start_beat:
+            num_to_settle -= 1
+        if num_to_settle > self._num_settled_notes:
+            newly_settled_notes = deepcopy(self.notes[self._num_settled_notes:num_to_settle])
+            _collapse_chords(newly_settled_notes)
+            _add_notes_to_non_overlapping_voices(self._settled_voices, newly_settled_notes)
+            self._num_settled_notes = num_to_settle
+
+
+##################################################################################################################
+#                                             Quantization Cache
+##################################################################################################################
+
+
+class _QuantizationCache:
+    """
+    Content-addressed cache of quantization results. Each entry is keyed by a hash of the fields of a voice's notes
+    together with everything else that affects how they quantize (the quantization scheme, the weightings and the
+    glissandi settings), and holds the pickled result: the list of non-overlapping voices, the QuantizationRecord and
+    the indices of the original notes that the quantized ones came from. Since the result is stored pickled, every
+    retrieval produces fresh notes, whose values are then copied onto the notes being quantized.
+
+    Entries are kept in memory, and optionally in a directory on disk. How many of each are kept, and where the disk
+    cache lives, is determined by the "cache_max_entries", "cache_max_disk_entries" and "cache_directory" entries of
+    quantization_settings; in both cases, the least recently used entries are evicted first.
+    """
+
+    #: Bumped whenever a change to quantization would make previously cached results wrong
+    format_version = 2
+
+    file_extension = ".quantization"
+
+    def __init__(self):
+        self._entries = LRUCache(lambda: quantization_settings.cache_max_entries)
+
+    @staticmethod
+    def is_enabled() -> bool:
+        """
+        Whether the quantization settings call for any caching at all.
+        """
+        return quantization_settings.cache_max_entries > 0 or quantization_settings.cache_directory is not None
+
+    @staticmethod
+    def get_key(voice, quantization_scheme, onset_weighting, termination_weighting, inner_split_weighting) -> str:
+        """
+        Returns the hash under which the result of quantizing the given voice in the given way is stored. (The
+        arguments are the same as those of :func:`_quantize_and_separate_voice`, with defaults resolved.)
+        """
+        key = hashlib.sha256(repr((
+            _QuantizationCache.format_version, _scamp_version, _get_quantization_scheme_fingerprint(quantization_scheme),
+            onset_weighting, termination_weighting, inner_split_weighting, engraving_settings.glissandi.json_dumps()
+        )).encode())
+        for note in voice:
+            key.update(_QuantizationCache._get_note_fingerprint(note).encode())
+        return key.hexdigest()
+
+    @staticmethod
+    def _get_note_fingerprint(note) -> str:
+        # a description of everything about a note that affects how it quantizes (the properties are included in
+        # full, with their temporary entries, since those can hold split points and ids for tying notes together)
+        return "{!r}|{!r}|{!r}|{!r}|{!r}\n".format(
+            note.start_beat, note.length, note.pitch, note.volume,
+            sorted(note.properties.items(), key=lambda item: item[0])
+        )
+
+    def get(self, key: str):
+        """
+        Returns the cached (non-overlapping voices, QuantizationRecord, source indices) tuple stored under the given
+        key, or None if there is no such entry in memory or on disk.
+        """
+        pickled_result = self._entries.get(key)
+        if pickled_result is None and quantization_settings.cache_directory is not None:
+            pickled_result = self._read_from_disk(key)
+            if pickled_result is not None:
+                self._entries.put(key, pickled_result)
+
+        if pickled_result is None:
+            return None
+        try:
+            return pickle.loads(pickled_result)
+        except Exception:
+            logging.warning("Could not load cached quantization {}; quantizing from scratch.".format(key))
+            return None
+
+    def put(self, key: str, result) -> None:
+        """
+        Stores the result of a quantization under the given key, in memory and (if there's a cache directory) on disk.
+
+        :param key: the key, as returned by get_key
+        :param result: tuple of (list of non-overlapping voices, QuantizationRecord, source indices), as returned by
+            :func:`_quantize_and_separate_voice`
+        """
+        pickled_result = pickle.dumps(result, protocol=4)
+        self._entries.put(key, pickled_result)
+        if quantization_settings.cache_directory is not None:
+            self._write_to_disk(key, pickled_result)
+
+    def clear(self, include_disk: bool = False) -> None:
+        """
+        Empties the in-memory cache, and optionally the cache directory.
+
+        :param include_disk: if True, also deletes the cache files in the cache directory
+        """
+        self._entries.clear()
+        if include_disk and quantization_settings.cache_directory is not None:
+            for file_path in self._get_cache_files():
+                try:
+                    os.remove(file_path)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _get_cache_directory():
+        return os.path.expanduser(quantization_settings.cache_directory)
+
+    def _get_cache_files(self):
+        cache_directory = self._get_cache_directory()
+        if not os.path.isdir(cache_directory):
+            return []
+        return [os.path.join(cache_directory, file_name) for file_name in os.listdir(cache_directory)
+                if file_name.endswith(_QuantizationCache.file_extension)]
+
+    def _read_from_disk(self, key):
+        file_path = os.path.join(self._get_cache_directory(), key + _QuantizationCache.file_extension)
+        try:
+            with open(file_path, "rb") as file:
+                pickled_result = file.read()
+            # touch the file, so that eviction treats it as recently used
+            os.utime(file_path)
+            return pickled_result
+        except OSError:
+            return None
+
+    def _write_to_disk(self, key, pickled_result):
+        cache_directory = self._get_cache_directory()
+        file_path = os.path.join(cache_directory, key + _QuantizationCache.file_extension)
+        try:
+            os.makedirs(cache_directory, exist_ok=True)
+            # write to a temporary file and then move it into place, so that no one ever reads a partial file
+            temporary_path = "{}.{}.tmp".format(file_path, os.getpid())
+            with open(temporary_path, "wb") as file:
+                file.write(pickled_result)
+            os.replace(temporary_path, file_path)
+            self._evict_from_disk()
+        except OSError as e:
+            logging.warning("Could not write to quantization cache directory {}: {}".format(cache_directory, e))
+
+    def _evict_from_disk(self):
+        cache_files = self._get_cache_files()
+        num_to_remove = len(cache_files) - max(quantization_settings.cache_max_disk_entries, 0)
+        if num_to_remove <= 0:
+            return
+        cache_files.sort(key=os.path.getmtime)
+        for file_path in cache_files[:num_to_remove]:
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+
+
+def _get_quantization_scheme_fingerprint(quantization_scheme):
+    # a hashable description of everything about a quantization scheme that affects the result of quantization
+    return (
+        quantization_scheme.loop, quantization_scheme.mode, quantization_scheme.beam_width,
+        tuple(
+            (measure_scheme.time_signature.as_string(), tuple(measure_scheme.time_signature.beat_lengths),
+             repr(measure_scheme.beat_groupings),
+             tuple((beat_scheme.length, tuple(beat_scheme.quantization_divisions))
+                   for beat_scheme in measure_scheme.beat_schemes))
+            for measure_scheme in quantization_scheme.measure_schemes
+        )
+    )
+
+
+_quantization_cache = _QuantizationCache()
+
+
+def clear_quantization_cache(include_disk: bool = False) -> None:
+    """
+    Empties the cache of quantization results (see the "cache_max_entries", "cache_directory" and
+    "cache_max_disk_entries" quantization settings).
+
+    :param include_disk: if True, also deletes the cached results stored in the cache directory
+    """
+    _quantization_cache.clear(include_disk)
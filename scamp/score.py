@@ -5,23 +5,33 @@ largest to smallest: :class:`Score`, :class:`StaffGroup`, :class:`Staff`, :class
 provide export functionality to both MusicXML and LilyPond.
 """
 from numbers import Real
-from .settings import quantization_settings, engraving_settings
+from .settings import quantization_settings, engraving_settings, EngravingSettings
 from expenvelope import Envelope
 from .quantization import QuantizationRecord, QuantizationScheme, QuantizedMeasure, TimeSignature
 from . import performance as performance_module  # to distinguish it from variables named performance
-from .utilities import prime_factor, floor_x_to_pow_of_y, is_x_pow_of_y, ceil_to_multiple, floor_to_multiple
+from .utilities import prime_factor, floor_x_to_pow_of_y, is_x_pow_of_y, ceil_to_multiple, floor_to_multiple, LRUCache
 from ._engraving_translations import length_to_note_type, get_xml_notehead, get_lilypond_notehead_name, \
     articulation_to_xml_element_name, notations_to_xml_notations_element
 from ._note_properties import NotePropertiesDictionary
 import pymusicxml
+from xml.etree import ElementTree
+from xml.dom import minidom
 from pymusicxml.music_xml_objects import _XMLNote, MusicXMLComponent
 from ._dependencies import abjad
+from . import _lilypond
+from .profiling import _profiled_stage
 import math
+import os
+import tempfile
+import functools
+import multiprocessing
+import hashlib
+import pickle
+from contextlib import contextmanager
 from fractions import Fraction
-from copy import deepcopy
-from itertools import accumulate, count
+from itertools import accumulate, chain, count
 import textwrap
-from collections import namedtuple
+from collections import namedtuple, Counter
 from abc import ABC, abstractmethod
 import logging
 from ._metric_structure import MetricStructure
@@ -38,29 +48,50 @@ def _is_undotted_length(length):
     return length in length_to_note_type
 
 
+def _get_notatable_length_table(max_dots):
+    """
+    Returns a dictionary mapping every length that can be written as a single (possibly dotted) note to a tuple of
+    the undotted length and the number of dots. The table is built the first time it is asked for with a given value
+    of max_dots, which means that changing engraving_settings.max_dots_allowed simply results in a different table.
+
+    :param max_dots: the maximum number of dots allowed (a single dot is always allowed)
+    """
+    if max_dots not in _notatable_length_tables:
+        notatable_lengths = {}
+        # go from most dots to fewest, so that when two readings coincide, the one with fewer dots wins
+        for num_dots in range(max(max_dots, 1), -1, -1):
+            dots_multiplier = 2 - Fraction(1, 2 ** num_dots)
+            for undotted_length in length_to_note_type:
+                undotted_length = Fraction(undotted_length)
+                notatable_lengths[undotted_length * dots_multiplier] = undotted_length, num_dots
+        _notatable_length_tables[max_dots] = notatable_lengths
+    return _notatable_length_tables[max_dots]
+
+
+# maps max_dots to a dictionary from notatable length to (undotted length, number of dots)
+_notatable_length_tables = {}
+
+
+@functools.lru_cache(maxsize=4096)
+def _look_up_notatable_length(length, max_dots):
+    # memoized on the length as given, since converting it to an exact fraction (which fixes any floating point
+    # inaccuracies) and hashing that fraction cost more than the table lookup itself
+    return _get_notatable_length_table(max_dots).get(Fraction(length).limit_denominator())
+
+
 def _get_basic_length_and_num_dots(length):
-    length = Fraction(length).limit_denominator()
-    if _is_undotted_length(length):
-        return length, 0
-    else:
-        dots_multiplier = 1.5
-        dots = 1
-        while not _is_undotted_length(length / dots_multiplier):
-            dots += 1
-            dots_multiplier = (2.0 ** (dots + 1) - 1) / 2.0 ** dots
-            if dots > engraving_settings.max_dots_allowed:
-                raise ValueError("Duration length of {} does not resolve to single note type.".format(length))
-        return length / dots_multiplier, dots
+    basic_length_and_num_dots = _look_up_notatable_length(length, engraving_settings.max_dots_allowed)
+    if basic_length_and_num_dots is None:
+        raise ValueError("Duration length of {} does not resolve to single note type."
+                         .format(Fraction(length).limit_denominator()))
+    return basic_length_and_num_dots
 
 
 def _is_single_note_length(length):
-    try:
-        _get_basic_length_and_num_dots(length)
-        return True
-    except ValueError:
-        return False
+    return _look_up_notatable_length(length, engraving_settings.max_dots_allowed) is not None
 
 
+@functools.lru_cache(maxsize=1024)
 def _length_to_undotted_constituents(length):
     # fix any floating point inaccuracies
     length = Fraction(length).limit_denominator()
@@ -69,7 +100,27 @@ def _length_to_undotted_constituents(length):
         this_part = floor_x_to_pow_of_y(length, 2.0)
         length -= this_part
         length_parts.append(this_part)
-    return length_parts
+    # (a tuple, since the result is memoized and mustn't be altered)
+    return tuple(length_parts)
+
+
+def _count_part_notes(performance_part, *args, **kwargs):
+    # number of notes in a PerformancePart, as reported when profiling
+    return sum(len(voice) for voice in performance_part.voices.values())
+
+
+def _count_component_notes(score_component, *args, **kwargs):
+    # number of notes (not counting rests) in a score component, as reported when profiling
+    if isinstance(score_component, (Score, StaffGroup)):
+        measures = [measure for staff in score_component.staves for measure in staff.measures]
+    elif isinstance(score_component, Staff):
+        measures = score_component.measures
+    elif isinstance(score_component, Measure):
+        measures = [score_component]
+    else:
+        return None
+    return sum(1 for measure in measures for voice in measure.voices if voice is not None
+               for _ in voice.iterate_notes())
 
 
 def _get_beat_division_hierarchy(beat_length, beat_divisor, small_to_big=True):
@@ -133,15 +184,15 @@ def _worsen_hierarchy_tuples(hierarchy, how_much=1, in_place=True):
     return hierarchy
 
 
-# TODO: MEMOIZE THE SHIT OUT OF THIS!!!
+@functools.lru_cache(maxsize=1024)
 def _get_beat_division_grids(beat_hierarchy):
+    # beat_hierarchy must be a tuple, so that the result can be memoized; the grids are returned as tuples too
     out = []
     for thresh in range(max(beat_hierarchy)):
-        out.append([x for x in range(len(beat_hierarchy)) if beat_hierarchy[x] <= thresh])
-    return out
+        out.append(tuple(x for x in range(len(beat_hierarchy)) if beat_hierarchy[x] <= thresh))
+    return tuple(out)
 
 
-# should maybe memoize?
 def _is_single_note_viable_grouping(length_in_subdivisions, max_dots=1):
     """
     This tests if a note that is length_in_subdivisions subdivisions long can be represented by a single note.
@@ -149,9 +200,31 @@ def _is_single_note_viable_grouping(length_in_subdivisions, max_dots=1):
     can represent, with one notehead, a not of length 7 16th notes. The answer is False with max_dots = 1, but
     True with max_dots = 2, since a double-dotted quarter satisfies our requirement.
 
+    The answers are looked up in a table, which is filled in ahead of time for the lengths that commonly come up,
+    and added to as other lengths are encountered.
+
     :param length_in_subdivisions: how many subdivisions we wish to combine
     :param max_dots: max dots we are allowing
     """
+    if max_dots not in _single_note_viability_tables:
+        _single_note_viability_tables[max_dots] = {
+            length: _calculate_single_note_viability(length, max_dots)
+            for length in range(1, _SINGLE_NOTE_VIABILITY_TABLE_SIZE + 1)
+        }
+    viability_table = _single_note_viability_tables[max_dots]
+    if length_in_subdivisions not in viability_table:
+        viability_table[length_in_subdivisions] = _calculate_single_note_viability(length_in_subdivisions, max_dots)
+    return viability_table[length_in_subdivisions]
+
+
+# number of lengths (in subdivisions) for which _is_single_note_viable_grouping fills in its table ahead of time
+_SINGLE_NOTE_VIABILITY_TABLE_SIZE = 128
+# maps max_dots to a dictionary from length in subdivisions to whether or not that length is viable
+_single_note_viability_tables = {}
+
+
+def _calculate_single_note_viability(length_in_subdivisions, max_dots):
+    # the actual calculation behind _is_single_note_viable_grouping
     dot_multipliers = [2 - 2**(-x) for x in range(max_dots+1)]
     for dot_multiplier in dot_multipliers:
         if Fraction(math.log2(length_in_subdivisions / dot_multiplier)).limit_denominator().denominator == 1:
@@ -165,6 +238,9 @@ def _get_best_recombination_given_beat_hierarchy(note_division_points, beat_hier
         along with a list of the beat hierarchies for that grid. Returns a merged list of component start and end
         times, in which important division points are preserved and less important ones are removed.
 
+    The same division points and hierarchies come up over and over again in a typical score, so the results are
+    memoized (see :func:`_get_best_recombination`).
+
     :param note_division_points: list of the points on the isochronous grid representing note component starts and ends
     :param beat_hierarchy_list: the result of _get_beat_division_hierarchy; a list of values for each beat in an
         isochronous grid, where 0 is the most important beat (always the downbeat), 1 is the next most important kind
@@ -172,6 +248,18 @@ def _get_best_recombination_given_beat_hierarchy(note_division_points, beat_hier
     :param is_rest: changes the settings, by default in such a way that less recombination happens
     :return: a new, better, I dare say shinier, list of note division points.
     """
+    return _get_best_recombination(tuple(note_division_points), tuple(beat_hierarchy_list),
+                                   *_get_recombination_settings(is_rest))
+
+
+def _get_recombination_settings(is_rest):
+    """
+    Returns the engraving settings that affect how the components of a note are recombined, in the form of a tuple
+    that can be passed on to (and form part of the cache key of) the memoized recombination functions.
+
+    :param is_rest: whether we are recombining a rest, which by default uses settings leading to less recombination
+    :return: tuple of (beat_hierarchy_spacing, num_divisions_penalty, max_dots_allowed)
+    """
     # the factor that the badness goes up from one rung of the beat hierarchy to the next.
     # A high value makes greater differentiation between important and less important beats, probably
     # leading to less recombination in favor of clearer delineation of the beat structure.
@@ -183,20 +271,37 @@ def _get_best_recombination_given_beat_hierarchy(note_division_points, beat_hier
     # tied notes as possible.
     num_divisions_penalty = engraving_settings.rest_num_divisions_penalty if is_rest \
         else engraving_settings.num_divisions_penalty
+    return beat_hierarchy_spacing, num_divisions_penalty, engraving_settings.max_dots_allowed
 
-    adjusted_hierarchies = [beat_hierarchy_spacing ** x for x in beat_hierarchy_list]
+
+@functools.lru_cache(maxsize=8192)
+def _get_best_recombination(note_division_points, beat_hierarchies, beat_hierarchy_spacing, num_divisions_penalty,
+                            max_dots):
+    """
+    Memoized implementation of :func:`_get_best_recombination_given_beat_hierarchy`, with all of the relevant
+    engraving settings passed in explicitly, so that they form part of the cache key.
+
+    :param note_division_points: tuple of the points on the isochronous grid representing note component starts and
+        ends
+    :param beat_hierarchies: tuple of beat hierarchy values for each point in the isochronous grid
+    :param beat_hierarchy_spacing: the factor that the badness goes up from one rung of the beat hierarchy to the next
+    :param num_divisions_penalty: penalty (from 0 to 1) for using more than one component to represent a note
+    :param max_dots: the maximum number of dots allowed on a note
+    :return: tuple of (best division points, score)
+    """
+    adjusted_hierarchies = tuple(beat_hierarchy_spacing ** x for x in beat_hierarchies)
 
     # if we have long notes made up of a ton of parts, we would run into number crunching hell trying all the
     # possible recombinations. So instead, we break the note division points list into subgroups no longer than 5
     # and then get the best recombination for each subgroup, and stick them all together.
-    subgroups = _break_up_large_division_points_list(note_division_points, beat_hierarchy_list, 5)
+    subgroups = _break_up_large_division_points_list(note_division_points, beat_hierarchies, 5)
 
     best_option = ()
     best_score = 0
 
     for subgroup in subgroups:
         best_subgroup_option, best_subgroup_score = _get_best_subgroup_recombination_option(
-            subgroup, adjusted_hierarchies, num_divisions_penalty)
+            subgroup, adjusted_hierarchies, num_divisions_penalty, max_dots)
         best_option += best_subgroup_option
         best_score += best_subgroup_score
 
@@ -213,7 +318,12 @@ def _break_up_large_division_points_list(division_points, hierarchies, max_subgr
         return division_points,
 
 
-def _get_best_subgroup_recombination_option(note_division_points, adjusted_hierarchies, num_divisions_penalty):
+@functools.lru_cache(maxsize=8192)
+def _get_best_subgroup_recombination_option(note_division_points, adjusted_hierarchies, num_divisions_penalty,
+                                            max_dots):
+    # (the arguments are all hashable, so that the results can be memoized: note_division_points and
+    # adjusted_hierarchies are tuples, and max_dots is engraving_settings.max_dots_allowed)
+
     # if there's only one division point in this subgroup, then there's no way of recombining it!
     if len(note_division_points) == 1:
         return tuple(note_division_points), 0
@@ -221,14 +331,13 @@ def _get_best_subgroup_recombination_option(note_division_points, adjusted_hiera
     # translate time-points on the isochronous grid to durations in isochronous units after the start of the note
     component_lengths = [division - last_division
                          for last_division, division in zip(note_division_points[:-1], note_division_points[1:])]
-    assert all(_is_single_note_viable_grouping(x, max_dots=engraving_settings.max_dots_allowed)
+    assert all(_is_single_note_viable_grouping(x, max_dots=max_dots)
                for x in component_lengths), "Somehow we got an division of a note into un-notatable components"
 
     # get every possible combination of these components that keeps each component representable as a single note
     recombination_options_lengths = [
         option for option in _get_recombination_options(*component_lengths)
-        if all(_is_single_note_viable_grouping(component, max_dots=engraving_settings.max_dots_allowed)
-               for component in option)
+        if all(_is_single_note_viable_grouping(component, max_dots=max_dots) for component in option)
     ]
 
     # now, finally, we make ourselves a list options for division-point lists, each of which represents a recombination
@@ -272,6 +381,7 @@ def _get_num_bad_crossings(recombination_option, hierarchies):
         return sum(hierarchies[x] < threshold for x in range(start_segment+1, end_segment))
 
 
+@functools.lru_cache(maxsize=4096)
 def _get_recombination_options(*component_lengths):
     if len(component_lengths) == 1:
         return component_lengths,
@@ -280,27 +390,69 @@ def _get_recombination_options(*component_lengths):
                tuple((component_lengths[0], ) + x for x in _get_recombination_options(*component_lengths[1:]))
 
 
-def _join_same_source_abjad_note_group(same_source_group):
+@functools.lru_cache(maxsize=8192)
+def _get_division_points_for_note(start_division, end_division, beat_division_hierarchy, beat_hierarchy_spacing,
+                                  num_divisions_penalty, max_dots):
+    """
+    Memoized implementation of Voice._get_division_points_for_note. Finds the points on the isochronous grid of a beat
+    at which a note going from start_division to end_division should be broken into tied components.
+
+    :param start_division: the division of the beat at which the note starts
+    :param end_division: the division of the beat at which the note ends
+    :param beat_division_hierarchy: tuple of beat hierarchy values for each division of the beat
+    :param beat_hierarchy_spacing: see :func:`_get_recombination_settings`
+    :param num_divisions_penalty: see :func:`_get_recombination_settings`
+    :param max_dots: the maximum number of dots allowed on a note
+    :return: tuple of (division points, score)
+    """
+    beat_division_grids = _get_beat_division_grids(beat_division_hierarchy)[1:]
+    current_division = start_division
+    division_points = [current_division]
+
+    go_again = True
+    while go_again:
+        go_again = False
+
+        # starting with the widest grid, going down to the narrowest
+        for beat_division_grid in beat_division_grids:
+            # go through all the division points in this grid, and see if we can make it to them directly
+            for division_point in beat_division_grid + (len(beat_division_hierarchy), ):
+                # if the division point is past where we are and not beyond the end of the note
+                # and if we can get there in a single note
+                if current_division < division_point <= end_division \
+                        and _is_single_note_viable_grouping(division_point - current_division, max_dots):
+                    division_points.append(division_point)
+                    current_division = division_point
+                    if division_point != end_division:
+                        go_again = True
+                    break
+            else:
+                continue
+            break
+
+    if current_division < end_division:
+        for x in _length_to_undotted_constituents(end_division - current_division):
+            division_points.append(int(round(x)) + division_points[-1])
+
+    return _get_best_recombination(tuple(division_points), beat_division_hierarchy, beat_hierarchy_spacing,
+                                   num_divisions_penalty, max_dots)
+
+
+def _join_same_source_lilypond_note_group(same_source_group, backend):
     # look pairwise to see if we need to tie or gliss
     # sometimes a note will gliss, then sit at a static pitch
-
     gliss_present = False
-    for note_pair in zip(same_source_group[:-1], same_source_group[1:]):
-        if isinstance(note_pair[0], abjad().Note) and note_pair[0].written_pitch == note_pair[1].written_pitch or \
-                isinstance(note_pair[0], abjad().Chord) and note_pair[0].written_pitches == note_pair[1].written_pitches:
-            abjad().tie(abjad().Selection(note_pair))
-            # abjad().attach(abjad().Tie(), abjad().Selection(note_pair))
+    for first_leaf, second_leaf in zip(same_source_group[:-1], same_source_group[1:]):
+        if backend.pitch_key(first_leaf) is not None and \
+                backend.pitch_key(first_leaf) == backend.pitch_key(second_leaf):
+            backend.tie(first_leaf, second_leaf)
         else:
-            # abjad().glissando(abjad().Selection(note_pair))
-            abjad().attach(abjad().LilyPondLiteral("\glissando", "after"), note_pair[0])
-
-            # abjad().attach(abjad().Glissando(), abjad().Selection(note_pair))
+            backend.attach_after_literal(first_leaf, r"\glissando")
             gliss_present = True
 
     if gliss_present:
         # if any of the segments gliss, we might attach a slur
-        abjad().slur(abjad().Selection(same_source_group))
-        # abjad().attach(abjad().Slur(), abjad().Selection(same_source_group))
+        backend.slur(same_source_group)
 
 
 # generates unique ids for gliss slurs that won't conflict with manual slurs
@@ -408,6 +560,57 @@ def _join_same_source_xml_note_group(same_source_group):
         same_source_group[-1].notations.append(pymusicxml.StopSlur(slur_id))
 
 
+def _renumber_xml_slurs(xml_measure, input_to_output_numbers):
+    """
+    Converts the slur ids in a pymusicxml Measure to numbers from 1-6, as MusicXML requires. This does the same thing
+    as pymusicxml.Part._validate_slur_numbers, but a measure at a time, so that a part can be written out measure by
+    measure (see :func:`Score.write_music_xml`).
+
+    :param xml_measure: a pymusicxml.Measure, whose slur ids are altered in place
+    :param input_to_output_numbers: dictionary mapping slur ids to lists of the output numbers assigned to them.
+        This carries over from one measure of the part to the next, and should start out empty.
+    """
+    for note_chord_rest in xml_measure.iter_leaves():
+        for notation in note_chord_rest.notations:
+            if isinstance(notation, pymusicxml.StartSlur):
+                available_slur_numbers = [x for x in range(1, 7)
+                                          if x not in sum(input_to_output_numbers.values(), [])]
+                if notation.slur_id in available_slur_numbers:
+                    available_slur_numbers.remove(notation.slur_id)
+                    input_to_output_numbers.setdefault(notation.slur_id, []).append(notation.slur_id)
+                elif len(available_slur_numbers) > 0:
+                    output_num = available_slur_numbers[0]
+                    input_to_output_numbers.setdefault(notation.slur_id, []).append(output_num)
+                    notation.slur_id = output_num
+                else:
+                    logging.warning("Ran out of available slur numbers; too many simultaneous slurs.")
+            elif isinstance(notation, pymusicxml.StopSlur):
+                if notation.slur_id in input_to_output_numbers:
+                    output_num = input_to_output_numbers[notation.slur_id].pop(0)
+                    if len(input_to_output_numbers[notation.slur_id]) == 0:
+                        del input_to_output_numbers[notation.slur_id]
+                    notation.slur_id = output_num
+                else:
+                    logging.warning("Tried to stop slur that was never started.")
+
+
+def _render_xml_element(element, pretty_print, indentation_level=0):
+    """
+    Renders an ElementTree element to a MusicXML string, formatted the same way as by pymusicxml, so that pieces of a
+    score can be written out separately (see :func:`Score.write_music_xml`).
+
+    :param element: an ElementTree element
+    :param pretty_print: whether to format the result with line breaks and indentation
+    :param indentation_level: how deep this element is nested in the document (only relevant when pretty printing)
+    """
+    if pretty_print:
+        pretty_xml = minidom.parseString(ElementTree.tostring(element, 'utf-8')).toprettyxml(indent="\t")
+        # toprettyxml adds an xml declaration line at the top, which we don't want
+        return "".join("\t" * indentation_level + line + "\n" for line in pretty_xml.splitlines()[1:])
+    else:
+        return ElementTree.tostring(element, 'utf-8').decode()
+
+
 def _get_clef_from_average_pitch_and_clef_choices(average_pitch: float,
                                                   clef_choices: Sequence[Union[str, Tuple[str, Real]]]) -> str:
     # find the clef whose pitch center is closest to the average pitch
@@ -427,6 +630,343 @@ def _get_clef_from_average_pitch_and_clef_choices(average_pitch: float,
 
     return closest_clef
 
+##################################################################################################################
+#                                           LilyPond Output Backends
+##################################################################################################################
+
+
+class _LilyPondBackend(ABC):
+
+    """
+    The score components are converted to LilyPond by a single set of methods (see
+    :func:`ScoreComponent._to_lilypond_object`), which build their output via one of these backends: either out of
+    abjad components (:class:`_AbjadBackend`), or out of the lightweight components of the _lilypond module, which
+    write out LilyPond code directly (:class:`_DirectLilyPondBackend`). Both give exactly the same LilyPond code. Each
+    method here is one step of the conversion that the two libraries do differently.
+    """
+
+    @abstractmethod
+    def score(self, contents):
+        """A Score context holding the given staves and staff groups."""
+        pass
+
+    @abstractmethod
+    def staff_group(self, contents):
+        """A StaffGroup context holding the given staves."""
+        pass
+
+    @abstractmethod
+    def staff(self, contents, name: str):
+        """A Staff context holding the given measures, with the given name as its instrument name."""
+        pass
+
+    @abstractmethod
+    def get_top_staff(self, score):
+        """The first staff of the given score (which may be inside a staff group)."""
+        pass
+
+    @abstractmethod
+    def simultaneous_container(self, contents):
+        """A simultaneous container (<< >>) holding the given voices."""
+        pass
+
+    @abstractmethod
+    def voice(self, contents, name: str = None):
+        """A Voice context holding the given leaves and tuplets."""
+        pass
+
+    @abstractmethod
+    def bar_rest_voice(self, numerator: int, denominator: int):
+        """A Voice context holding a single multi-measure rest filling a measure of the given time signature."""
+        pass
+
+    @abstractmethod
+    def tuplet(self, multiplier: Fraction, contents):
+        """A tuplet whose contents are scaled by the given multiplier (e.g. 2/3 for a triplet)."""
+        pass
+
+    @abstractmethod
+    def note(self, name_octave_and_alteration: Tuple[str, int, float], duration: Fraction):
+        """A note with the given pitch (as given by SpellingPolicy.resolve_name_octave_and_alteration)."""
+        pass
+
+    @abstractmethod
+    def chord(self, names_octaves_and_alterations: Sequence[Tuple[str, int, float]], duration: Fraction):
+        """A chord with the given pitches (as given by SpellingPolicy.resolve_name_octave_and_alteration)."""
+        pass
+
+    @abstractmethod
+    def rest(self, duration: Fraction):
+        """A rest of the given duration (in whole notes)."""
+        pass
+
+    @abstractmethod
+    def skip(self, duration: Fraction):
+        """A skip of the given duration (in whole notes)."""
+        pass
+
+    @abstractmethod
+    def pitch_key(self, leaf):
+        """Something that compares equal for two notes or chords with the same pitches (None for other leaves)."""
+        pass
+
+    @abstractmethod
+    def get_note_heads(self, note_or_chord) -> list:
+        """The note heads of a note or chord, from low to high."""
+        pass
+
+    @abstractmethod
+    def set_note_head_style(self, note_head, style: str) -> None:
+        """Tweaks the style of the given note head."""
+        pass
+
+    @abstractmethod
+    def add_comment(self, leaf, comment: str) -> None:
+        """Adds a comment line before the given leaf."""
+        pass
+
+    @abstractmethod
+    def attach_opening_literal(self, component, literal: str) -> None:
+        """Adds a line of LilyPond code before the given leaf, or at the start of the given container."""
+        pass
+
+    @abstractmethod
+    def attach_after_literal(self, leaf, literal: str) -> None:
+        """Adds a LilyPond command after the given leaf."""
+        pass
+
+    @abstractmethod
+    def attach_clef(self, container, clef: str) -> None:
+        """Sets the clef at the first leaf of the given container."""
+        pass
+
+    @abstractmethod
+    def add_articulation(self, leaf, articulation: str) -> None:
+        """Attaches the given articulation to the given leaf."""
+        pass
+
+    @abstractmethod
+    def attach_after_grace_notes(self, leaf, grace_notes) -> None:
+        """Attaches the given notes as after-grace notes of the given leaf."""
+        pass
+
+    @abstractmethod
+    def tie(self, first_leaf, second_leaf) -> None:
+        """Ties the first leaf to the second."""
+        pass
+
+    @abstractmethod
+    def slur(self, leaves) -> None:
+        """Slurs the given leaves together."""
+        pass
+
+    @abstractmethod
+    def add_metronome_mark(self, leaf, beat_length: float, units_per_minute: int,
+                           textual_indication: str = None) -> None:
+        """Attaches a metronome mark, whose beat is the given length in quarter notes, to the given leaf."""
+        pass
+
+    @abstractmethod
+    def add_text_spanner(self, start_leaf, stop_leaf, text: str) -> None:
+        """Attaches a text spanner (e.g. "accel. - - -") from the start leaf to the stop leaf."""
+        pass
+
+
+class _AbjadBackend(_LilyPondBackend):
+
+    """Builds the LilyPond output out of abjad components."""
+
+    def score(self, contents):
+        return abjad().Score(contents)
+
+    def staff_group(self, contents):
+        return abjad().StaffGroup(contents)
+
+    def staff(self, contents, name):
+        abjad_staff = abjad().Staff(contents, name=name)
+        abjad().setting(abjad_staff).instrument_name = abjad().Scheme(name, force_quotes=True)
+        return abjad_staff
+
+    def get_top_staff(self, score):
+        return score[0][0] if isinstance(score[0], abjad().StaffGroup) else score[0]
+
+    def simultaneous_container(self, contents):
+        abjad_container = abjad().Container(contents)
+        abjad_container.simultaneous = True
+        return abjad_container
+
+    def voice(self, contents, name=None):
+        return abjad().Voice(contents, name=name)
+
+    def bar_rest_voice(self, numerator, denominator):
+        try:
+            return abjad().Voice([abjad().MultimeasureRest((numerator, denominator))])
+        except abjad().exceptions.AssignabilityError:
+            return abjad().Voice("R1 * {}/{}".format(numerator, denominator))
+
+    def tuplet(self, multiplier, contents):
+        return abjad().Tuplet(abjad().Multiplier(multiplier), contents)
+
+    def note(self, name_octave_and_alteration, duration):
+        return abjad().Note(self._get_pitch(name_octave_and_alteration), duration)
+
+    def chord(self, names_octaves_and_alterations, duration):
+        abjad_chord = abjad().Chord()
+        abjad_chord.written_duration = duration
+        abjad_chord.note_heads = [self._get_pitch(x) for x in names_octaves_and_alterations]
+        return abjad_chord
+
+    @staticmethod
+    def _get_pitch(name_octave_and_alteration):
+        # (the same as SpellingPolicy.resolve_abjad_pitch)
+        name, octave, alteration = name_octave_and_alteration
+        return abjad().NamedPitch(name, accidental=alteration, octave=octave)
+
+    def rest(self, duration):
+        return abjad().Rest(duration)
+
+    def skip(self, duration):
+        return abjad().Skip(duration)
+
+    def pitch_key(self, leaf):
+        return leaf.written_pitch if isinstance(leaf, abjad().Note) \
+            else leaf.written_pitches if isinstance(leaf, abjad().Chord) else None
+
+    def get_note_heads(self, note_or_chord):
+        return [note_or_chord.note_head] if isinstance(note_or_chord, abjad().Note) else note_or_chord.note_heads
+
+    def set_note_head_style(self, note_head, style):
+        abjad().tweak(note_head).style = style
+
+    def add_comment(self, leaf, comment):
+        abjad().attach(abjad().LilyPondComment(comment), leaf)
+
+    def attach_opening_literal(self, component, literal):
+        abjad().attach(abjad().LilyPondLiteral(literal, "opening"), component)
+
+    def attach_after_literal(self, leaf, literal):
+        abjad().attach(abjad().LilyPondLiteral(literal, "after"), leaf)
+
+    def attach_clef(self, container, clef):
+        abjad().attach(abjad().Clef(clef), abjad().select(container).leaf(0))
+
+    def add_articulation(self, leaf, articulation):
+        abjad().attach(abjad().Articulation(articulation), leaf)
+
+    def attach_after_grace_notes(self, leaf, grace_notes):
+        abjad().attach(abjad().AfterGraceContainer(grace_notes), leaf)
+
+    def tie(self, first_leaf, second_leaf):
+        abjad().tie(abjad().Selection([first_leaf, second_leaf]))
+
+    def slur(self, leaves):
+        abjad().slur(abjad().Selection(leaves))
+
+    def add_metronome_mark(self, leaf, beat_length, units_per_minute, textual_indication=None):
+        # (note: for some reason abjad insists on either integer tempos or some nonsense involving custom tempo
+        # markups in order to allow floats)
+        abjad().attach(
+            abjad().MetronomeMark(abjad().Duration(0.25 * beat_length), units_per_minute,
+                                  textual_indication=textual_indication),
+            leaf
+        )
+
+    def add_text_spanner(self, start_leaf, stop_leaf, text):
+        abjad().text_spanner([start_leaf, stop_leaf],
+                             start_text_span=abjad().StartTextSpan(left_text=abjad().Markup(text)))
+
+
+class _DirectLilyPondBackend(_LilyPondBackend):
+
+    """Builds the LilyPond output out of the lightweight components of the _lilypond module."""
+
+    def score(self, contents):
+        return _lilypond.Score(contents)
+
+    def staff_group(self, contents):
+        return _lilypond.StaffGroup(contents)
+
+    def staff(self, contents, name):
+        return _lilypond.Staff(contents, name=name, instrument_name=name)
+
+    def get_top_staff(self, score):
+        return score.contents[0].contents[0] if isinstance(score.contents[0], _lilypond.StaffGroup) \
+            else score.contents[0]
+
+    def simultaneous_container(self, contents):
+        return _lilypond.Container(contents, simultaneous=True)
+
+    def voice(self, contents, name=None):
+        return _lilypond.Voice(contents, name=name)
+
+    def bar_rest_voice(self, numerator, denominator):
+        measure_length = Fraction(numerator, denominator)
+        try:
+            return _lilypond.Voice([_lilypond.MultimeasureRest(measure_length)])
+        except _lilypond.LilyPondFormattingError:
+            return _lilypond.Voice([_lilypond.MultimeasureRest(1, multiplier=measure_length)])
+
+    def tuplet(self, multiplier, contents):
+        return _lilypond.Tuplet(multiplier, contents)
+
+    def note(self, name_octave_and_alteration, duration):
+        return _lilypond.Note(_lilypond.NoteHead(*name_octave_and_alteration), duration)
+
+    def chord(self, names_octaves_and_alterations, duration):
+        return _lilypond.Chord([_lilypond.NoteHead(*x) for x in names_octaves_and_alterations], duration)
+
+    def rest(self, duration):
+        return _lilypond.Rest(duration)
+
+    def skip(self, duration):
+        return _lilypond.Skip(duration)
+
+    def pitch_key(self, leaf):
+        return leaf.pitch_key() if isinstance(leaf, (_lilypond.Note, _lilypond.Chord)) else None
+
+    def get_note_heads(self, note_or_chord):
+        return [note_or_chord.note_head] if isinstance(note_or_chord, _lilypond.Note) else note_or_chord.note_heads
+
+    def set_note_head_style(self, note_head, style):
+        note_head.style = style
+
+    def add_comment(self, leaf, comment):
+        leaf.before_comments.append("% " + comment)
+
+    def attach_opening_literal(self, component, literal):
+        component.opening_commands.append(literal)
+
+    def attach_after_literal(self, leaf, literal):
+        leaf.after_commands.append(literal)
+
+    def attach_clef(self, container, clef):
+        next(container.leaves()).opening_indicators.append(r'\clef "{}"'.format(clef))
+
+    def add_articulation(self, leaf, articulation):
+        leaf.add_articulation(articulation)
+
+    def attach_after_grace_notes(self, leaf, grace_notes):
+        leaf.after_grace_container = _lilypond.Container(grace_notes)
+
+    def tie(self, first_leaf, second_leaf):
+        first_leaf.add_tie()
+
+    def slur(self, leaves):
+        leaves[0].start_slur()
+        leaves[-1].stop_slur()
+
+    def add_metronome_mark(self, leaf, beat_length, units_per_minute, textual_indication=None):
+        leaf.add_metronome_mark(Fraction(0.25 * beat_length), units_per_minute, textual_indication)
+
+    def add_text_spanner(self, start_leaf, stop_leaf, text):
+        start_leaf.start_text_span(text)
+        stop_leaf.stop_text_span()
+
+
+_abjad_backend = _AbjadBackend()
+_direct_lilypond_backend = _DirectLilyPondBackend()
+
+
 ##################################################################################################################
 #                                             Abstract Classes
 ##################################################################################################################
@@ -472,13 +1012,27 @@ stemless = {
     ]
 
     @abstractmethod
+    def _to_lilypond_object(self, backend: _LilyPondBackend):
+        """
+        Convert this to the corresponding LilyPond object, built via the given backend: either an abjad component or
+        one of the lightweight components from the _lilypond module.
+        """
+        pass
+
     def _to_abjad(self) -> 'abjad().Component':
         """
         Convert this to the abjad version of the component.
         The reason this is a protected member is that the user-facing "to_abjad" takes the output of this function
         and adds some necessary LilyPond overrides and definitions.
         """
-        pass
+        return self._to_lilypond_object(_abjad_backend)
+
+    def _to_lilypond_component(self):
+        """
+        Convert this to the corresponding lightweight component from the _lilypond module, which writes out LilyPond
+        code directly. This produces the same code as _to_abjad, but without the overhead of abjad.
+        """
+        return self._to_lilypond_object(_direct_lilypond_backend)
 
     @abstractmethod
     def to_music_xml(self) -> MusicXMLComponent:
@@ -487,6 +1041,7 @@ stemless = {
         """
         pass
 
+    @_profiled_stage("music xml export", _count_component_notes)
     def export_music_xml(self, file_path: str, pretty_print: bool = True) -> None:
         """
         Convert and wrap as a MusicXML score, and save to the given path.
@@ -516,6 +1071,7 @@ stemless = {
                             "change the value of \"show_music_xml_command_line\" in the engraving_settings to use "
                             "your program of choice.".format(engraving_settings.show_music_xml_command_line))
 
+    @_profiled_stage("abjad conversion", _count_component_notes)
     def to_abjad(self) -> 'abjad().Component':
         """
         Convert this score component to its corresponding abjad component
@@ -532,6 +1088,7 @@ stemless = {
 
         return abjad_object
 
+    @_profiled_stage("abjad conversion", _count_component_notes)
     def to_abjad_lilypond_file(self) -> 'abjad().LilyPondFile':
         """
         Convert and wrap as a abjad.LilyPondFile object
@@ -563,6 +1120,29 @@ stemless = {
 
         return abjad_lilypond_file
 
+    def _to_lilypond_directly(self, wrap_as_file=False) -> str:
+        """
+        Generates LilyPond code without going through abjad, adding the same overrides and definitions that
+        to_abjad and to_abjad_lilypond_file do.
+        """
+        lilypond_object = self._to_lilypond_component()
+        lilypond_code = lilypond_object.format()
+
+        if r"\glissando" in lilypond_code:
+            lilypond_object.opening_commands.extend(ScoreComponent._gliss_overrides)
+
+        if wrap_as_file:
+            return _lilypond.format_lilypond_file(
+                lilypond_object,
+                title=self.title if hasattr(self, "title") else None,
+                composer=self.composer if hasattr(self, "composer") else None,
+                extra_definitions=ScoreComponent._outer_stemless_def if r"\stemless" in lilypond_code else None
+            )
+        else:
+            if r"\stemless" in lilypond_code:
+                lilypond_object.opening_commands.append(ScoreComponent._inner_stemless_def)
+            return lilypond_object.format()
+
     def export_lilypond(self, file_path) -> None:
         """
         Convert and wrap as a LilyPond (.ly) file, and save to the given path.
@@ -570,18 +1150,24 @@ stemless = {
         :param file_path: file path to save to
         """
         with open(file_path, "w") as output_file:
-            output_file.write(format(self.to_abjad_lilypond_file()))
+            output_file.write(self.to_lilypond(wrap_as_file=True))
 
+    @_profiled_stage("lilypond conversion", _count_component_notes)
     def to_lilypond(self, wrap_as_file=False) -> str:
         """
-        Convert to LilyPond code.
+        Convert to LilyPond code. The code is generated directly, without the need for abjad, except in the rare
+        cases that the direct conversion can't handle (e.g. a duration that can't be written as a single note value),
+        in which case we fall back to converting via abjad.
 
         :param wrap_as_file: if True, wraps this object up as a full LilyPond file, ready for compilation. If False,
             we just get the code for the component itself.
         :return: a string containing the LilyPond code
         """
-        assert abjad() is not None, "Abjad is required for this operation."
-        return format(self.to_abjad_lilypond_file() if wrap_as_file else self.to_abjad())
+        try:
+            return self._to_lilypond_directly(wrap_as_file)
+        except _lilypond.LilyPondFormattingError:
+            assert abjad() is not None, "Abjad is required for this operation."
+            return format(self.to_abjad_lilypond_file() if wrap_as_file else self.to_abjad())
 
     def print_lilypond(self, wrap_as_file=False) -> None:
         """
@@ -592,12 +1178,23 @@ stemless = {
         """
         print(self.to_lilypond(wrap_as_file=wrap_as_file))
 
+    def export_pdf(self, file_path: str) -> None:
+        """
+        Convert to LilyPond, and compile to a PDF at the given path using LilyPond (which must be installed).
+        If "lilypond_cache_directory" is set in the engraving_settings and this music has been rendered before,
+        the PDF is copied from the cache instead of being compiled again.
+
+        :param file_path: file path to save to
+        """
+        render_lilypond([self], [file_path], workers=1)
+
     def show(self) -> None:
         """
-        Using the abjad.show command, generates and opens a PDF of the music represented by this component
+        Generates, using LilyPond, a PDF of the music represented by this component and opens it.
         """
-        assert abjad() is not None, "Abjad is required for this operation."
-        abjad().show(self.to_abjad_lilypond_file())
+        pdf_path = os.path.join(tempfile.mkdtemp(prefix="scamp-"), "score.pdf")
+        pdf_paths = render_lilypond([self], [pdf_path], workers=1)[0]
+        _lilypond.open_with_default_application(pdf_paths[0])
 
 
 class ScoreContainer(ABC):
@@ -757,7 +1354,7 @@ class Score(ScoreComponent, ScoreContainer):
                          quantization_scheme: QuantizationScheme = None, time_signature: Union[str, Sequence] = None,
                          bar_line_locations: Sequence[float] = None, max_divisor: int = None,
                          max_divisor_indigestibility: int = None, simplicity_preference: float = None,
-                         title: str = "default", composer: str = "default") -> 'Score':
+                         title: str = "default", composer: str = "default", workers: int = None) -> 'Score':
         """
         Builds a new Score from a Performance (list of note events in continuous time and pitch). In the process,
         the music must be quantized, for which two different options are available: one can either pass a
@@ -789,6 +1386,8 @@ class Score(ScoreComponent, ScoreContainer):
             error) to infinity, with a typical value somewhere around 1.
         :param title: Title of the piece to be printed on the score.
         :param composer: Composer of the piece to be printed on the score.
+        :param workers: if greater than 1, both the quantization and the construction of the score's measures are
+            carried out in parallel by a pool of this many worker processes.
         :return: the resulting Score object, which can then be rendered either as XML or LilyPond
         """
 
@@ -809,32 +1408,37 @@ class Score(ScoreComponent, ScoreContainer):
                                  "can be defined, but not both.")
 
         return Score.from_quantized_performance(
-            performance if quantization_scheme is None else performance.quantized(quantization_scheme),
-            title=title, composer=composer
+            performance if quantization_scheme is None else performance.quantized(quantization_scheme,
+                                                                                  workers=workers),
+            title=title, composer=composer, workers=workers
         )
 
     @classmethod
     def from_quantized_performance(cls, performance: 'performance_module.Performance',
-                                   title: str = "default", composer: str = "default") -> 'Score':
+                                   title: str = "default", composer: str = "default",
+                                   workers: int = None) -> 'Score':
         """
         Constructs a new Score from an already quantized Performance.
         
         :param performance: the quantized Performance to convert into a new score
         :param title: title to give the score
         :param composer: composer to put on the score
+        :param workers: if greater than 1, the measures of the score are constructed in parallel by a pool of this
+            many worker processes. By default, they are constructed one after another in this process.
         """
         if not performance.is_quantized():
             raise ValueError("Performance was not quantized.")
         contents = []
-        for part in performance.parts:
-            if engraving_settings.ignore_empty_parts and part.num_measures() == 0:
-                # if this is an empty part, and we're not including empty parts, skip it
-                continue
-            staff_group = StaffGroup.from_quantized_performance_part(part)
-            if len(staff_group.staves) > 1:
-                contents.append(staff_group)
-            elif len(staff_group.staves) == 1:
-                contents.append(staff_group.staves[0])
+        with _score_construction_pool(workers) as pool:
+            for part in performance.parts:
+                if engraving_settings.ignore_empty_parts and part.num_measures() == 0:
+                    # if this is an empty part, and we're not including empty parts, skip it
+                    continue
+                staff_group = StaffGroup._from_quantized_performance_part(part, pool)
+                if len(staff_group.staves) > 1:
+                    contents.append(staff_group)
+                elif len(staff_group.staves) == 1:
+                    contents.append(staff_group.staves[0])
         out = cls(
             contents,
             title=engraving_settings.get_default_title() if title == "default" else title,
@@ -909,11 +1513,11 @@ class Score(ScoreComponent, ScoreContainer):
 
         return key_points, guide_marks
 
-    def _to_abjad(self):
-        abjad_score = abjad().Score([part._to_abjad() for part in self.parts])
+    def _to_lilypond_object(self, backend):
+        lilypond_score = backend.score([part._to_lilypond_object(backend) for part in self.parts])
         # tempo markings will be attached to the top staff.
         # Here we sort out whether or not that staff is part of a staff group or not
-        top_staff = abjad_score[0][0] if isinstance(abjad_score[0], abjad().StaffGroup) else abjad_score[0]
+        top_staff = backend.get_top_staff(lilypond_score)
 
         # go through and add all of the tempo marks to the xml score
         key_points, guide_marks = self._get_tempo_key_points_and_guide_marks()
@@ -922,7 +1526,7 @@ class Score(ScoreComponent, ScoreContainer):
         rit_or_accel_spanner_start = None  # for storing the starting leaf of a rit or accel spanner
 
         # go through each measure and add the tempo annotations
-        for abjad_measure, score_measure in zip(top_staff, self.staves[0].measures):
+        for lilypond_measure, score_measure in zip(top_staff, self.staves[0].measures):
             # if there's no more key points or guide marks, we're done
             if len(key_points) + len(guide_marks) == 0:
                 break
@@ -934,17 +1538,17 @@ class Score(ScoreComponent, ScoreContainer):
             ]
 
             tempo_voice, mark_beats_to_skip_objects = Score._make_skip_voice_and_dict_from_mark_displacements(
-                score_measure, key_point_and_guide_mark_displacements, measure_start
+                score_measure, key_point_and_guide_mark_displacements, measure_start, backend
             )
             if len(key_point_and_guide_mark_displacements) == 0:
                 # there's no tempo stuff to deal with in this measure, but if we're in the middle of a spanner,
                 # then we need to keep the tempo voice going
                 if rit_or_accel_spanner_start is not None:
-                    abjad_measure.append(tempo_voice)
+                    lilypond_measure.append(tempo_voice)
                 measure_start += score_measure.length
                 continue
 
-            abjad_measure.append(tempo_voice)
+            lilypond_measure.append(tempo_voice)
 
             # figure out which kind of note to use as the metronome mark beat in this measure, e.g. dotted quarter in
             # compound meter. Basically if all the beats are the same length, and it's a viable note length, we use
@@ -961,14 +1565,13 @@ class Score(ScoreComponent, ScoreContainer):
 
                 # if we had started an accel or rit spanner, end it here
                 if rit_or_accel_spanner_start is not None:
-                    start_text_span, span_start_skip_object, markup_text = rit_or_accel_spanner_start
-                    abjad().text_spanner([span_start_skip_object, this_point_skip_object],
-                                         start_text_span=start_text_span)
+                    span_start_skip_object, change_indicator = rit_or_accel_spanner_start
+                    backend.add_text_spanner(span_start_skip_object, this_point_skip_object, change_indicator)
 
                     tempo_spanner_override = r"""\once \override TextSpanner.bound-details.left-broken.text = "({})"
-\once \override TextSpanner.bound-details.right.attach-dir = #-2""".format(markup_text)
+\once \override TextSpanner.bound-details.right.attach-dir = #-2""".format(change_indicator)
 
-                    abjad().attach(abjad().LilyPondLiteral(tempo_spanner_override, "opening"), span_start_skip_object)
+                    backend.attach_opening_literal(span_start_skip_object, tempo_spanner_override)
 
                     rit_or_accel_spanner_start = None
 
@@ -980,52 +1583,43 @@ class Score(ScoreComponent, ScoreContainer):
                     else "accel." if next_key_point_tempo > key_point_tempo else "rit."
 
                 # add the metronome mark, adjusting the tempo based on the metronome_mark_beat_length
-                # (note: for some reason abjad insists on either integer tempos or some nonsense involving custom
-                # tempo markups in order to allow floats)
-                abjad().attach(
-                    abjad().MetronomeMark(
-                        abjad().Duration(0.25 * metronome_mark_beat_length),
-                        round(key_point_tempo / metronome_mark_beat_length)
-                    ),
-                    this_point_skip_object
-                )
+                backend.add_metronome_mark(this_point_skip_object, metronome_mark_beat_length,
+                                           round(key_point_tempo / metronome_mark_beat_length))
 
                 # start the accel or rit spanner if needed
                 if change_indicator is not None:
-                    markup = abjad().Markup(change_indicator)
-                    # to construct it later, we need to the StartTextSpan object and the skip object where it starts
-                    rit_or_accel_spanner_start = abjad().StartTextSpan(left_text=markup), \
-                                                 this_point_skip_object, change_indicator
+                    # to construct it later, we need the skip object where it starts, and the text to show
+                    rit_or_accel_spanner_start = this_point_skip_object, change_indicator
 
             # loop through the guide marks until there are none left or there are none left in this measure
             while len(guide_marks) > 0 and guide_marks[0][0] - measure_start < score_measure.length:
                 guide_mark_location, guide_mark_tempo = guide_marks.pop(0)
                 this_point_skip_object = mark_beats_to_skip_objects[guide_mark_location]
                 guide_mark_override = r"""\once \override Score.MetronomeMark.font-size = #-5"""
-                abjad().attach(
-                    abjad().MetronomeMark(
-                        abjad().Duration(0.25 * metronome_mark_beat_length),
-                        round(guide_mark_tempo / metronome_mark_beat_length),
-                        textual_indication=" "  # this results in parentheses, though the space is unfortunate
-                    ),
-                    this_point_skip_object
+                backend.add_metronome_mark(
+                    this_point_skip_object, metronome_mark_beat_length,
+                    round(guide_mark_tempo / metronome_mark_beat_length),
+                    textual_indication=" "  # this results in parentheses, though the space is unfortunate
                 )
-                abjad().attach(abjad().LilyPondLiteral(guide_mark_override, "opening"), this_point_skip_object)
+                backend.attach_opening_literal(this_point_skip_object, guide_mark_override)
 
             measure_start += score_measure.length
 
-        return abjad_score
+        return lilypond_score
 
     @staticmethod
-    def _make_skip_voice_and_dict_from_mark_displacements(score_measure, displacements, measure_start):
+    def _make_skip_voice_and_dict_from_mark_displacements(score_measure, displacements, measure_start,
+                                                          backend: _LilyPondBackend):
         """
         Returns a measure of tempo voice filled with skip objects, and a dictionary pointing the time points of the
         various tempo marks to their associated skip objects.
+
+        :param backend: the backend with which to construct the tempo voice and skips
         """
         if len(displacements) == 0:
             skip_length = 1 / Fraction(score_measure.length / 4).denominator
-            return abjad().Voice(
-                [abjad().Skip(0.25 * skip_length)
+            return backend.voice(
+                [backend.skip(0.25 * skip_length)
                  for _ in range(int(round(score_measure.length / skip_length)))], name="TempoVoice"
             ), None
 
@@ -1034,7 +1628,7 @@ class Score(ScoreComponent, ScoreContainer):
         while max(x % min_skip for x in displacements) > 0.05:
             min_skip /= 2
 
-        skips = [abjad().Skip(0.25 * min_skip) for _ in range(int(round(score_measure.length / min_skip)))]
+        skips = [backend.skip(0.25 * min_skip) for _ in range(int(round(score_measure.length / min_skip)))]
 
         # maps the beat of any of the key points and guide marks we will run into to the skip object
         # that most nearly approximates its position
@@ -1050,7 +1644,7 @@ class Score(ScoreComponent, ScoreContainer):
             for sub_chunk in (chunk[i: i + skips_per_sub_chunk] for i in range(0, len(chunk), skips_per_sub_chunk)):
                 if not any(x in mark_beats_to_skip_objects.values() for x in sub_chunk[1:]):
                     # we can combine the skips so long as none except the first are locations where tempo marks occur
-                    combined_skip = abjad().Skip(combination_size)
+                    combined_skip = backend.skip(combination_size)
                     # if a tempo mark occurs at the first skip in the chunk, we can still combine it, but we have to be
                     # careful to remap the mark_beats_to_skip_objects dictionary to point to the new combined skip
                     for x in mark_beats_to_skip_objects:
@@ -1067,22 +1661,99 @@ class Score(ScoreComponent, ScoreContainer):
         skips = combine_skips_as_possible(skips, 1 / Fraction(score_measure.length / 4).denominator)
 
         # add a tempo voice filled with skip objects to attach tempo markings to
-        tempo_voice = abjad().Voice(skips, name="TempoVoice")
+        tempo_voice = backend.voice(skips, name="TempoVoice")
 
         return tempo_voice, mark_beats_to_skip_objects
 
+    @_profiled_stage("music xml building", _count_component_notes)
     def to_music_xml(self) -> pymusicxml.Score:
         xml_score = pymusicxml.Score([part.to_music_xml() for part in self. parts], self.title, self.composer)
 
         # go through and add all of the tempo marks to the xml score
+        for xml_measure, this_measure_annotations in zip(xml_score.parts[0].measures,
+                                                         self._iterate_xml_tempo_annotations()):
+            xml_measure.directions_with_displacements = this_measure_annotations
+        return xml_score
+
+    @_profiled_stage("music xml export", _count_component_notes)
+    def write_music_xml(self, file, pretty_print: bool = True) -> None:
+        """
+        Converts this score to MusicXML and writes it to the given file handle. Unlike :func:`to_music_xml`, this
+        never builds the whole pymusicxml score: each part is written out measure by measure, with each measure
+        being written (and let go of) as soon as it has been converted. This avoids holding a second, MusicXML copy
+        of the piece in memory, though this Score itself (which is already fully built) still grows with the length
+        of the piece. The result is the same as that of :func:`export_music_xml`.
+
+        :param file: a file-like object opened for writing text
+        :param pretty_print: whether or not to take the extra space and format the file with indentations, etc.
+        """
+        # write the beginning of the score, including the part list, by rendering a score with empty parts
+        xml_score = pymusicxml.Score(
+            [pymusicxml.PartGroup([pymusicxml.Part(staff.name) for staff in part.staves])
+             if isinstance(part, StaffGroup) else pymusicxml.Part(part.name) for part in self.parts],
+            self.title, self.composer
+        )
+        score_element, = xml_score.render()
+        for part_element in score_element.findall("part"):
+            score_element.remove(part_element)
+        # (the closing tag of the score element is removed, so that we can write the parts inside of it)
+        score_start = _render_xml_element(score_element, pretty_print)
+        score_start = score_start[:score_start.rindex("</score-partwise>")]
+        if pretty_print:
+            file.write('<?xml version="1.0" encoding="UTF-8"?>\n<!DOCTYPE score-partwise PUBLIC "-//Recordare//DTD '
+                       'MusicXML 3.0 Partwise//EN" "http://www.musicxml.org/dtds/partwise.dtd">\n')
+        else:
+            file.write('<?xml version="1.0" encoding="UTF-8"?><!DOCTYPE score-partwise PUBLIC "-//Recordare//DTD '
+                       'MusicXML 3.0 Partwise//EN" "http://www.musicxml.org/dtds/partwise.dtd">')
+        file.write(score_start)
+
+        for staff_num, (staff, xml_part) in enumerate(zip(self.staves, xml_score.parts)):
+            file.write('\t<part id="P{}">\n'.format(xml_part.part_id) if pretty_print
+                       else '<part id="P{}">'.format(xml_part.part_id))
+            # tempo marks go on the first staff only
+            tempo_annotations = self._iterate_xml_tempo_annotations() if staff_num == 0 else None
+            slur_numbers = {}
+            for measure_num, xml_measure in enumerate(staff._iterate_music_xml_measures()):
+                if tempo_annotations is not None:
+                    xml_measure.directions_with_displacements = next(tempo_annotations, [])
+                _renumber_xml_slurs(xml_measure, slur_numbers)
+                xml_measure.number = measure_num + 1
+                for measure_element in xml_measure.render():
+                    file.write(_render_xml_element(measure_element, pretty_print, 2))
+            file.write("\t</part>\n" if pretty_print else "</part>")
+
+        file.write("</score-partwise>\n" if pretty_print else "</score-partwise>")
+
+    @_profiled_stage("music xml export", _count_component_notes)
+    def export_music_xml(self, file_path: str, pretty_print: bool = True, streaming: bool = False) -> None:
+        """
+        Convert and wrap as a MusicXML score, and save to the given path.
+
+        :param file_path: file path to save to
+        :param pretty_print: whether or not to take the extra space and format the file with indentations, etc.
+        :param streaming: if True, the score is written out measure by measure, rather than being converted as a
+            whole before saving (see :func:`write_music_xml`). This is useful for very long scores.
+        """
+        if streaming:
+            with open(file_path, 'w') as file:
+                self.write_music_xml(file, pretty_print=pretty_print)
+        else:
+            super().export_music_xml(file_path, pretty_print=pretty_print)
+
+    def _iterate_xml_tempo_annotations(self) -> Iterator[list]:
+        """
+        Yields, for each measure of the first staff, the list of (pymusicxml direction, displacement) tuples that
+        mark the tempo in that measure, as needed for the directions_with_displacements of a pymusicxml.Measure.
+        """
         key_points, guide_marks = self._get_tempo_key_points_and_guide_marks()
 
         measure_start = 0  # running counter of the beat at the start of the measure
         # go through each measure and add the tempo annotations
-        for xml_measure, score_measure in zip(xml_score.parts[0].measures, self.staves[0].measures):
-            # if there's no more key points or guide marks, we're done
+        for score_measure in self.staves[0].measures:
+            # if there's no more key points or guide marks, the rest of the measures get no annotations
             if len(key_points) + len(guide_marks) == 0:
-                break
+                yield []
+                continue
             # list of annotations we're adding to this measure
             this_measure_annotations = []
 
@@ -1126,11 +1797,65 @@ class Score(ScoreComponent, ScoreContainer):
                      guide_mark_location - measure_start)
                 )
 
-            # sort and add all the annotations to the pymusicxml.Measure object
+            # sort and yield all the annotations for this measure
             this_measure_annotations.sort(key=lambda x: x[1])
-            xml_measure.directions_with_displacements = this_measure_annotations
+            yield this_measure_annotations
             measure_start += score_measure.length
-        return xml_score
+
+
+@_profiled_stage("lilypond rendering")
+def render_lilypond(score_components: Sequence[ScoreComponent], file_paths: Sequence[str], output_format: str = "pdf",
+                    workers: int = None, include_parts: bool = False) -> Sequence[Sequence[str]]:
+    """
+    Renders several score components with LilyPond at once, running up to the given number of LilyPond processes in
+    parallel. This is much faster than exporting them one at a time when there are many scores to render. If the
+    "lilypond_cache_directory" engraving setting is set, output is cached there by a hash of the LilyPond code, so that
+    scores that haven't changed since they were last rendered are not compiled again.
+
+    :param score_components: the Scores (or other score components) to render
+    :param file_paths: for each score component, the path to save it to
+    :param output_format: one of "pdf", "png" or "svg"
+    :param workers: the maximum number of LilyPond processes to run at once; if None, uses the number of CPUs
+    :param include_parts: if True, then for each multi-part Score, each part is also rendered on its own, to a file
+        named after the score's file and the part (e.g. "Quartet - Viola.pdf"; parts that share a name are numbered, as
+        in "Quartet - Violin 1.pdf" and "Quartet - Violin 2.pdf"). Parts are rendered in parallel with everything else.
+    :return: for each score component, the list of file paths that were written (first the file(s) for the component
+        itself, followed by those of its parts, if include_parts is True)
+    """
+    if len(score_components) != len(file_paths):
+        raise ValueError("There must be exactly one file path for each score component.")
+
+    jobs, job_owners = [], []
+    for i, (score_component, file_path) in enumerate(zip(score_components, file_paths)):
+        jobs.append((score_component.to_lilypond(wrap_as_file=True), file_path))
+        job_owners.append(i)
+        if include_parts and isinstance(score_component, Score) and len(score_component.parts) > 1:
+            base_path, extension = os.path.splitext(file_path)
+            part_names = [part.name if part.name is not None else "Part {}".format(j + 1)
+                          for j, part in enumerate(score_component.parts)]
+            # parts that share a name (e.g. two Violins) are numbered, so that they don't overwrite each other's files
+            name_counts = Counter(part_names)
+            name_numbers = Counter()
+            for part, part_name in zip(score_component.parts, part_names):
+                if name_counts[part_name] > 1:
+                    name_numbers[part_name] += 1
+                    part_name = "{} {}".format(part_name, name_numbers[part_name])
+                part_score = Score([part], score_component.title, score_component.composer,
+                                   score_component.tempo_envelope)
+                jobs.append((part_score.to_lilypond(wrap_as_file=True),
+                             "{} - {}{}".format(base_path, part_name.replace(os.sep, "_"), extension)))
+                job_owners.append(i)
+
+    written_paths = _lilypond.render_lilypond_files(
+        jobs, output_format=output_format, workers=workers,
+        cache_directory=engraving_settings.lilypond_cache_directory,
+        cache_max_entries=engraving_settings.lilypond_cache_max_entries
+    )
+
+    out = [[] for _ in score_components]
+    for owner, job_paths in zip(job_owners, written_paths):
+        out[owner].extend(job_paths)
+    return out
 
 
 # used in arranging voices in a part
@@ -1175,13 +1900,22 @@ class StaffGroup(ScoreComponent, ScoreContainer):
         return self._contents
 
     @classmethod
-    def from_quantized_performance_part(cls, quantized_performance_part: 'performance_module.PerformancePart') \
-                                        -> 'StaffGroup':
+    def from_quantized_performance_part(cls, quantized_performance_part: 'performance_module.PerformancePart',
+                                        workers: int = None) -> 'StaffGroup':
         """
         Constructs a new StaffGroup from an already quantized PerformancePart.
 
         :param quantized_performance_part: an already quantized PerformancePart
+        :param workers: if greater than 1, the measures are constructed in parallel by a pool of this many worker
+            processes. By default, they are constructed one after another in this process.
         """
+        with _score_construction_pool(workers) as pool:
+            return cls._from_quantized_performance_part(quantized_performance_part, pool)
+
+    @classmethod
+    @_profiled_stage("staff group construction", lambda cls, part, *args, **kwargs: _count_part_notes(part))
+    def _from_quantized_performance_part(cls, quantized_performance_part, pool=None):
+        # implementation of from_quantized_performance_part, using the given process pool (if any) to build measures
         assert quantized_performance_part.is_quantized()
 
         fragments = StaffGroup._separate_voices_into_fragments(quantized_performance_part)
@@ -1190,9 +1924,9 @@ class StaffGroup(ScoreComponent, ScoreContainer):
         if quantized_performance_part.name_count() > 0:
             staff_group_name += " [{}]".format(quantized_performance_part.name_count() + 1)
 
-        return StaffGroup._from_measure_voice_grid(
+        return cls._from_measure_voice_grid(
             measure_voice_grid, quantized_performance_part._get_longest_quantization_record(),
-            name=staff_group_name, clef_choices=quantized_performance_part.clef_preference
+            name=staff_group_name, clef_choices=quantized_performance_part.clef_preference, pool=pool
         )
 
     @staticmethod
@@ -1201,26 +1935,36 @@ class StaffGroup(ScoreComponent, ScoreContainer):
 
         # split the notes into measures, breaking notes that span a barline in two
         # save each to measures_with_quantizations, in a tuple along with the corresponding quantization
+        # since the notes are sorted by start beat, this is done in a single sweep: next_note_index points to the first
+        # note not yet reached, and carried_notes holds the notes (or second halves of notes) carried over from before
         measures_with_quantizations = []
+        next_note_index = 0
+        carried_notes = []
         for measure_quantization in measure_quantizations:
             measure_end_beat = measure_quantization.start_beat + measure_quantization.measure_length
+            end_index = next_note_index
+            while end_index < len(notes) and notes[end_index].start_beat < measure_end_beat:
+                end_index += 1
+
             this_measure_notes = []
             remaining_notes = []
-            for note in notes:
+            for note in chain(carried_notes, notes[next_note_index:end_index]):
                 # check if the note starts in the measure
-                if measure_quantization.start_beat <= note.start_beat < measure_end_beat:
+                if measure_quantization.start_beat <= note.start_beat:
                     # check if it straddles the following barline
                     if note.end_beat > measure_end_beat:
-                        first_half, second_half = note.split_at_beat(measure_end_beat)
+                        # splitting alters the note, so we split a copy, leaving the performance's note untouched
+                        first_half, second_half = note._light_copy().split_at_beat(measure_end_beat)
                         this_measure_notes.append(first_half)
                         remaining_notes.append(second_half)
                     else:
                         # note is fully within the measure
                         this_measure_notes.append(note)
                 else:
-                    # if it happens in a later measure, save it for later
+                    # if it starts before this measure (which shouldn't really happen), keep it for later as before
                     remaining_notes.append(note)
-            notes = remaining_notes
+            carried_notes = remaining_notes
+            next_note_index = end_index
             measures_with_quantizations.append((this_measure_notes, measure_quantization))
 
         # then decide based on the name of the voice whether it is from a numbered voice, which gets treated differently
@@ -1233,6 +1977,7 @@ class StaffGroup(ScoreComponent, ScoreContainer):
             return _NamedVoiceFragment(average_pitch, start_measure_num, measures_with_quantizations)
 
     @staticmethod
+    @_profiled_stage("fragment separation", _count_part_notes)
     def _separate_voices_into_fragments(quantized_performance_part):
         """
         Splits the part's voices into fragments where divisions occur whenever there is a measure break at a rest.
@@ -1253,8 +1998,6 @@ class StaffGroup(ScoreComponent, ScoreContainer):
             if len(note_list) == 0:
                 continue
 
-            note_list = deepcopy(note_list)
-
             quantization_record = quantized_performance_part.voice_quantization_records[voice_name]
             assert isinstance(quantization_record, QuantizationRecord)
             measure_quantization_iterator = enumerate(quantization_record.quantized_measures)
@@ -1356,13 +2099,15 @@ class StaffGroup(ScoreComponent, ScoreContainer):
 
     @classmethod
     def _from_measure_voice_grid(cls, measure_bins, quantization_record: QuantizationRecord, name: str = None,
-                                 clef_choices: Sequence[Union[str, Tuple[str, Real]]] = None):
+                                 clef_choices: Sequence[Union[str, Tuple[str, Real]]] = None, pool=None):
         """
         Creates a StaffGroup with Staves that accommodate engraving_settings.max_voices_per_part voices each
 
         :param measure_bins: a list of voice lists (can be many voices each)
         :param quantization_record: a QuantizationRecord
         :param name: name for the staff group; the staves will get named, e.g. "piano [1]", "piano [2]", etc.
+        :param clef_choices: clefs to choose from (see StaffGroup)
+        :param pool: a multiprocessing.Pool with which to construct the measures, or None to construct them serially
         """
         num_staffs_required = 1 if len(measure_bins) == 0 else \
             int(max(math.ceil(len(x) / engraving_settings.max_voices_per_part) for x in measure_bins))
@@ -1408,7 +2153,7 @@ class StaffGroup(ScoreComponent, ScoreContainer):
             [
                 Staff._from_measure_bins_of_voice_lists(
                     staff, quantization_record.time_signatures,
-                    name=name + " ({})".format(str(i + 1)) if len(staves) > 1 else name
+                    name=name + " ({})".format(str(i + 1)) if len(staves) > 1 else name, pool=pool
                 )
                 for i, staff in enumerate(staves)
             ], name=name, clef_choices=clef_choices
@@ -1446,8 +2191,8 @@ class StaffGroup(ScoreComponent, ScoreContainer):
                             # clef in the last measure, then we set this measure to explicitly change it
                             last_clef_used = measure.clef = this_measure_clef
 
-    def _to_abjad(self):
-        return abjad().StaffGroup([staff._to_abjad() for staff in self.staves])
+    def _to_lilypond_object(self, backend):
+        return backend.staff_group([staff._to_lilypond_object(backend) for staff in self.staves])
 
     def to_music_xml(self) -> pymusicxml.PartGroup:
         return pymusicxml.PartGroup([staff.to_music_xml() for staff in self.staves])
@@ -1479,7 +2224,7 @@ class Staff(ScoreComponent, ScoreContainer):
 
     @classmethod
     def _from_measure_bins_of_voice_lists(cls, measure_bins, time_signatures: Sequence[TimeSignature],
-                                          name: str = None) -> 'Staff':
+                                          name: str = None, pool=None) -> 'Staff':
         """
         Constructs a Staff from a specially formatted list of measures
 
@@ -1492,6 +2237,8 @@ class Staff(ScoreComponent, ScoreContainer):
 
             This format is constructed inside of StaffGroup._from_measure_voice_grid
         :param time_signatures: list of TimeSignature objects for each measure
+        :param name: name of the staff
+        :param pool: a multiprocessing.Pool with which to construct the measures, or None to construct them serially
         """
         # Expects a list of measure bins formatted as outputted by StaffGroup._from_measure_bins_of_voice_lists
         #   (1) None, indicating an empty measure
@@ -1500,28 +2247,265 @@ class Staff(ScoreComponent, ScoreContainer):
         #       - None, in the case of an empty voice
         time_signature_changes = [True] + [time_signatures[i - 1] != time_signatures[i]
                                            for i in range(1, len(time_signatures))]
-        return cls([Measure.from_list_of_performance_voices(measure_content, time_signature, show_time_signature)
-                    if measure_content is not None else Measure.empty_measure(time_signature, show_time_signature)
-                    for measure_content, time_signature, show_time_signature in zip(measure_bins, time_signatures,
-                                                                                    time_signature_changes)], name=name)
+        measure_arguments = list(zip(measure_bins, time_signatures, time_signature_changes))
+
+        # measures that have been constructed before, from the same notes and quantization, come from the cache
+        use_cache = _measure_cache.is_enabled()
+        if use_cache:
+            settings_json = engraving_settings.json_dumps()
+            cache_keys = [_measure_cache.get_key(*arguments, settings_json) for arguments in measure_arguments]
+            measures = [_measure_cache.get(key, source_ids) for key, source_ids in cache_keys]
+        else:
+            measures = [None] * len(measure_arguments)
+        uncached_indices = [i for i, measure in enumerate(measures) if measure is None]
+        uncached_arguments = [measure_arguments[i] for i in uncached_indices]
+
+        if pool is None:
+            new_measures = [_measure_from_bin(*arguments) for arguments in uncached_arguments]
+        else:
+            new_measures = _construct_measures_in_pool(pool, uncached_arguments)
+
+        for i, measure in zip(uncached_indices, new_measures):
+            measures[i] = measure
+            if use_cache:
+                _measure_cache.put(*cache_keys[i], measure)
+        return cls(measures, name=name)
 
-    def _to_abjad(self):
+    def _to_lilypond_object(self, backend):
         # from the point of view of the source_id_dict (which helps us connect tied notes), the staff is
         # always going to be the top level call. There's no need to propagate the source_id_dict any further upward
         source_id_dict = {}
-        contents = [measure._to_abjad(source_id_dict) for measure in self.measures]
+        contents = [measure._to_lilypond_object(backend, source_id_dict) for measure in self.measures]
         for same_source_group in source_id_dict.values():
-            _join_same_source_abjad_note_group(same_source_group)
-        abjad_staff = abjad().Staff(contents, name=self.name)
-        abjad().setting(abjad_staff).instrument_name = abjad().Scheme(self.name, force_quotes=True)
-        return abjad_staff
+            _join_same_source_lilypond_note_group(same_source_group, backend)
+        return backend.staff(contents, self.name)
 
     def to_music_xml(self) -> pymusicxml.Part:
+        return pymusicxml.Part(self.name, list(self._iterate_music_xml_measures()))
+
+    def _iterate_music_xml_measures(self) -> Iterator[pymusicxml.Measure]:
+        """
+        Converts the measures of this staff to pymusicxml Measures one at a time, yielding each one as soon as all of
+        the tied / glissing note groups that pass through it are complete and have been joined up. This way, only a
+        few converted measures need to be held in memory at any given time.
+        """
         source_id_dict = {}
-        measures = [measure.to_music_xml(source_id_dict) for measure in self.measures]
+        # the index of the measure in which each of the note groups in source_id_dict started
+        group_start_measures = {}
+        # measures that have been converted, but may still have notes belonging to an unfinished group
+        pending_measures = []
+        num_yielded_measures = 0
+        for measure_num, measure in enumerate(self.measures):
+            group_lengths = {source_id: len(group) for source_id, group in source_id_dict.items()}
+            pending_measures.append(measure.to_music_xml(source_id_dict))
+
+            for source_id in source_id_dict:
+                group_start_measures.setdefault(source_id, measure_num)
+            # any group that did not continue into this measure is finished, so it can be joined up
+            for source_id, group_length in group_lengths.items():
+                if len(source_id_dict[source_id]) == group_length:
+                    _join_same_source_xml_note_group(source_id_dict.pop(source_id))
+                    del group_start_measures[source_id]
+
+            # measures before the start of the earliest unfinished group can now be released
+            earliest_open_measure = min(group_start_measures.values(), default=measure_num + 1)
+            while num_yielded_measures < earliest_open_measure:
+                yield pending_measures.pop(0)
+                num_yielded_measures += 1
+
         for same_source_group in source_id_dict.values():
             _join_same_source_xml_note_group(same_source_group)
-        return pymusicxml.Part(self.name, measures)
+        yield from pending_measures
+
+
+def _measure_from_bin(measure_content, time_signature, show_time_signature):
+    # constructs a single measure from a measure bin (see Staff._from_measure_bins_of_voice_lists)
+    return Measure.from_list_of_performance_voices(measure_content, time_signature, show_time_signature) \
+        if measure_content is not None else Measure.empty_measure(time_signature, show_time_signature)
+
+
+@contextmanager
+def _score_construction_pool(workers):
+    """
+    Context manager providing a process pool with which to construct measures in parallel, or None if workers is None
+    or 1, meaning that measures are to be constructed serially in this process.
+
+    :param workers: the number of worker processes
+    """
+    if workers is None or workers <= 1:
+        yield None
+    else:
+        # the workers are handed the engraving settings of this process, in case they were altered after loading
+        with multiprocessing.Pool(workers, _initialize_score_construction_worker,
+                                  (engraving_settings.json_dumps(), )) as pool:
+            yield pool
+
+
+def _initialize_score_construction_worker(engraving_settings_json):
+    # bring a worker process's settings in line with those of the process that started it
+    vars(engraving_settings).update(vars(EngravingSettings.json_loads(engraving_settings_json)))
+
+
+def _construct_measures_in_pool(pool, measure_arguments):
+    """
+    Constructs measures in parallel, given a list of arguments to :func:`_measure_from_bin`. Once the quantization of
+    a measure is known, its notation doesn't depend on any other measure, so contiguous chunks of measures are farmed
+    out to the workers and the results are stitched back together in order.
+
+    Splitting notes into tied segments assigns new source ids to them (see PerformanceNote.split_at_beat), and these
+    must be unique across the whole staff, since they are how tied segments find each other when exporting. Each chunk
+    therefore hands out ids starting from a point beyond all ids issued so far, and these are then swapped out for
+    fresh ids from this process once the chunk comes back.
+
+    :param pool: a multiprocessing.Pool, as provided by :func:`_score_construction_pool`
+    :param measure_arguments: list of (measure_content, time_signature, show_time_signature) tuples
+    :return: list of constructed Measures
+    """
+    first_chunk_id = performance_module.PerformanceNote.next_id()
+    chunks = [measure_arguments[i:i + _MEASURES_PER_CHUNK]
+              for i in range(0, len(measure_arguments), _MEASURES_PER_CHUNK)]
+
+    measures = []
+    for chunk_measures in pool.starmap(_construct_measure_chunk, [(chunk, first_chunk_id) for chunk in chunks]):
+        notes = [note for measure in chunk_measures for voice in measure.voices if voice is not None
+                 for note in voice.iterate_notes(include_rests=True)]
+        # collect the ids first and then reassign, in case any notes share the same properties object
+        chunk_ids = [note.source_id() for note in notes]
+        new_ids = {}
+        for note, chunk_id in zip(notes, chunk_ids):
+            if chunk_id is not None and chunk_id >= first_chunk_id:
+                if chunk_id not in new_ids:
+                    new_ids[chunk_id] = performance_module.PerformanceNote.next_id()
+                note.properties.temp["_source_id"] = new_ids[chunk_id]
+        measures.extend(chunk_measures)
+    return measures
+
+
+# small enough that the load stays balanced when some measures are much busier than others, but large enough that
+# the overhead of sending work to the workers is spread over a number of measures
+_MEASURES_PER_CHUNK = 16
+
+
+def _construct_measure_chunk(measure_arguments, first_chunk_id):
+    # constructs a chunk of measures in a worker process (see _construct_measures_in_pool)
+    performance_module.PerformanceNote._id_generator = count(first_chunk_id)
+    return [_measure_from_bin(*arguments) for arguments in measure_arguments]
+
+
+class _MeasureCache:
+    """
+    Content-addressed cache of constructed Measures. Each entry is keyed by a hash of everything that goes into
+    constructing a measure (the notes and QuantizedMeasure of each of its voices, its time signature, whether that time
+    signature is shown, and the engraving settings), and holds the pickled Measure, so that every retrieval produces a
+    fresh Measure that is free to be altered. This way, when a few notes of a long piece are changed and the score is
+    generated again, only the measures containing those changes are constructed from scratch.
+
+    Source ids, which link the tied segments of a note across barlines, are handed out afresh each time a score is
+    generated, so they are left out of the key; only the pattern of which notes share an id goes into it. When a
+    Measure is retrieved, the ids it was stored with are swapped out for those of the notes it is now standing in for.
+
+    How many measures are held on to is determined by the "measure_cache_max_entries" engraving setting; the least
+    recently used entries are evicted first.
+    """
+
+    def __init__(self):
+        self._entries = LRUCache(lambda: engraving_settings.measure_cache_max_entries)
+
+    @staticmethod
+    def is_enabled() -> bool:
+        """
+        Whether the engraving settings call for measures to be cached.
+        """
+        return engraving_settings.measure_cache_max_entries > 0
+
+    @staticmethod
+    def get_key(measure_content, time_signature, show_time_signature, settings_json) -> Tuple[str, list]:
+        """
+        Returns the hash under which the measure constructed from the given arguments is stored, along with the list
+        of distinct source ids of the notes in it, in order of appearance.
+
+        :param measure_content: measure bin, as passed to :func:`_measure_from_bin`
+        :param time_signature: the measure's time signature
+        :param show_time_signature: whether the time signature is displayed
+        :param settings_json: the engraving settings, as json
+        :return: tuple of (key, source ids)
+        """
+        source_ids = []
+        if measure_content is None:
+            voices_contents = None
+        else:
+            voices_contents = []
+            for voice_content in measure_content:
+                if voice_content is None:
+                    voices_contents.append(None)
+                    continue
+                notes, measure_quantization = voice_content
+                note_contents = []
+                for note in notes:
+                    source_id = note.properties.temp.get("_source_id")
+                    if source_id is None:
+                        source_id_index = None
+                    else:
+                        if source_id not in source_ids:
+                            source_ids.append(source_id)
+                        source_id_index = source_ids.index(source_id)
+                    note_contents.append((note.start_beat, note.length, note.pitch, note.volume, source_id_index,
+                                          [item for item in note.properties.items() if item[0] != "temp"]))
+                voices_contents.append((measure_quantization, note_contents))
+        key_contents = (settings_json, time_signature, show_time_signature, voices_contents)
+        return hashlib.sha256(pickle.dumps(key_contents, protocol=4)).hexdigest(), source_ids
+
+    def get(self, key: str, source_ids: list) -> Optional['Measure']:
+        """
+        Returns a fresh copy of the Measure stored under the given key, or None if there is no such entry.
+
+        :param key: the key, as returned by get_key
+        :param source_ids: the source ids of the notes the Measure is now standing in for, as returned by get_key
+        """
+        pickled_entry = self._entries.get(key)
+        if pickled_entry is None:
+            return None
+        measure, stored_source_ids = pickle.loads(pickled_entry)
+
+        # ids that came in with the notes are mapped to those of the current notes; any others were created while
+        # splitting notes within the measure, and so just need to be unique
+        new_ids = dict(zip(stored_source_ids, source_ids))
+        notes = [note for voice in measure.voices if voice is not None
+                 for note in voice.iterate_notes(include_rests=True)]
+        # collect the ids first and then reassign, in case any notes share the same properties object
+        stored_note_ids = [note.source_id() for note in notes]
+        for note, stored_id in zip(notes, stored_note_ids):
+            if stored_id is not None:
+                if stored_id not in new_ids:
+                    new_ids[stored_id] = performance_module.PerformanceNote.next_id()
+                note.properties.temp["_source_id"] = new_ids[stored_id]
+        return measure
+
+    def put(self, key: str, source_ids: list, measure: 'Measure') -> None:
+        """
+        Stores a newly constructed Measure under the given key.
+
+        :param key: the key, as returned by get_key
+        :param source_ids: the source ids of the notes the Measure was constructed from, as returned by get_key
+        :param measure: the Measure (which is pickled right away, so later changes to it don't affect the cache)
+        """
+        self._entries.put(key, pickle.dumps((measure, source_ids), protocol=4))
+
+    def clear(self) -> None:
+        """
+        Empties the cache.
+        """
+        self._entries.clear()
+
+
+_measure_cache = _MeasureCache()
+
+
+def clear_measure_cache() -> None:
+    """
+    Empties the cache of constructed measures (see the "measure_cache_max_entries" engraving setting).
+    """
+    _measure_cache.clear()
 
 
 _voice_names = [r'voiceOne', r'voiceTwo', r'voiceThree', r'voiceFour']
@@ -1568,7 +2552,7 @@ class Measure(ScoreComponent, ScoreContainer):
         Length of the part of this measure that has something in it. (i.e. the length not counting trailing rests that
         aren't part of a tuplet)
         """
-        return max(v.non_empty_length() for v in self.voices)
+        return max((v.non_empty_length() for v in self.voices if v is not None), default=0)
 
     @classmethod
     def empty_measure(cls, time_signature: TimeSignature, show_time_signature: bool = True) -> 'Measure':
@@ -1630,44 +2614,43 @@ class Measure(ScoreComponent, ScoreContainer):
 
         return _get_clef_from_average_pitch_and_clef_choices(average_pitch, clef_choices)
 
-    def _to_abjad(self, source_id_dict=None):
+    def _to_lilypond_object(self, backend, source_id_dict=None):
         is_top_level_call = True if source_id_dict is None else False
         source_id_dict = {} if source_id_dict is None else source_id_dict
-        abjad_measure = abjad().Container()
+        lilypond_voices = []
 
         for i, voice in enumerate(self.voices):
             if voice is None:
                 continue
-            abjad_voice = self.voices[i]._to_abjad(source_id_dict)
+            lilypond_voice = voice._to_lilypond_object(backend, source_id_dict)
 
             if i == 0 and self.show_time_signature:
-                # TODO: this seems to break in abjad when the measure starts with a tuplet, so for now, a klugey fix
-                # abjad().attach(self.time_signature.to_abjad(), abjad_voice[0])
-                abjad().attach(abjad().LilyPondLiteral(r"\time {}".format(self.time_signature.as_string()), "opening"),
-                               abjad_voice)
+                # (attaching abjad's TimeSignature to the first leaf seems to break in abjad when the measure starts
+                # with a tuplet, so the time signature is written out as a literal instead)
+                backend.attach_opening_literal(lilypond_voice, r"\time {}".format(self.time_signature.as_string()))
             if len(self.voices) > 1:
-                abjad().attach(abjad().LilyPondLiteral(_voice_literals[i]), abjad_voice)
-            abjad_voice.name = _voice_names[i]
-            abjad_measure.append(abjad_voice)
-        abjad_measure.simultaneous = True
+                backend.attach_opening_literal(lilypond_voice, _voice_literals[i])
+            lilypond_voice.name = _voice_names[i]
+            lilypond_voices.append(lilypond_voice)
+        lilypond_measure = backend.simultaneous_container(lilypond_voices)
 
         if is_top_level_call:
             for same_source_group in source_id_dict.values():
-                _join_same_source_abjad_note_group(same_source_group)
+                _join_same_source_lilypond_note_group(same_source_group, backend)
 
         if self.clef is not None:
             # attach the clef to the first note of the first voice
-            abjad().attach(abjad().Clef(self.clef), abjad().select(abjad_measure).leaf(0))
+            backend.attach_clef(lilypond_measure, self.clef)
 
-        return abjad_measure
+        return lilypond_measure
 
     def to_music_xml(self, source_id_dict=None) -> pymusicxml.Measure:
         is_top_level_call = True if source_id_dict is None else False
         source_id_dict = {} if source_id_dict is None else source_id_dict
 
-        xml_voices = [voice.to_music_xml(source_id_dict) for voice in self.voices]
-        time_signature = (self.time_signature.numerator, self.time_signature.denominator) \
-            if self.show_time_signature else None
+        xml_voices = [voice.to_music_xml(source_id_dict) if voice is not None else None for voice in self.voices]
+        # (additive time signatures are written with a "+" separated numerator, e.g. <beats>3+2</beats>)
+        time_signature = tuple(self.time_signature.as_string().split("/")) if self.show_time_signature else None
 
         if is_top_level_call:
             for same_source_group in source_id_dict.values():
@@ -1734,6 +2717,7 @@ class Voice(ScoreComponent, ScoreContainer):
         return cls(None, time_signature)
 
     @classmethod
+    @_profiled_stage("voice construction", lambda cls, notes, *args, **kwargs: len(notes))
     def from_performance_voice(cls, notes: Sequence['performance_module.PerformanceNote'],
                                measure_quantization: QuantizedMeasure) -> 'Voice':
         """
@@ -1747,7 +2731,8 @@ class Voice(ScoreComponent, ScoreContainer):
         length = measure_quantization.measure_length
 
         # split any notes that have a tuple length into segments of those lengths
-        notes = [segment for note in notes for segment in note.split_at_length_divisions()]
+        # (the notes are altered in what follows, so we work with copies of them rather than the performance's notes)
+        notes = [segment for note in notes for segment in note._light_copy().split_at_length_divisions()]
 
         # change each PerformanceNote to have a start_beat relative to the start of the measure
         for note in notes:
@@ -1792,14 +2777,24 @@ class Voice(ScoreComponent, ScoreContainer):
 
     @staticmethod
     def _split_notes_at_beats(notes, beats):
-        for beat in beats:
-            split_notes = []
-            for note in notes:
-                split_notes.extend(note.split_at_beat(beat))
-            notes = split_notes
-        return notes
+        # notes and beats are both sorted, so we sweep through them together, splitting each note at every beat that
+        # falls within it (split_at_beat leaves the note alone if the beat is at or within rounding error of its edge)
+        split_notes = []
+        beat_index = 0
+        for note in notes:
+            while beat_index < len(beats) and beats[beat_index] <= note.start_beat:
+                beat_index += 1
+            last_piece = note
+            while beat_index < len(beats) and beats[beat_index] < last_piece.end_beat:
+                pieces = last_piece.split_at_beat(beats[beat_index])
+                split_notes.extend(pieces[:-1])
+                last_piece = pieces[-1]
+                beat_index += 1
+            split_notes.append(last_piece)
+        return split_notes
 
     @staticmethod
+    @_profiled_stage("beat processing", lambda beat_notes, *args, **kwargs: len(beat_notes))
     def _process_and_convert_beat(beat_notes, beat_quantization):
         beat_start = beat_notes[0].start_beat
 
@@ -1895,43 +2890,12 @@ class Voice(ScoreComponent, ScoreContainer):
 
     @staticmethod
     def _get_division_points_for_note(start_division, end_division, beat_division_hierarchy, is_rest=False):
-        beat_division_grids = _get_beat_division_grids(beat_division_hierarchy)[1:]
-        current_division = start_division
-        division_points = [current_division]
-
-        go_again = True
-        while go_again:
-            go_again = False
-
-            # starting with the widest grid, going down to the narrowest
-            for beat_division_grid in beat_division_grids:
-                # go through all the division points in this grid, and see if we can make it to them directly
-                for division_point in beat_division_grid + [len(beat_division_hierarchy)]:
-                    # if the division point is past where we are and not beyond the end of the note
-                    # and if we can get there in a single note
-                    if current_division < division_point <= end_division \
-                            and _is_single_note_viable_grouping(division_point - current_division,
-                                                                engraving_settings.max_dots_allowed):
-                        division_points.append(division_point)
-                        current_division = division_point
-                        if division_point != end_division:
-                            go_again = True
-                        break
-                else:
-                    continue
-                break
-
-        if current_division < end_division:
-            for x in _length_to_undotted_constituents(end_division - current_division):
-                division_points.append(int(round(x)) + division_points[-1])
-
-        division_points, score = _get_best_recombination_given_beat_hierarchy(
-            division_points, beat_division_hierarchy, is_rest=is_rest
-        )
-
-        return division_points, score
+        # the same notes come up over and over again within a given beat division, so the work is memoized
+        return _get_division_points_for_note(start_division, end_division, tuple(beat_division_hierarchy),
+                                             *_get_recombination_settings(is_rest))
 
     @staticmethod
+    @_profiled_stage("beat recombination")
     def _recombine_processed_beats(processed_beats, measure_quantization):
         """
         Recombine any full-beat notes that come from the same original source id where possible. E.g. make two full
@@ -2053,28 +3017,25 @@ class Voice(ScoreComponent, ScoreContainer):
         return len(beat_bin) == 1 and not isinstance(beat_bin[0], Tuplet) and not beat_bin[0].does_glissando() \
                and (beat_bin[0].is_rest() or beat_bin[0].source_id() is not None)
 
-    def _to_abjad(self, source_id_dict=None):
+    def _to_lilypond_object(self, backend, source_id_dict=None):
         if len(self.contents) == 0:  # empty voice
-            try:
-                return abjad().Voice([abjad().MultimeasureRest(
-                    (self.time_signature.numerator, self.time_signature.denominator)
-                )])
-            except abjad().exceptions.AssignabilityError:
-                return abjad().Voice("R1 * {}/{}".format(self.time_signature.numerator,
-                                                         self.time_signature.denominator))
+            # (additive time signatures have a tuple for a numerator; the rest just needs the total)
+            numerator = sum(self.time_signature.numerator) if hasattr(self.time_signature.numerator, "__len__") \
+                else self.time_signature.numerator
+            return backend.bar_rest_voice(numerator, self.time_signature.denominator)
 
         else:
             is_top_level_call = True if source_id_dict is None else False
             source_id_dict = {} if source_id_dict is None else source_id_dict
-            abjad_components = [x._to_abjad(source_id_dict) for x in self.contents]
+            lilypond_components = [x._to_lilypond_object(backend, source_id_dict) for x in self.contents]
             if is_top_level_call:
                 for same_source_group in source_id_dict.values():
-                    _join_same_source_abjad_note_group(same_source_group)
-            return abjad().Voice(abjad_components)
+                    _join_same_source_lilypond_note_group(same_source_group, backend)
+            return backend.voice(lilypond_components)
 
     def to_music_xml(self, source_id_dict=None) -> Sequence[Union[pymusicxml.BeamedGroup, _XMLNote]]:
         if len(self.contents) == 0:
-            return [pymusicxml.BarRest(self.time_signature.numerator / self.time_signature.denominator * 4)]
+            return [pymusicxml.BarRest(self.time_signature.measure_length())]
         else:
             is_top_level_call = True if source_id_dict is None else False
             source_id_dict = {} if source_id_dict is None else source_id_dict
@@ -2193,14 +3154,14 @@ class Tuplet(ScoreComponent, ScoreContainer):
         """The length, in quarter notes, of the tuplet from the inside."""
         return self.tuplet_divisions * self.division_length
 
-    def _to_abjad(self, source_id_dict=None):
+    def _to_lilypond_object(self, backend, source_id_dict=None):
         is_top_level_call = True if source_id_dict is None else False
         source_id_dict = {} if source_id_dict is None else source_id_dict
-        abjad_notes = [note_like._to_abjad(source_id_dict) for note_like in self.contents]
+        lilypond_notes = [note_like._to_lilypond_object(backend, source_id_dict) for note_like in self.contents]
         if is_top_level_call:
             for same_source_group in source_id_dict.values():
-                _join_same_source_abjad_note_group(same_source_group)
-        return abjad().Tuplet(abjad().Multiplier(self.normal_divisions, self.tuplet_divisions), abjad_notes)
+                _join_same_source_lilypond_note_group(same_source_group, backend)
+        return backend.tuplet(Fraction(self.normal_divisions, self.tuplet_divisions), lilypond_notes)
 
     def to_music_xml(self, source_id_dict=None) -> pymusicxml.Tuplet:
         is_top_level_call = True if source_id_dict is None else False
@@ -2343,96 +3304,87 @@ class NoteLike(ScoreComponent):
 
         return grace_points
 
-    def _to_abjad(self, source_id_dict=None):
+    def _to_lilypond_object(self, backend, source_id_dict=None):
         """
-        Convert this NoteLike to an abjad note, chord, or rest, along with possibly some headless grace notes to
-        represent important changes of direction in a glissando, if the glissando engraving setting are set to do so
+        Convert this NoteLike to a note, chord, or rest, along with possibly some headless grace notes to represent
+        important changes of direction in a glissando, if the glissando engraving setting are set to do so
 
-        :param source_id_dict: a dictionary keeping track of which abjad notes come from the same original
-            PerformanceNote. This is populated here when the abjad notes are generated, and then later, once a whole
-            staff of notes has been generated, ties and glissandi are added accordingly.
-        :return: an abjad note, chord, or rest, possibly with an attached AfterGraceContainer
+        :param backend: the backend with which to build the LilyPond objects
+        :param source_id_dict: a dictionary keeping track of which notes come from the same original PerformanceNote.
+            This is populated here when the notes are generated, and then later, once a whole staff of notes has
+            been generated, ties and glissandi are added accordingly.
+        :return: a note, chord, or rest, possibly with attached after-grace notes
         """
-        # abjad duration
+        # duration in whole notes
         duration = Fraction(self.written_length / 4).limit_denominator()
         # list of gliss grace notes, if applicable
         grace_notes = []
 
         if self.is_rest():
-            abjad_object = abjad().Rest(duration)
+            lilypond_object = backend.rest(duration)
         elif self.is_chord():
-            abjad_object = abjad().Chord()
-            abjad_object.written_duration = duration
-
             if self.does_glissando():
                 # if it's a glissing chord, its noteheads are based on the start level
-                abjad_object.note_heads = [self.properties.spelling_policy.resolve_abjad_pitch(x.start_level())
-                                           for x in self.pitch]
+                lilypond_object = backend.chord([self._resolve_pitch(x.start_level()) for x in self.pitch], duration)
                 # Set the notehead
-                self._set_abjad_note_head_styles(abjad_object)
-                last_pitches = abjad_object.written_pitches
+                self._set_lilypond_note_head_styles(lilypond_object, backend)
+                last_pitches = backend.pitch_key(lilypond_object)
 
                 grace_points = self._get_grace_points()
 
                 # add a grace chord for each important turn around point in the gliss
                 for t in grace_points:
-                    grace_chord = abjad().Chord()
-                    grace_chord.written_duration = 1/16
-                    grace_chord.note_heads = [self.properties.spelling_policy.resolve_abjad_pitch(x.value_at(t))
-                                              for x in self.pitch]
+                    grace_chord = backend.chord([self._resolve_pitch(x.value_at(t)) for x in self.pitch],
+                                                Fraction(1, 16))
                     # Set the notehead
-                    self._set_abjad_note_head_styles(grace_chord)
+                    self._set_lilypond_note_head_styles(grace_chord, backend)
                     # but first check that we're not just repeating the last grace chord
-                    if grace_chord.written_pitches != last_pitches:
+                    if backend.pitch_key(grace_chord) != last_pitches:
                         grace_notes.append(grace_chord)
-                        last_pitches = grace_chord.written_pitches
+                        last_pitches = backend.pitch_key(grace_chord)
             else:
                 # if not, our job is simple
-                abjad_object.note_heads = [self.properties.spelling_policy.resolve_abjad_pitch(x) for x in self.pitch]
+                lilypond_object = backend.chord([self._resolve_pitch(x) for x in self.pitch], duration)
                 # Set the noteheads
-                self._set_abjad_note_head_styles(abjad_object)
+                self._set_lilypond_note_head_styles(lilypond_object, backend)
 
         elif self.does_glissando():
             # This is a note doing a glissando
-            abjad_object = abjad().Note(self.properties.spelling_policy.resolve_abjad_pitch(self.pitch.start_level()),
-                                      duration)
+            lilypond_object = backend.note(self._resolve_pitch(self.pitch.start_level()), duration)
             # Set the notehead
-            self._set_abjad_note_head_styles(abjad_object)
-            last_pitch = abjad_object.written_pitch
+            self._set_lilypond_note_head_styles(lilypond_object, backend)
+            last_pitch = backend.pitch_key(lilypond_object)
 
             grace_points = self._get_grace_points()
 
             for t in grace_points:
-                grace = abjad().Note(self.properties.spelling_policy.resolve_abjad_pitch(self.pitch.value_at(t)), 1 / 16)
+                grace = backend.note(self._resolve_pitch(self.pitch.value_at(t)), Fraction(1, 16))
                 # Set the notehead
-                self._set_abjad_note_head_styles(grace)
+                self._set_lilypond_note_head_styles(grace, backend)
                 # but first check that we're not just repeating the last grace note pitch
-                if last_pitch != grace.written_pitch:
+                if last_pitch != backend.pitch_key(grace):
                     grace_notes.append(grace)
-                    last_pitch = grace.written_pitch
+                    last_pitch = backend.pitch_key(grace)
         else:
             # This is a simple note
-            abjad_object = abjad().Note(self.properties.spelling_policy.resolve_abjad_pitch(self.pitch), duration)
+            lilypond_object = backend.note(self._resolve_pitch(self.pitch), duration)
             # Set the notehead
-            self._set_abjad_note_head_styles(abjad_object)
+            self._set_lilypond_note_head_styles(lilypond_object, backend)
 
-        # Now we make, fill, and attach the abjad AfterGraceContainer, if applicable
+        # Now we attach the grace notes, if applicable
         if len(grace_notes) > 0:
             for note in grace_notes:
                 # this signifier, \stemless, is not standard lilypond, and is defined with
                 # an override at the start of the score
-                abjad().attach(abjad().LilyPondLiteral(r"\stemless"), note)
-            grace_container = abjad().AfterGraceContainer(grace_notes)
-            abjad().attach(grace_container, abjad_object)
-        else:
-            grace_container = None
+                backend.attach_opening_literal(note, r"\stemless")
+            backend.attach_after_grace_notes(lilypond_object, grace_notes)
 
-        # this is where we populate the source_id_dict passed down to us from the top level "to_abjad()" call
+        # this is where we populate the source_id_dict passed down to us from the top level conversion call
         if source_id_dict is not None:
             # sometimes a note will not have a _source_id property defined, since it never gets broken into tied
             # components. However, if it's a glissando and there's stemless grace notes involved, we're going to
             # have to give it a _source_id so that it can share it with its grace notes
-            if grace_container is not None and "_source_id" not in self.properties.temp:
+            if len(grace_notes) > 0 and "_source_id" not in self.properties.temp:
                 self.properties.temp["_source_id"] = performance_module.PerformanceNote.next_id()
 
             if "_source_id" in self.properties.temp:
@@ -2440,63 +3392,55 @@ class NoteLike(ScoreComponent):
                 # contains all the notes of the same source, so that they can be tied / joined by glissandi
                 if self.properties.temp["_source_id"] in source_id_dict:
                     # this source_id is already associated with a leaf, so add it to the list
-                    source_id_dict[self.properties.temp["_source_id"]].append(abjad_object)
+                    source_id_dict[self.properties.temp["_source_id"]].append(lilypond_object)
                 else:
                     # we don't yet have a record on this source_id, so start a list with this object under that key
-                    source_id_dict[self.properties.temp["_source_id"]] = [abjad_object]
+                    source_id_dict[self.properties.temp["_source_id"]] = [lilypond_object]
 
                 # add any grace notes to the same bin as their parent
-                if grace_container is not None:
-                    source_id_dict[self.properties.temp["_source_id"]].extend(grace_container)
+                source_id_dict[self.properties.temp["_source_id"]].extend(grace_notes)
 
-        self._attach_abjad_articulations(abjad_object, grace_container)
-        return abjad_object
+        self._add_lilypond_articulations(lilypond_object, grace_notes, backend)
+        return lilypond_object
 
-    def _set_abjad_note_head_styles(self, abjad_note_or_chord):
-        if isinstance(abjad_note_or_chord, abjad().Note):
-            note_head_style = self.properties.noteheads[0]
+    def _resolve_pitch(self, pitch):
+        return self.properties.spelling_policy.resolve_name_octave_and_alteration(pitch)
+
+    def _set_lilypond_note_head_styles(self, lilypond_note_or_chord, backend):
+        note_heads = backend.get_note_heads(lilypond_note_or_chord)
+        for note_head, note_head_style in zip(note_heads, self.properties.noteheads):
             if note_head_style != "normal":
                 lilypond_style = get_lilypond_notehead_name(note_head_style)
                 # the pipe separates out a bit of comment text, which is used when the
                 # desired notehead can't be displayed
-                abjad().tweak(abjad_note_or_chord.note_head).style = lilypond_style.split("|")[0]
+                backend.set_note_head_style(note_head, lilypond_style.split("|")[0])
                 if len(lilypond_style.split("|")) > 1:
-                    abjad().attach(abjad().LilyPondComment(lilypond_style.split("|")[1]), abjad_note_or_chord)
-        elif isinstance(abjad_note_or_chord, abjad().Chord):
-            for chord_member, note_head_style in enumerate(self.properties.noteheads):
-                if note_head_style != "normal":
-                    lilypond_style = get_lilypond_notehead_name(note_head_style)
-                    abjad().tweak(abjad_note_or_chord.note_heads[chord_member]).style = lilypond_style.split("|")[0]
-                    if len(lilypond_style.split("|")) > 1:
-                        abjad().attach(abjad().LilyPondComment(lilypond_style.split("|")[1]), abjad_note_or_chord)
-        else:
-            raise ValueError("Must be an abjad Note or Chord object")
+                    backend.add_comment(lilypond_note_or_chord, lilypond_style.split("|")[1])
 
-    def _attach_abjad_articulations(self, abjad_note_or_chord, grace_container):
-        if grace_container is None:
+    def _add_lilypond_articulations(self, lilypond_note_or_chord, grace_notes, backend):
+        if len(grace_notes) == 0:
             # just a single notehead, so attach all articulations
             for articulation in self.properties.articulations:
-                abjad().attach(abjad().Articulation(articulation), abjad_note_or_chord)
+                backend.add_articulation(lilypond_note_or_chord, articulation)
         else:
             # there's a gliss
-            attack_notehead = abjad_note_or_chord if not self.properties.ends_tie() else None
-            release_notehead = grace_container[-1] if not self.properties.starts_tie() else None
-            inner_noteheads = ([] if attack_notehead is not None else [abjad_note_or_chord]) + \
-                              [grace for grace in grace_container[:-1]] + \
-                              ([] if release_notehead is not None else [grace_container[-1]])
+            attack_notehead = lilypond_note_or_chord if not self.properties.ends_tie() else None
+            release_notehead = grace_notes[-1] if not self.properties.starts_tie() else None
+            inner_noteheads = ([] if attack_notehead is not None else [lilypond_note_or_chord]) + \
+                              grace_notes[:-1] + ([] if release_notehead is not None else [grace_notes[-1]])
 
             # only attach attack articulations to the main note
             if attack_notehead is not None:
                 for articulation in self._get_attack_articulations():
-                    abjad().attach(abjad().Articulation(articulation), abjad_note_or_chord)
-            # attach inner articulations to all but the last notehead in the grace container
+                    backend.add_articulation(lilypond_note_or_chord, articulation)
+            # attach inner articulations to all but the last of the grace notes
             for articulation in self._get_inner_articulations():
                 for grace_note in inner_noteheads:
-                    abjad().attach(abjad().Articulation(articulation), grace_note)
-            # attach release articulations to the last notehead in the grace container
+                    backend.add_articulation(grace_note, articulation)
+            # attach release articulations to the last of the grace notes
             if release_notehead is not None:
                 for articulation in self._get_release_articulations():
-                    abjad().attach(abjad().Articulation(articulation), grace_container[-1])
+                    backend.add_articulation(grace_notes[-1], articulation)
 
     def to_music_xml(self, source_id_dict=None) -> Sequence[_XMLNote]:
         notations = [notations_to_xml_notations_element[x] for x in self.properties.notations
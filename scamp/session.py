@@ -14,6 +14,7 @@ from threading import Thread, current_thread
 from .spelling import SpellingPolicy
 from typing import Union, Tuple, Iterator, Callable, Sequence
 from .performance import Performance
+from .quantization import QuantizationScheme
 import threading
 
 
@@ -345,7 +346,8 @@ class Session(Clock, Ensemble, Transcriber, SavesToJSON):
     # --------------------------------- Transcription Stuff -------------------------------
 
     def start_transcribing(self, instrument_or_instruments: Union[ScampInstrument, Sequence[ScampInstrument]] = None,
-                           clock: Clock = None, units: str = "beats") -> Performance:
+                           clock: Clock = None, units: str = "beats",
+                           quantization_scheme: QuantizationScheme = None) -> Performance:
         """
         Starts transcribing everything played in this Session's (or by the given instruments) to a Performance.
         Defaults to using this Session as the clock.
@@ -353,6 +355,8 @@ class Session(Clock, Ensemble, Transcriber, SavesToJSON):
         :param instrument_or_instruments: which instruments to transcribe. Defaults to all session instruments
         :param clock: which clock to record on, i.e. what are all the timings notated relative to
         :param units: one of ["beats", "time"]. Do we use the beats of the clock or the time?
+        :param quantization_scheme: if given, the performance is quantized according to this scheme as it is
+            transcribed (see :func:`~scamp.transcriber.Transcriber.get_live_quantized_performance`)
 
         :return: the Performance we will be transcribing to
         """
@@ -362,7 +366,7 @@ class Session(Clock, Ensemble, Transcriber, SavesToJSON):
 
         return super().start_transcribing(
             self.instruments if instrument_or_instruments is None else instrument_or_instruments,
-            self if clock is None else clock, units=units
+            self if clock is None else clock, units=units, quantization_scheme=quantization_scheme
         )
 
     def _to_dict(self):
@@ -241,6 +241,13 @@ class QuantizationSettings(_ScampSettings):
         :class:`~scamp.quantization.BeatQuantizationScheme`)
     :ivar default_time_signature: string (e.g. "4/4") representing the default time signature to use when one is not
         specified.
+    :ivar cache_max_entries: int representing how many quantized voices to hold on to in memory, so that quantizing
+        the same notes with the same scheme and weightings again can skip straight to the result. The least recently
+        used entries are evicted first; 0 turns off the in-memory cache.
+    :ivar cache_directory: path of a directory in which to also store quantized voices on disk, so that they survive
+        across runs of a script, or None to not use a disk cache.
+    :ivar cache_max_disk_entries: int representing how many quantized voices to keep in the cache_directory before
+        removing the least recently used ones.
     """
 
     #: Default quantization settings (from when SCAMP was installed)
@@ -251,7 +258,10 @@ class QuantizationSettings(_ScampSettings):
         "max_divisor": 8,
         "max_divisor_indigestibility": None,
         "simplicity_preference": 2.0,
-        "default_time_signature": "4/4"
+        "default_time_signature": "4/4",
+        "cache_max_entries": 32,
+        "cache_directory": None,
+        "cache_max_disk_entries": 256
     }
 
     _settings_name = "Quantization settings"
@@ -261,7 +271,8 @@ class QuantizationSettings(_ScampSettings):
     def __init__(self, settings_dict: dict = None):
         # This is here to help with auto-completion so that the IDE knows what attributes are available
         self.onset_weighting = self.termination_weighting = self.inner_split_weighting = self.max_divisor = \
-            self.max_divisor_indigestibility = self.simplicity_preference = self.default_time_signature = None
+            self.max_divisor_indigestibility = self.simplicity_preference = self.default_time_signature = \
+            self.cache_max_entries = self.cache_directory = self.cache_max_disk_entries = None
         super().__init__(settings_dict)
 
 
@@ -404,6 +415,14 @@ class EngravingSettings(_ScampSettings):
     :ivar show_microtonal_annotations: if True, annotates microtonal pitches with the exact floating-point MIDI pitch
         value that they are intended to represent. (This is useful, since normally the best a notation program can
         do is quarter tones.
+    :ivar measure_cache_max_entries: int representing how many constructed measures to hold on to, so that generating
+        a score again after changing only some of its notes can reuse the measures that didn't change. The least
+        recently used entries are evicted first; 0 turns off the cache.
+    :ivar lilypond_cache_directory: path of a directory in which to cache the output of rendering scores with LilyPond
+        (e.g. via :func:`~scamp.score.render_lilypond` or :func:`~scamp.score.ScoreComponent.export_pdf`), so that
+        scores whose LilyPond code hasn't changed are not compiled again. If None, nothing is cached.
+    :ivar lilypond_cache_max_entries: int representing how many rendered scores to keep in the
+        lilypond_cache_directory before evicting the least recently used.
     """
 
     #: Default engraving settings (from when SCAMP was installed)
@@ -462,6 +481,9 @@ class EngravingSettings(_ScampSettings):
         "pad_incomplete_parts": True,
         "show_music_xml_command_line": "auto",
         "show_microtonal_annotations": False,
+        "measure_cache_max_entries": 2048,
+        "lilypond_cache_directory": None,
+        "lilypond_cache_max_entries": 256,
     }
 
     _settings_name = "Engraving settings"
@@ -475,7 +497,8 @@ class EngravingSettings(_ScampSettings):
             self.default_titles = self.default_composers = self.default_spelling_policy = self.ignore_empty_parts = \
             self.pad_incomplete_parts = self.show_music_xml_command_line = self.show_microtonal_annotations = \
             self.allow_duple_tuplets_in_compound_time = self.clefs_by_instrument = self.clef_pitch_centers = \
-            self.clef_selection_policy = None
+            self.clef_selection_policy = self.measure_cache_max_entries = \
+            self.lilypond_cache_directory = self.lilypond_cache_max_entries = None
         self.glissandi: GlissandiSettings = None
         self.tempo: TempoSettings = None
         super().__init__(settings_dict)
@@ -1,10 +1,13 @@
 """Module containing the :class:`Transcriber` class which records the playback of a group of
 :class:`~scamp.instruments.ScampInstrument` objects to create a :class:`~scamp.performance.Performance`"""
 
-from .performance import Performance
+from .performance import Performance, PerformancePart
+from .quantization import QuantizationScheme, IncrementalQuantizer, _add_quantized_voices_to_part
 from expenvelope import Envelope
 from clockblocks import Clock, TempoEnvelope
 from .instruments import ScampInstrument
+from copy import deepcopy
+import weakref
 from typing import Union, Sequence
 
 
@@ -17,15 +20,24 @@ class Transcriber:
 
     def __init__(self):
         self._transcriptions_in_progress = []
+        # (performance, IncrementalQuantizer) for the most recently stopped transcription that was quantized as it
+        # went, and a weak mapping from performance to IncrementalQuantizer for all of them, so that the quantizers of
+        # older transcriptions are let go of along with their performances
+        self._last_finished_live_quantization = None
+        self._finished_live_quantizers = weakref.WeakKeyDictionary()
 
     def start_transcribing(self, instrument_or_instruments: Union[ScampInstrument, Sequence[ScampInstrument]],
-                           clock: Clock, units: str = "beats") -> Performance:
+                           clock: Clock, units: str = "beats",
+                           quantization_scheme: QuantizationScheme = None) -> Performance:
         """
         Starts transcribing new performance on the given clock, consisting of the given instrument
 
         :param instrument_or_instruments: the instruments we notate in this Performance
         :param clock: which clock all timings are relative to
         :param units: one of ["beats", "time"]. Do we use the beats of the clock or the time?
+        :param quantization_scheme: if given, the performance is quantized according to this scheme as it is
+            transcribed, with each beat being finalized as soon as no more notes can land in it. The result can be
+            retrieved at any point with :func:`get_live_quantized_performance`.
         :return: the Performance that this transcription writes to, which will be updated as notes are played and acts
             as a handle when calling stop_transcribing.
         """
@@ -44,7 +56,8 @@ class Transcriber:
                 instrument._transcribers_to_notify.append(self)
 
         self._transcriptions_in_progress.append(
-            (performance, clock, clock.beat(), units)
+            (performance, clock, clock.beat(), units,
+             IncrementalQuantizer(quantization_scheme) if quantization_scheme is not None else None)
         )
 
         return performance
@@ -63,7 +76,7 @@ class Transcriber:
             return
 
         # loop through all the transcriptions in progress
-        for performance, clock, clock_start_beat, units in self._transcriptions_in_progress:
+        for performance, clock, clock_start_beat, units, live_quantizer in self._transcriptions_in_progress:
             # figure out the start_beat and length relative to this transcription's clock and start beat
             start_beat_in_clock = Transcriber._resolve_time_stamp(note_info["start_time_stamp"], clock, units)
             end_beat_in_clock = Transcriber._resolve_time_stamp(note_info["end_time_stamp"], clock, units)
@@ -155,10 +168,27 @@ class Transcriber:
             for instrument_part in performance.get_parts_by_instrument(instrument):
                 # it'd be kind of weird for more than one part to have the same instrument, but if they did,
                 # I suppose that each part should transcribe the note
-                instrument_part.new_note(
+                new_note = instrument_part.new_note(
                     note_start_beat, note_length_sections if note_length_sections is not None else note_length,
                     pitch, volume, note_info["properties"]
                 )
+                if live_quantizer is not None:
+                    live_quantizer.add_note(
+                        (performance.parts.index(instrument_part), PerformancePart._get_voice_name(new_note)),
+                        deepcopy(new_note)
+                    )
+
+            if live_quantizer is not None:
+                # no note still to be registered can start before any currently sounding note, or before now
+                safe_beat = end_beat_in_clock - clock_start_beat
+                for part in performance.parts:
+                    if part.instrument is None:
+                        continue
+                    for other_note_info in list(part.instrument._note_info_by_id.values()):
+                        if other_note_info is not note_info:
+                            safe_beat = min(safe_beat, Transcriber._resolve_time_stamp(
+                                other_note_info["start_time_stamp"], clock, units) - clock_start_beat)
+                live_quantizer.finalize_up_to(safe_beat)
 
     @staticmethod
     def _resolve_time_stamp(time_stamp, clock, units):
@@ -187,7 +217,11 @@ class Transcriber:
             if transcription is None:
                 raise ValueError("Cannot stop transcribing given performance, as it was never started!")
 
-        transcribed_performance, transcription_clock, transcription_start_beat, units = transcription
+        transcribed_performance, transcription_clock, transcription_start_beat, units, live_quantizer = transcription
+        if live_quantizer is not None:
+            live_quantizer.finish()
+            self._last_finished_live_quantization = transcribed_performance, live_quantizer
+            self._finished_live_quantizers[transcribed_performance] = live_quantizer
         if units == "beats":
             transcribed_performance.tempo_envelope = transcription_clock.extract_absolute_tempo_envelope(
                 transcription_start_beat, tolerance=tempo_envelope_tolerance
@@ -200,3 +234,44 @@ class Transcriber:
                 transcription_start_beat, tolerance=tempo_envelope_tolerance
             )
         return transcribed_performance
+
+    def get_live_quantized_performance(self, which_performance: Performance = None) -> Performance:
+        """
+        For a transcription started with a quantization scheme, returns a quantized Performance reflecting all of the
+        quantization done so far. While the transcription is in progress, this contains only those notes that have
+        been fully quantized, and can be used for a live preview of the score; once the transcription has stopped,
+        it is the complete quantized Performance, ready to be passed to
+        :func:`~scamp.score.Score.from_quantized_performance` without any further quantization.
+
+        :param which_performance: which transcribed performance to get the quantized version of; defaults to the
+            oldest transcription in progress or, failing that, the most recently stopped one. (The quantization of an
+            older stopped transcription is only kept for as long as its performance is.)
+        :return: a new, quantized Performance
+        """
+        for transcription in self._transcriptions_in_progress:
+            if which_performance is None or transcription[0] == which_performance:
+                performance, live_quantizer = transcription[0], transcription[4]
+                break
+        else:
+            if which_performance is None and self._last_finished_live_quantization is not None:
+                performance, live_quantizer = self._last_finished_live_quantization
+            elif which_performance is not None and which_performance in self._finished_live_quantizers:
+                performance, live_quantizer = which_performance, self._finished_live_quantizers[which_performance]
+            else:
+                raise ValueError("Cannot get live quantized performance, as no such transcription was started.")
+        if live_quantizer is None:
+            raise ValueError("Transcription was not started with a quantization scheme.")
+
+        quantized_parts = []
+        for part_index, part in enumerate(performance.parts):
+            voice_names = list(part.voices.keys())
+            quantized_part = PerformancePart(instrument=part.instrument, name=part.name,
+                                             voices={voice_name: [] for voice_name in voice_names},
+                                             instrument_id=part._instrument_id)
+            quantized_part.voice_quantization_records = {}
+            for voice_name in voice_names:
+                if (part_index, voice_name) in live_quantizer.voice_names:
+                    _add_quantized_voices_to_part(quantized_part, voice_name,
+                                                  *live_quantizer.get_quantized_voice((part_index, voice_name)))
+            quantized_parts.append(quantized_part)
+        return Performance(quantized_parts, tempo_envelope=performance.tempo_envelope)
@@ -8,6 +8,8 @@ import inspect
 import math
 import itertools
 import functools
+import threading
+from collections import OrderedDict
 from typing import Iterator, Type, Callable, List, Sequence, Tuple, Union, TypeVar
 from expenvelope.json_serializer import SavesToJSON, SavesToJSONMeta
 
@@ -68,6 +70,80 @@ def memoize(obj: Callable) -> Callable:
 
     return memoizer
 
+
+class LRUCache:
+    """
+    Thread-safe mapping that holds on to a limited number of entries, evicting the least recently used ones first.
+
+    :param max_size: the number of entries to hold on to. This can also be a zero-argument function returning the
+        number, in which case it is checked every time an entry is stored (so that the limit can follow a setting).
+        A max size of zero or less means that nothing is stored.
+    """
+
+    def __init__(self, max_size: Union[int, Callable[[], int]]):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_max_size(self) -> int:
+        return max(self.max_size() if callable(self.max_size) else self.max_size, 0)
+
+    def get(self, key, default=None):
+        """
+        Returns the entry stored under the given key (marking it as recently used), or the default if there is none.
+        """
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value) -> None:
+        """
+        Stores the value under the given key, evicting the least recently used entries if there are too many.
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def get_or_create(self, key, factory: Callable):
+        """
+        Returns the entry stored under the given key, first creating it by calling factory() if there is none. If two
+        threads create the same entry at once, both get back the one that was stored first.
+
+        :param key: a hashable key that fully determines the result of factory
+        :param factory: zero-argument function that creates the entry
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        value = factory()
+        with self._lock:
+            value = self._entries.setdefault(key, value)
+            self._entries.move_to_end(key)
+            self._evict()
+        return value
+
+    def clear(self) -> None:
+        """
+        Empties the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def _evict(self):
+        max_size = self._get_max_size()
+        while len(self._entries) > max_size:
+            self._entries.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
 # -------------------------------------------- Numerical Utilities -----------------------------------------------
 
 
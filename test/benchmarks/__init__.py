@@ -0,0 +1,12 @@
+"""
+Benchmarks for the path from a :class:`~scamp.performance.Performance` to notation. Synthetic performances (see
+:mod:`benchmarks.workloads`) are quantized, turned into a :class:`~scamp.score.Score`, and exported to MusicXML and
+LilyPond, with each of these stages timed separately (see :mod:`benchmarks.runner`).
+
+Run from the test directory with :code:`python -m benchmarks`; use :code:`--help` for the available options. The
+results are written as JSON, and passing the results of an earlier run with :code:`--compare` reports (and exits
+with a non-zero status on) any stage that has gotten slower.
+"""
+
+from .workloads import Workload, standard_workloads, quick_workloads
+from .runner import STAGES, run_workload, run_benchmarks, compare_results
@@ -0,0 +1,57 @@
+#! /usr/bin/python3
+from .workloads import standard_workloads, quick_workloads
+from .runner import STAGES, run_benchmarks, compare_results
+import argparse
+import json
+import sys
+
+
+def log(message):
+    # progress goes to stderr, so that the JSON results can be piped from stdout
+    print(message, file=sys.stderr)
+
+
+parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                 description="Time the quantization and engraving of synthetic performances.")
+parser.add_argument("-q", "--quick", action="store_true", help="run scaled-down versions of the workloads")
+parser.add_argument("-w", "--workloads", nargs="+", metavar="NAME",
+                    help="names of the workloads to run (default: all of them)")
+parser.add_argument("-s", "--stages", nargs="+", choices=STAGES, default=list(STAGES), help="stages to time")
+parser.add_argument("-r", "--repeats", type=int, default=3, help="number of times to time each stage")
+parser.add_argument("-o", "--output", metavar="PATH", help="file to write the JSON results to (default: stdout)")
+parser.add_argument("-c", "--compare", metavar="PATH", help="JSON results of an earlier run to check for regressions")
+parser.add_argument("-t", "--tolerance", type=float, default=0.25,
+                    help="fraction by which a stage may slow down before counting as a regression (default: 0.25)")
+args = parser.parse_args()
+
+workloads = quick_workloads if args.quick else standard_workloads
+if args.workloads is not None:
+    unknown_names = set(args.workloads) - set(workload.name for workload in workloads)
+    if len(unknown_names) > 0:
+        parser.error("Unknown workload(s): {}".format(", ".join(sorted(unknown_names))))
+    workloads = [workload for workload in workloads if workload.name in args.workloads]
+
+results = run_benchmarks(workloads, repeats=args.repeats, stages=args.stages, log=log)
+
+if args.compare is not None:
+    with open(args.compare, "r") as baseline_file:
+        regressions = compare_results(results, json.load(baseline_file), args.tolerance)
+    results["regressions"] = regressions
+else:
+    regressions = []
+
+if args.output is not None:
+    with open(args.output, "w") as output_file:
+        json.dump(results, output_file, indent=4)
+else:
+    json.dump(results, sys.stdout, indent=4)
+    print()
+
+for regression in regressions:
+    if "error" in regression:
+        log("REGRESSION in {workload}: now fails with {error}".format(**regression))
+    else:
+        log("REGRESSION in {workload} ({stage}): {baseline:.4f}s -> {current:.4f}s ({ratio:.2f}x)".format(
+            **regression))
+
+sys.exit(1 if len(regressions) > 0 else 0)
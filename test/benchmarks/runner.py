@@ -0,0 +1,195 @@
+"""
+Functions for timing the stages of turning a :class:`~scamp.performance.Performance` into notation, and for comparing
+the results against a previous run.
+"""
+
+from scamp import Score, quantization_settings, engraving_settings
+from scamp.quantization import quantize_performance_part
+from scamp._dependencies import abjad, numpy
+from scamp._package_info import version
+from .workloads import Workload
+from copy import deepcopy
+from typing import Sequence, Callable
+import statistics
+import platform
+import datetime
+import time
+import json
+
+
+#: The stages that can be timed, in the order that they happen
+STAGES = ("quantize", "score", "music_xml", "lilypond")
+
+
+def run_workload(workload: Workload, repeats: int = 3, stages: Sequence[str] = STAGES) -> dict:
+    """
+    Times each of the given stages for a single workload.
+
+    :param workload: the Workload to benchmark
+    :param repeats: how many times to time each stage
+    :param stages: which of the stages in :data:`STAGES` to time. Each stage relies on the result of the previous
+        one, so earlier stages are carried out (but not reported) even when only later ones are requested.
+    :return: dictionary containing the workload parameters, the total number of notes, and for each stage the
+        individual timings along with their minimum, median and mean (all in seconds)
+    """
+    performance = workload.make_performance()
+    quantization_scheme = workload.make_quantization_scheme()
+    results = {
+        "workload": workload.to_dict(),
+        "num_notes": sum(len(voice) for part in performance.parts for voice in part.voices.values()),
+        "stages": {}
+    }
+
+    # quantization alters the parts in place, so each run gets fresh copies (made outside the timed region)
+    def quantize():
+        quantized_performance = deepcopy(performance)
+        start = time.perf_counter()
+        for part in quantized_performance.parts:
+            quantize_performance_part(part, quantization_scheme)
+        return time.perf_counter() - start, quantized_performance
+
+    timings, quantized_performance = _time_repeatedly(quantize, repeats if "quantize" in stages else 1)
+    if "quantize" in stages:
+        results["stages"]["quantize"] = _summarize(timings)
+
+    if not any(stage in stages for stage in STAGES[1:]):
+        return results
+
+    timings, score = _time_repeatedly(
+        _timed(lambda: Score.from_quantized_performance(quantized_performance, title="", composer="")),
+        repeats if "score" in stages else 1
+    )
+    if "score" in stages:
+        results["stages"]["score"] = _summarize(timings)
+
+    if "music_xml" in stages:
+        timings, _ = _time_repeatedly(_timed(lambda: score.to_music_xml().to_xml()), repeats)
+        results["stages"]["music_xml"] = _summarize(timings)
+
+    if "lilypond" in stages:
+        timings, _ = _time_repeatedly(_timed(score.to_lilypond), repeats)
+        results["stages"]["lilypond"] = _summarize(timings)
+
+    return results
+
+
+def run_benchmarks(workloads: Sequence[Workload], repeats: int = 3, stages: Sequence[str] = STAGES,
+                   log: Callable[[str], None] = None) -> dict:
+    """
+    Runs each of the given workloads and collects the results, along with information about the environment.
+    The quantization and measure caches are switched off for the duration, so that every run actually quantizes and
+    constructs every measure.
+
+    :param workloads: the Workloads to benchmark
+    :param repeats: how many times to time each stage
+    :param stages: which of the stages in :data:`STAGES` to time
+    :param log: function with which to report progress (e.g. print); if None, progress is not reported
+    :return: JSON-serializable dictionary of results, keyed by workload name under "workloads"
+    """
+    cache_settings = quantization_settings.cache_max_entries, quantization_settings.cache_directory
+    quantization_settings.cache_max_entries, quantization_settings.cache_directory = 0, None
+    measure_cache_max_entries = engraving_settings.measure_cache_max_entries
+    engraving_settings.measure_cache_max_entries = 0
+    try:
+        results = {
+            "environment": {
+                "scamp_version": version,
+                "python_version": platform.python_version(),
+                "platform": platform.platform(),
+                "numpy": numpy is not None,
+                "abjad": abjad() is not None,
+                "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            },
+            "settings": {
+                "repeats": repeats,
+                "stages": list(stages),
+                "quantization_settings": json.loads(quantization_settings.json_dumps()),
+                "engraving_settings": json.loads(engraving_settings.json_dumps()),
+            },
+            "workloads": {}
+        }
+        for workload in workloads:
+            if log is not None:
+                log("Running workload \"{}\"...".format(workload.name))
+            try:
+                results["workloads"][workload.name] = workload_results = run_workload(workload, repeats, stages)
+            except Exception as e:
+                # a workload that scamp can't handle is itself worth knowing about, but shouldn't stop the others
+                results["workloads"][workload.name] = {"workload": workload.to_dict(), "error": repr(e)}
+                if log is not None:
+                    log("    failed: {}".format(repr(e)))
+                continue
+            if log is not None:
+                for stage, stage_results in workload_results["stages"].items():
+                    log("    {}: {:.4f}s".format(stage, stage_results["min"]))
+        return results
+    finally:
+        quantization_settings.cache_max_entries, quantization_settings.cache_directory = cache_settings
+        engraving_settings.measure_cache_max_entries = measure_cache_max_entries
+
+
+def compare_results(results: dict, baseline: dict, tolerance: float = 0.25) -> list:
+    """
+    Compares benchmark results with those of a previous run, looking for stages that have gotten slower. The minimum
+    timing of each stage is compared, since it is the least affected by other activity on the machine.
+
+    :param results: results from :func:`run_benchmarks`
+    :param baseline: results of an earlier run of :func:`run_benchmarks`
+    :param tolerance: how much slower (as a fraction) a stage can get before it counts as a regression
+    :return: list of dictionaries describing each regression, with the keys "workload", "stage", "baseline",
+        "current" and "ratio". A workload that ran in the baseline but now fails is also a regression, and is
+        described instead by the keys "workload" and "error".
+    """
+    regressions = []
+    for workload_name, workload_results in results["workloads"].items():
+        if workload_name not in baseline["workloads"] or "stages" not in baseline["workloads"][workload_name]:
+            continue
+        if "error" in workload_results:
+            regressions.append({"workload": workload_name, "error": workload_results["error"]})
+            continue
+        if workload_results["workload"] != baseline["workloads"][workload_name]["workload"]:
+            # the workload has been redefined, so the timings are not comparable
+            continue
+        for stage, stage_results in workload_results["stages"].items():
+            baseline_stage_results = baseline["workloads"][workload_name]["stages"].get(stage, {})
+            if "min" not in stage_results or "min" not in baseline_stage_results:
+                continue
+            ratio = stage_results["min"] / baseline_stage_results["min"]
+            if ratio > 1 + tolerance:
+                regressions.append({
+                    "workload": workload_name,
+                    "stage": stage,
+                    "baseline": baseline_stage_results["min"],
+                    "current": stage_results["min"],
+                    "ratio": ratio
+                })
+    return regressions
+
+
+def _timed(function):
+    # wraps a function so that it returns (time taken, result)
+    def timed_function():
+        start = time.perf_counter()
+        result = function()
+        return time.perf_counter() - start, result
+    return timed_function
+
+
+def _time_repeatedly(timed_function, repeats):
+    # calls a function returning (time taken, result) the given number of times,
+    # returning the list of times taken and the last result
+    timings = []
+    result = None
+    for _ in range(max(repeats, 1)):
+        duration, result = timed_function()
+        timings.append(duration)
+    return timings, result
+
+
+def _summarize(timings):
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+        "runs": timings
+    }
@@ -0,0 +1,133 @@
+"""
+Generators for synthetic :class:`~scamp.performance.Performance` objects, used as benchmark workloads. Everything is
+driven by a seeded random number generator, so that a given :class:`Workload` always produces the same Performance.
+"""
+
+from scamp import QuantizationScheme
+from scamp.performance import Performance, PerformancePart, PerformanceNote
+from expenvelope import Envelope
+from typing import Sequence
+import random
+
+
+class Workload:
+    """
+    Description of a synthetic performance to benchmark.
+
+    :param name: name under which the results for this workload are reported
+    :param num_parts: number of parts in the performance
+    :param notes_per_part: number of notes in each part
+    :param polyphony: number of independent, overlapping lines in each part. Since these all go in the same voice,
+        the quantizer has to split them up into non-overlapping voices.
+    :param chord_density: probability (0 to 1) that a note is doubled by another note of the same rhythm, forming a
+        chord
+    :param gliss_density: probability (0 to 1) that a note is a glissando rather than a static pitch
+    :param tuplet_density: probability (0 to 1) that a stretch of notes is placed on a triplet, quintuplet or septuplet
+        grid, rather than a duple one
+    :param jitter: amount of random deviation (in beats) from the rhythmic grid, simulating a live performance
+    :param time_signatures: list of time signatures to loop through when quantizing
+    :param max_divisor: the max divisor of the quantization scheme
+    :param quantization_mode: "greedy" or "global" (see :class:`~scamp.quantization.QuantizationScheme`)
+    :param seed: seed for the random number generator
+    """
+
+    def __init__(self, name: str, num_parts: int = 1, notes_per_part: int = 500, polyphony: int = 1,
+                 chord_density: float = 0.0, gliss_density: float = 0.0, tuplet_density: float = 0.0,
+                 jitter: float = 0.02, time_signatures: Sequence[str] = ("4/4",), max_divisor: int = 8,
+                 quantization_mode: str = "greedy", seed: int = 0):
+        self.name = name
+        self.num_parts = num_parts
+        self.notes_per_part = notes_per_part
+        self.polyphony = polyphony
+        self.chord_density = chord_density
+        self.gliss_density = gliss_density
+        self.tuplet_density = tuplet_density
+        self.jitter = jitter
+        self.time_signatures = list(time_signatures)
+        self.max_divisor = max_divisor
+        self.quantization_mode = quantization_mode
+        self.seed = seed
+
+    def make_performance(self) -> Performance:
+        """
+        Generates the (unquantized) Performance described by this workload.
+        """
+        rng = random.Random(self.seed)
+        return Performance([self._make_part(rng, "Part {}".format(i + 1)) for i in range(self.num_parts)])
+
+    def make_quantization_scheme(self) -> QuantizationScheme:
+        """
+        Constructs the QuantizationScheme with which this workload is to be quantized.
+        """
+        return QuantizationScheme.from_time_signature_list(self.time_signatures, loop=True,
+                                                           max_divisor=self.max_divisor, mode=self.quantization_mode)
+
+    def scaled(self, factor: float) -> 'Workload':
+        """
+        Returns a copy of this workload with the number of notes per part multiplied by the given factor.
+
+        :param factor: the factor by which to scale the number of notes
+        """
+        return Workload(**dict(self.to_dict(), notes_per_part=max(int(self.notes_per_part * factor), self.polyphony)))
+
+    def to_dict(self) -> dict:
+        """
+        Returns the parameters of this workload as a dictionary, for inclusion in the benchmark results.
+        """
+        return dict(vars(self))
+
+    def _make_part(self, rng, name):
+        # the instrument_id stands in for an actual instrument, which the score needs for naming the staff
+        part = PerformancePart(name=name, instrument_id=(name, 0))
+        # each of the lines gets an equal share of the notes, and its own register
+        notes_per_line = [len(range(i, self.notes_per_part, self.polyphony)) for i in range(self.polyphony)]
+        notes = []
+        for line_index, num_notes in enumerate(notes_per_line):
+            notes.extend(self._make_line(rng, num_notes, 48 + 12 * (line_index % 4)))
+        # add the notes in order of start time; otherwise the part re-sorts its voice after every note
+        for note in sorted(notes, key=lambda n: n.start_beat):
+            part.add_note(note)
+        return part
+
+    def _make_line(self, rng, num_notes, register):
+        t = 0.0
+        grid = 0.5
+        notes = []
+        while len(notes) < num_notes:
+            # every so often, switch between a duple and a tuplet grid
+            if rng.random() < 0.1:
+                grid = 1 / rng.choice((3, 5, 7)) if rng.random() < self.tuplet_density else rng.choice((0.25, 0.5))
+            length = grid * rng.randint(1, 4)
+            start = max(0.0, t + rng.uniform(-self.jitter, self.jitter))
+            duration = max(0.01, length + rng.uniform(-self.jitter, self.jitter))
+            if rng.random() < 0.15:
+                # a rest
+                t += length
+                continue
+            pitch = register + rng.randint(0, 11)
+            if rng.random() < self.gliss_density:
+                pitch = Envelope.from_levels([pitch] + [pitch + rng.uniform(-5, 5) for _ in range(rng.randint(1, 3))],
+                                             length=duration)
+            volume = rng.uniform(0.3, 1.0)
+            notes.append(PerformanceNote(start, duration, pitch, volume, {}))
+            if rng.random() < self.chord_density and len(notes) < num_notes:
+                notes.append(PerformanceNote(start, duration, pitch + rng.choice((3, 4, 7)), volume, {}))
+            t += length
+        return notes
+
+
+#: The workloads that are run by default
+standard_workloads = [
+    Workload("monophonic", notes_per_part=2000, seed=1),
+    Workload("polyphonic", notes_per_part=2000, polyphony=4, chord_density=0.2, seed=2),
+    Workload("dense_cluster", notes_per_part=3000, polyphony=24, jitter=0.05, seed=3),
+    Workload("glissandi", notes_per_part=1000, gliss_density=0.4, seed=4),
+    Workload("tuplets", notes_per_part=2000, tuplet_density=0.8, max_divisor=8, seed=5),
+    Workload("mixed_meters", notes_per_part=2000, polyphony=2, time_signatures=["4/4", "3/4", "5/8", "7/8", "3+2/8"],
+             seed=6),
+    Workload("many_parts", num_parts=8, notes_per_part=400, polyphony=2, seed=7),
+    Workload("global_mode", notes_per_part=2000, polyphony=2, tuplet_density=0.3, quantization_mode="global", seed=8),
+]
+
+#: Smaller versions of the standard workloads, for a quick check
+quick_workloads = [workload.scaled(0.1) for workload in standard_workloads]
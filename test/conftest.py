@@ -0,0 +1,104 @@
+"""
+Fixtures shared between the tests.
+"""
+
+import random
+import pytest
+from scamp.performance import Performance, PerformancePart, PerformanceNote
+
+
+class RandomMusicFactory:
+    """
+    Makes random notes, parts and performances for tests, which come out the same every time for a given seed. All
+    three methods take the following keyword arguments:
+
+    :param in_sequence: if True, the notes follow one another (with the occasional rest in between); if False, they
+        start at random beats between 0 and 30, in no particular order
+    :param varied_values: if True, the notes mix int and float start beats, lengths, pitches and volumes, and include
+        tied lengths and chords (tuples of pitches); if False, lengths come from a handful of note values, pitches are
+        ints and the volume is always 0.7
+    :param length_jitter: lengths are scaled by a random factor within this fraction of 1, so that they don't fall
+        exactly on the beat grid
+    :param chord_probability: chance of each note being accompanied by another one with the same start beat, length,
+        volume and properties (i.e. one that should form a chord with it when quantized)
+    :param second_voice_probability: chance of each note being put in voice "2"
+    """
+
+    @staticmethod
+    def _notes(rng, num_notes, in_sequence=True, varied_values=False, length_jitter=0.0, chord_probability=0.0,
+               second_voice_probability=0.0):
+        notes = []
+        beat = 0
+        for _ in range(num_notes):
+            if varied_values:
+                length = rng.choice([1, 2, 0.5, 0.75, (1, 0.5)])
+                pitch = rng.randint(48, 84) if rng.random() < 0.6 else rng.uniform(48, 84) if rng.random() < 0.7 \
+                    else (rng.randint(48, 60), rng.randint(61, 72))
+                volume = rng.choice([0.5, 1])
+            else:
+                length = rng.choice([0.25, 0.5, 0.75, 1, 1.5, 2.5])
+                pitch = rng.randint(48, 84)
+                volume = 0.7
+            if length_jitter > 0 and not hasattr(length, "__len__"):
+                length *= rng.uniform(1 - length_jitter, 1 + length_jitter)
+
+            if in_sequence:
+                if rng.random() < 0.1:
+                    beat += rng.uniform(0.1, 1)
+                start_beat = beat
+                beat += sum(length) if hasattr(length, "__len__") else length
+            else:
+                start_beat = rng.randint(0, 30) if varied_values and rng.random() < 0.5 else rng.uniform(0, 30)
+
+            properties = {"voice": "2"} if rng.random() < second_voice_probability else {}
+            notes.append(PerformanceNote(start_beat, length, pitch, volume, properties))
+            if rng.random() < chord_probability:
+                notes.append(PerformanceNote(start_beat, length, rng.randint(48, 84), volume, dict(properties)))
+        return notes
+
+    def notes(self, seed, num_notes=40, **kwargs):
+        """
+        Returns a list of random PerformanceNotes.
+
+        :param seed: random seed
+        :param num_notes: number of notes to make (not counting those added to form chords)
+        """
+        return RandomMusicFactory._notes(random.Random(seed), num_notes, **kwargs)
+
+    @staticmethod
+    def _part(rng, name, num_notes, columnar=False, **kwargs):
+        part = PerformancePart(name=name, instrument_id=(name, 0))
+        for note in RandomMusicFactory._notes(rng, num_notes, **kwargs):
+            part.add_note(note)
+        return part.use_columnar_storage() if columnar else part
+
+    def part(self, seed, num_notes=200, name="Part", columnar=False, **kwargs):
+        """
+        Returns a PerformancePart containing random notes.
+
+        :param seed: random seed
+        :param num_notes: number of notes to make (not counting those added to form chords)
+        :param name: name of the part
+        :param columnar: whether to convert the part to columnar storage (which requires numpy)
+        """
+        return RandomMusicFactory._part(random.Random(seed), name, num_notes, columnar, **kwargs)
+
+    def performance(self, seed, num_parts=1, num_notes=100, **kwargs):
+        """
+        Returns a Performance of parts containing random notes.
+
+        :param seed: random seed
+        :param num_parts: number of parts, which are named "Part 1", "Part 2", etc.
+        :param num_notes: number of notes to make in each part (not counting those added to form chords)
+        """
+        rng = random.Random(seed)
+        return Performance([RandomMusicFactory._part(rng, "Part {}".format(i + 1), num_notes, **kwargs)
+                            for i in range(num_parts)])
+
+
+@pytest.fixture
+def random_music() -> RandomMusicFactory:
+    """
+    Factory for random (but seeded) notes, parts and performances; see :class:`RandomMusicFactory`.
+    """
+    return RandomMusicFactory()
@@ -0,0 +1,25 @@
+"""
+Regression example: a measure with nothing in it under an additive time signature (here 3+2/8) gets a bar rest.
+Generating that bar rest used to fail in Voice.to_music_xml and Voice._to_abjad, since the numerator of an additive
+time signature is a tuple.
+"""
+
+from scamp import *
+from scamp.performance import PerformanceNote
+
+flute = PerformancePart(name="Flute", instrument_id=("Flute", 0))
+for i, pitch in enumerate([67, 69, 71, 72, 74]):
+    flute.add_note(PerformanceNote(i * 0.5, 0.5, pitch, 0.5, {}))
+for i, pitch in enumerate([74, 72, 71, 69, 67]):
+    flute.add_note(PerformanceNote(5 + i * 0.5, 0.5, pitch, 0.5, {}))
+
+performance = Performance([flute])
+
+
+def test_results():
+    score = performance.to_score(time_signature="3+2/8")
+    return (
+        performance,
+        score,
+        format(score.to_abjad())
+    )
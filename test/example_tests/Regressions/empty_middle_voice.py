@@ -0,0 +1,25 @@
+"""
+Regression example: a part written in voices 1 and 3, but not voice 2, leaves an empty (None) voice slot in its
+measures. Exporting such a score used to fail in Measure.to_music_xml and Measure.non_empty_length
+(used by Score.length and to_lilypond).
+"""
+
+from scamp import *
+from scamp.performance import PerformanceNote
+
+violin = PerformancePart(name="Violin", instrument_id=("Violin", 0))
+for i, pitch in enumerate([72, 74, 76, 77, 79, 77, 76, 74]):
+    violin.add_note(PerformanceNote(i, 1, pitch, 0.5, {"voice": "1"}))
+for i, pitch in enumerate([60, 62, 64, 65]):
+    violin.add_note(PerformanceNote(2 * i, 2, pitch, 0.5, {"voice": "3"}))
+
+performance = Performance([violin])
+
+
+def test_results():
+    score = performance.to_score(time_signature="4/4")
+    return (
+        performance,
+        score,
+        score.length()
+    )
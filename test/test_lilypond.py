@@ -0,0 +1,126 @@
+"""
+Golden-file tests of the LilyPond output. The golden files in lilypond_golden were generated via abjad (the original
+route from a Score to LilyPond code), and the lightweight formatter in scamp._lilypond must reproduce them exactly.
+To regenerate them (with abjad installed), run this file as a script from the test directory.
+"""
+
+from scamp.performance import Performance, PerformancePart, PerformanceNote
+from scamp.score import render_lilypond
+from scamp._dependencies import abjad
+from scamp import _lilypond
+from expenvelope import Envelope
+import pytest
+import os
+
+
+golden_directory = os.path.join(os.path.dirname(__file__), "lilypond_golden")
+
+
+def _make_part(name, notes):
+    part = PerformancePart(name=name, instrument_id=(name, 0))
+    for start_beat, length, pitch in notes:
+        part.add_note(PerformanceNote(start_beat, length, pitch, 0.7, {}))
+    return part
+
+
+def _notes_case():
+    return _make_part("Flute", [(0, 1, 60), (1, 0.5, 62), (1.5, 0.5, 64), (2.5, 1.5, 65.5), (4, 2, 67), (6, 1, 71)])
+
+
+def _chords_case():
+    return _make_part("Piano", [(0, 1, (60, 64, 67)), (1, 1, (59, 62, 67)), (2, 2, (60, 63.5, 67, 72))])
+
+
+def _tuplets_case():
+    triplets = [(i / 3, 1 / 3, 60 + i) for i in range(6)]
+    quintuplets = [(2 + i / 5, 1 / 5, 70 - i) for i in range(5)]
+    return _make_part("Oboe", triplets + quintuplets + [(3, 0.5, 60), (3.5, 0.5, 62)])
+
+
+def _ties_case():
+    return _make_part("Cello", [(0, 1.25, 48), (1.25, 2.5, 50), (3.75, 1.75, 52), (5.5, 2.5, 53)])
+
+
+def _glissandi_case():
+    # a plain glissando (with an end grace note) and one that turns around (with an inner grace note)
+    return _make_part("Violin", [(0, 2, Envelope.from_levels([60, 67], length=2)),
+                                 (2, 2, Envelope.from_levels([67, 74, 64], length=2))])
+
+
+def _grace_chords_case():
+    # a chord that glisses, which gives grace chords
+    gliss_chord = (Envelope.from_levels([60, 65], length=2), Envelope.from_levels([64, 69], length=2))
+    return _make_part("Harp", [(0, 2, gliss_chord), (2, 2, (67, 71))])
+
+
+cases = {
+    "notes": _notes_case,
+    "chords": _chords_case,
+    "tuplets": _tuplets_case,
+    "ties": _ties_case,
+    "glissandi": _glissandi_case,
+    "grace_chords": _grace_chords_case,
+}
+
+
+def _make_score(case_name):
+    return Performance([cases[case_name]()]).to_score(time_signature="4/4", max_divisor=8, title=None, composer=None)
+
+
+def _golden_path(case_name):
+    return os.path.join(golden_directory, case_name + ".ly")
+
+
+def _read_golden(case_name):
+    with open(_golden_path(case_name), "r") as file:
+        return file.read()
+
+
+@pytest.mark.parametrize("case_name", sorted(cases))
+def test_direct_lilypond_matches_golden_file(case_name):
+    assert _make_score(case_name).to_lilypond() == _read_golden(case_name)
+
+
+def _require_abjad():
+    # checked lazily, so that collecting this module never imports abjad; a broken install (which can fail with
+    # something other than an ImportError) skips the test rather than erroring
+    try:
+        abjad_library = abjad()
+    except Exception as e:
+        pytest.skip("abjad could not be loaded: {}".format(e))
+    if abjad_library is None:
+        pytest.skip("abjad is not installed")
+
+
+@pytest.mark.parametrize("case_name", sorted(cases))
+def test_abjad_lilypond_matches_golden_file(case_name):
+    _require_abjad()
+    assert format(_make_score(case_name).to_abjad()) == _read_golden(case_name)
+
+
+def test_render_cache_evicts_old_entries_on_construction(tmp_path):
+    for i in range(5):
+        entry_directory = tmp_path / "entry{}{}".format(i, _lilypond._RenderCache.entry_suffix)
+        entry_directory.mkdir()
+        os.utime(str(entry_directory), (1000 + i, 1000 + i))
+    _lilypond._RenderCache(str(tmp_path), 2)
+    assert sorted(os.listdir(str(tmp_path))) == ["entry3.rendered", "entry4.rendered"]
+
+
+def test_parts_with_shared_names_render_to_separate_files(monkeypatch):
+    # (LilyPond itself isn't needed to check where everything would be written)
+    monkeypatch.setattr(_lilypond, "render_lilypond_files",
+                        lambda jobs, **kwargs: [[file_path] for _, file_path in jobs])
+    parts = [_make_part(name, [(0, 1, 60 + i)]) for i, name in enumerate(["Violin", "Violin", "Viola"])]
+    score = Performance(parts).to_score(time_signature="4/4", title=None, composer=None)
+    assert render_lilypond([score], ["Trio.pdf"], include_parts=True) == \
+        [["Trio.pdf", "Trio - Violin 1.pdf", "Trio - Violin 2.pdf", "Trio - Viola.pdf"]]
+
+
+if __name__ == '__main__':
+    assert abjad() is not None, "Abjad is required to generate the golden files."
+    os.makedirs(golden_directory, exist_ok=True)
+    for name in sorted(cases):
+        with open(_golden_path(name), "w") as golden_file:
+            golden_file.write(format(_make_score(name).to_abjad()))
+        print("Saved {}".format(_golden_path(name)))
@@ -0,0 +1,332 @@
+"""
+Tests of Performances and PerformanceParts, including columnar storage.
+"""
+
+import copy
+import functools
+import pytest
+from scamp import QuantizationScheme
+from scamp.performance import Performance, PerformancePart, PerformanceNote, ColumnarVoice, _ColumnarNoteIndex
+from scamp._dependencies import numpy
+from scamp import _performance_binary
+from expenvelope import Envelope
+
+
+# columnar storage is only available when the optional numpy dependency is installed
+requires_numpy = pytest.mark.skipif(numpy is None, reason="numpy is not installed")
+
+
+@pytest.fixture
+def make_notes(random_music):
+    # a mix of int and float start beats, lengths and pitches, in no particular order, with chords and tied lengths
+    return functools.partial(random_music.notes, in_sequence=False, varied_values=True)
+
+
+def _note_data(notes):
+    return [(note.start_beat, note.length, note.pitch, note.volume, type(note.start_beat), type(note.length),
+             type(note.pitch), type(note.volume)) for note in notes]
+
+
+@pytest.fixture
+def make_part(random_music):
+    return functools.partial(random_music.part, in_sequence=False, varied_values=True, second_voice_probability=1 / 3)
+
+
+# ---------------------------------------------- ColumnarVoice --------------------------------------------------
+
+
+@requires_numpy
+def test_columnar_voice_get_and_iterate_like_a_list(make_notes):
+    notes = make_notes(1)
+    voice = ColumnarVoice(notes)
+    assert len(voice) == len(notes)
+    assert _note_data(voice) == _note_data(notes)
+    assert _note_data([voice[i] for i in range(-len(notes), len(notes))]) == \
+        _note_data([notes[i] for i in range(-len(notes), len(notes))])
+    assert _note_data(voice[5:20:3]) == _note_data(notes[5:20:3])
+    for index in (len(notes), -len(notes) - 1):
+        with pytest.raises(IndexError):
+            voice[index]
+
+
+@requires_numpy
+def test_columnar_voice_set_like_a_list(make_notes):
+    notes = make_notes(2)
+    voice = ColumnarVoice(notes)
+    replacements = make_notes(3, 4)
+    for index, replacement in zip((0, 7, -1, -12), replacements):
+        voice[index] = replacement
+        notes[index] = replacement
+    assert _note_data(voice) == _note_data(notes)
+    # assigning a note from the voice itself to another position copies it
+    voice[1] = voice[2]
+    notes[1] = copy.copy(notes[2])
+    voice[2].pitch = 99
+    notes[2].pitch = 99
+    assert _note_data(voice) == _note_data(notes)
+    for index in (len(notes), -len(notes) - 1):
+        with pytest.raises(IndexError):
+            voice[index] = replacements[0]
+
+
+@requires_numpy
+def test_columnar_voice_delete_and_insert_like_a_list(make_notes):
+    notes = make_notes(4)
+    voice = ColumnarVoice(notes)
+    for index in (0, -1, 10, slice(3, 9, 2)):
+        del voice[index]
+        del notes[index]
+    assert _note_data(voice) == _note_data(notes)
+    for index, new_note in zip((0, 5, -3, len(notes) + 10, -len(notes) - 10), make_notes(5, 5)):
+        voice.insert(index, new_note)
+        notes.insert(index, new_note)
+    assert _note_data(voice) == _note_data(notes)
+    with pytest.raises(IndexError):
+        del voice[len(notes) + 1]
+
+
+@requires_numpy
+def test_columnar_voice_sort_like_a_list(make_notes):
+    notes = make_notes(6)
+    voice = ColumnarVoice(notes)
+    # notes obtained before sorting keep pointing to the same note
+    first_note = voice[0]
+    first_note_data = _note_data([first_note])
+    voice.sort()
+    notes.sort(key=lambda note: note.start_beat)
+    assert _note_data(voice) == _note_data(notes)
+    assert _note_data([first_note]) == first_note_data
+
+
+@requires_numpy
+def test_columnar_voice_preserves_ints_through_edits_and_selection():
+    voice = ColumnarVoice([PerformanceNote(1, 2, 60, 1, {}), PerformanceNote(1.5, 0.5, 60.5, 0.5, {})])
+    voice[1].pitch = 62
+    voice[0].length = 2.5
+    voice[0].start_beat = 3
+    assert _note_data(voice) == _note_data([PerformanceNote(3, 2.5, 60, 1, {}), PerformanceNote(1.5, 0.5, 62, 0.5, {})])
+    selected = voice.select([1])
+    assert _note_data(selected) == _note_data([voice[1]])
+
+
+@requires_numpy
+def test_columnar_voice_only_stores_properties_once_altered(make_notes):
+    voice = ColumnarVoice(make_notes(4, 4))
+    # reading (or copying) default properties doesn't store anything
+    assert voice[0].properties.noteheads == ["normal"] and voice[0].properties.temp.get("x") is None
+    copied_properties = copy.deepcopy(voice[1].properties)
+    copied_properties.articulations.append("staccato")
+    assert voice._properties == {}
+    # but altering them, even within one of their lists, does
+    voice[0].properties.articulations.append("accent")
+    voice[1].properties.temp["x"] = 3
+    voice[2].properties["voice"] = "2"
+    assert voice[0].properties.articulations == ["accent"]
+    assert voice[1].properties.temp["x"] == 3
+    assert voice[2].properties["voice"] == "2"
+    assert voice[3].properties == PerformanceNote(0, 1, 60, 1, {}).properties
+    assert sorted(voice._properties) == [0, 1, 2]
+
+
+@requires_numpy
+def test_columnar_part_queries_and_quantization_match_ordinary_part(make_part):
+    part, columnar_part = make_part(7), make_part(7, columnar=True)
+    assert str(part) == str(columnar_part)
+    assert part.end_beat == columnar_part.end_beat
+    assert _note_data(part.get_note_iterator(3, 20)) == _note_data(columnar_part.get_note_iterator(3, 20))
+    assert _note_data(part.get_note_iterator(3, 20, ["2"])) == _note_data(columnar_part.get_note_iterator(3, 20, ["2"]))
+    for beat in (0, 4.5, 11, 25.25):
+        assert _note_data(part.get_notes_sounding_at(beat)) == _note_data(columnar_part.get_notes_sounding_at(beat))
+    # the index of a columnar part doesn't hold on to a note object for every note
+    assert isinstance(columnar_part._get_note_index(), _ColumnarNoteIndex)
+    quantization_scheme = QuantizationScheme.from_time_signature("4/4", 8)
+    assert str(part.quantized(quantization_scheme)) == str(columnar_part.quantized(quantization_scheme))
+
+
+@requires_numpy
+def test_columnar_performance_iterator_matches_ordinary_performance(make_part):
+    performance = Performance([make_part(8), make_part(9)])
+    columnar_performance = Performance([make_part(8, columnar=True), make_part(9, columnar=True)])
+    assert _note_data(performance.get_note_iterator(2, 18)) == _note_data(columnar_performance.get_note_iterator(2, 18))
+
+
+@requires_numpy
+def test_columnar_binary_round_trip_preserves_ints(tmp_path, make_part):
+    performance = Performance([make_part(10)])
+    file_path = str(tmp_path / "performance.scampperf")
+    performance.save_to_binary(file_path)
+    loaded = Performance.load_from_binary(file_path, columnar=True)
+    for voice_name, voice in performance.parts[0].voices.items():
+        assert isinstance(loaded.parts[0].voices[voice_name], ColumnarVoice)
+        assert _note_data(loaded.parts[0].voices[voice_name]) == _note_data(voice)
+
+
+# ---------------------------------------------- Note indices --------------------------------------------------
+
+
+def _sorted_notes(part):
+    # what the note index is standing in for: a stable sort of all the voices, one after another
+    return sorted((note for voice in part.voices.values() for note in voice), key=lambda note: note.start_beat)
+
+
+def _edit_notes_in_place(part):
+    # alter notes in all the ways that move or resize them, without going through the part
+    notes = [note for voice in part.voices.values() for note in voice]
+    notes[0].start_beat += 40
+    notes[1].length = 25
+    notes[2].end_beat = notes[2].start_beat + 0.125
+    notes[3].split_at_beat(notes[3].start_beat + 0.25)
+    notes[-1].start_beat = 0.5
+
+
+@pytest.mark.parametrize("columnar", [False, pytest.param(True, marks=requires_numpy)])
+def test_note_index_follows_in_place_edits(columnar, make_part):
+    part = make_part(11, columnar=columnar)
+    # build the index before editing
+    assert part.end_beat == max(note.end_beat for note in _sorted_notes(part))
+    assert _note_data(part.get_note_iterator(2, 12)) == \
+        _note_data([note for note in _sorted_notes(part) if 2 <= note.start_beat < 12])
+
+    _edit_notes_in_place(part)
+    sorted_notes = _sorted_notes(part)
+    assert part.end_beat == max(note.end_beat for note in sorted_notes)
+    assert _note_data(part.get_note_iterator()) == _note_data(sorted_notes)
+    assert _note_data(part.get_note_iterator(2, 12)) == \
+        _note_data([note for note in sorted_notes if 2 <= note.start_beat < 12])
+    for beat in (0.5, 3.3, 17, 41):
+        assert _note_data(part.get_notes_sounding_at(beat)) == \
+            _note_data([note for note in sorted_notes if note.start_beat <= beat < note.end_beat])
+
+
+@pytest.mark.parametrize("columnar", [False, pytest.param(True, marks=requires_numpy)])
+def test_note_index_ignores_edits_to_other_notes(columnar, make_part):
+    part = make_part(14, columnar=columnar)
+    note_index = part._get_note_index()
+    # quantizing a copy of the part, or editing copies of its notes or notes in another part, doesn't touch this part
+    part.quantized(QuantizationScheme.from_time_signature("4/4", 8))
+    _edit_notes_in_place(make_part(15, columnar=columnar))
+    copied_note = copy.deepcopy(next(part.get_note_iterator()))
+    copied_note.start_beat += 1
+    assert part._get_note_index() is note_index
+    # whereas the copy of the part has an index of its own, which follows edits to its own notes
+    copied_part = copy.deepcopy(part)
+    assert copied_part.end_beat == part.end_beat
+    _edit_notes_in_place(copied_part)
+    assert copied_part.end_beat == max(note.end_beat for note in _sorted_notes(copied_part))
+    assert part._get_note_index() is note_index
+
+
+@pytest.mark.parametrize("columnar", [False, pytest.param(True, marks=requires_numpy)])
+def test_performance_note_ordering_follows_in_place_edits(columnar, make_part):
+    performance = Performance([make_part(12, columnar=columnar), make_part(13, columnar=columnar)])
+    # build the merged ordering before editing
+    list(performance.get_note_iterator())
+
+    for part in performance.parts:
+        _edit_notes_in_place(part)
+    # what the ordering is standing in for: a stable sort by start beat, taking parts in order when notes start together
+    sorted_notes = [note for part in performance.parts for note in _sorted_notes(part)]
+    sorted_notes.sort(key=lambda note: note.start_beat)
+    assert _note_data(performance.get_note_iterator()) == _note_data(sorted_notes)
+    assert _note_data(performance.get_note_iterator(2, 12, ["2"])) == _note_data(
+        [note for note in sorted_notes if 2 <= note.start_beat < 12 and note.properties.get("voice") == "2"])
+
+
+@pytest.mark.parametrize("columnar", [False, pytest.param(True, marks=requires_numpy)])
+def test_note_filter_that_moves_notes_keeps_queries_up_to_date(columnar, make_part):
+    performance = Performance([make_part(16, columnar=columnar)])
+    list(performance.get_note_iterator())
+
+    def _shift_and_shorten(note):
+        note.start_beat = 60 - note.start_beat
+        note.length = 0.25
+
+    performance.apply_note_filter(_shift_and_shorten, 0, 10)
+    sorted_notes = _sorted_notes(performance.parts[0])
+    assert _note_data(performance.get_note_iterator()) == _note_data(sorted_notes)
+    assert performance.end_beat == max(note.end_beat for note in sorted_notes)
+
+
+# ---------------------------------------------- Binary files --------------------------------------------------
+
+
+def _make_binary_test_performance():
+    # a part with envelopes, chords, rests, tied lengths and non-default properties, and a part with an unsorted voice
+    first_part = PerformancePart(name="Flute", instrument_id=("Flute", 0))
+    for note in (
+        PerformanceNote(0, 1, Envelope.from_levels_and_durations([60, 62], [1]), 0.5, {}),
+        PerformanceNote(1, (0.5, 0.25), (60, 64), Envelope.from_levels_and_durations([0.2, 0.8], [1]),
+                        {"articulations": ["staccato"], "noteheads": ["x", "diamond"]}),
+        PerformanceNote(2, 1, None, 0, {}),
+        PerformanceNote(3, 2.5, 61.5, 1, "accent, param_brightness: 0.5"),
+        PerformanceNote(5.5, 1, 72, 0.75, {"voice": "2"}),
+    ):
+        first_part.add_note(note)
+    second_part = PerformancePart(name="Oboe", instrument_id=("Oboe", 0), voices={"1": [
+        PerformanceNote(4, 1, 67, 1, {}), PerformanceNote(1, 1, 65, 1, {}), PerformanceNote(2.5, 0.5, 64, 1, {})
+    ]})
+    return Performance([first_part, second_part])
+
+
+def _voice_contents(part):
+    return {voice_name: [(note.start_beat, note.length, note.pitch, note.volume, note.properties) for note in voice]
+            for voice_name, voice in part.voices.items() if len(voice) > 0}
+
+
+def test_binary_round_trip(tmp_path):
+    performance = _make_binary_test_performance()
+    file_path = str(tmp_path / "performance.scampperf")
+    performance.save_to_binary(file_path)
+    loaded = Performance.load_from_binary(file_path)
+    assert [part.name for part in loaded.parts] == ["Flute", "Oboe"]
+    for part, loaded_part in zip(performance.parts, loaded.parts):
+        assert _voice_contents(loaded_part) == _voice_contents(part)
+    assert _note_data(loaded.parts[0].voices["_unspecified_"]) == \
+        _note_data(performance.parts[0].voices["_unspecified_"])
+
+
+def test_binary_loading_selects_parts_by_index_or_name(tmp_path):
+    performance = _make_binary_test_performance()
+    file_path = str(tmp_path / "performance.scampperf")
+    performance.save_to_binary(file_path)
+    for parts in ([1], ["Oboe"]):
+        loaded = Performance.load_from_binary(file_path, parts=parts)
+        assert [part.name for part in loaded.parts] == ["Oboe"]
+        assert _voice_contents(loaded.parts[0]) == _voice_contents(performance.parts[1])
+    assert [part.name for part in Performance.load_from_binary(file_path, parts=[0, "Oboe"]).parts] == ["Flute", "Oboe"]
+
+
+def test_binary_loading_a_range_of_beats(tmp_path):
+    performance = _make_binary_test_performance()
+    file_path = str(tmp_path / "performance.scampperf")
+    performance.save_to_binary(file_path)
+    for start_beat, stop_beat in ((1, 4), (None, 2.5), (2.5, None), (6, 10)):
+        def _in_range(note_contents):
+            return (start_beat is None or note_contents[0] >= start_beat) and \
+                (stop_beat is None or note_contents[0] < stop_beat)
+
+        loaded = Performance.load_from_binary(file_path, start_beat=start_beat, stop_beat=stop_beat)
+        # (the Oboe's voice is unsorted, so it is read by checking every note rather than by bisecting)
+        for part, loaded_part in zip(performance.parts, loaded.parts):
+            expected_contents = {voice_name: [note_contents for note_contents in voice_contents
+                                              if _in_range(note_contents)]
+                                 for voice_name, voice_contents in _voice_contents(part).items()}
+            assert _voice_contents(loaded_part) == {voice_name: voice_contents for voice_name, voice_contents
+                                                    in expected_contents.items() if len(voice_contents) > 0}
+
+
+def test_binary_loading_rejects_other_files(tmp_path, monkeypatch):
+    not_a_performance = tmp_path / "not_a_performance.scampperf"
+    not_a_performance.write_bytes(b"SCAMPPRX" + bytes(64))
+    empty_file = tmp_path / "empty.scampperf"
+    empty_file.write_bytes(b"")
+    for file_path in (not_a_performance, empty_file):
+        with pytest.raises(ValueError, match="not a SCAMP binary performance file"):
+            Performance.load_from_binary(str(file_path))
+
+    newer_file_path = str(tmp_path / "newer.scampperf")
+    with monkeypatch.context() as patch:
+        patch.setattr(_performance_binary, "FORMAT_VERSION", _performance_binary.FORMAT_VERSION + 1)
+        _make_binary_test_performance().save_to_binary(newer_file_path)
+    with pytest.raises(ValueError, match="newer version of the format"):
+        Performance.load_from_binary(newer_file_path)
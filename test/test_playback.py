@@ -0,0 +1,134 @@
+"""
+Tests of the PlaybackEngine used by Performance.play, run on a stand-in clock (which just keeps count of the beats
+waited) with a stand-in instrument that records when each note is started, split and ended.
+"""
+
+import pytest
+from clockblocks.clock import ClockKilledError
+from scamp.instruments import ScampInstrument
+from scamp.performance import PerformanceNote
+from scamp.playback_adjustments import NotePlaybackAdjustment
+from scamp._performance_playback import PlaybackEngine
+
+
+class _RecordingClock:
+
+    def __init__(self, kill_at_beat=None, fast_forwarding=False):
+        self.beat = 0
+        self.kill_at_beat = kill_at_beat
+        self.fast_forwarding = fast_forwarding
+
+    def wait(self, beats):
+        if self.kill_at_beat is not None and self.beat + beats > self.kill_at_beat:
+            self.beat = self.kill_at_beat
+            raise ClockKilledError()
+        self.beat += beats
+
+    def is_fast_forwarding(self):
+        return self.fast_forwarding
+
+
+class _RecordingNoteHandle:
+
+    def __init__(self, instrument, note_id):
+        self.instrument = instrument
+        self.note_id = note_id
+
+    def split(self):
+        self.instrument.events.append(("split", self.instrument.clock.beat, self.note_id))
+
+    def end(self):
+        self.instrument.events.append(("end", self.instrument.clock.beat, self.note_id))
+
+
+class _RecordingInstrument:
+
+    default_spelling_policy = None
+    ensemble = None
+    _standardize_properties = ScampInstrument._standardize_properties
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.events = []
+        self.started_notes = []
+
+    def start_note(self, pitch, volume, properties, clock=None, flags=None, max_volume=1):
+        note_id = len(self.started_notes)
+        self.started_notes.append((pitch, volume, list(properties.noteheads), flags))
+        self.events.append(("start", self.clock.beat, note_id))
+        return _RecordingNoteHandle(self, note_id)
+
+
+def _play(notes_by_instrument, clock=None, **engine_kwargs):
+    clock = clock or _RecordingClock()
+    instruments = [_RecordingInstrument(clock) for _ in notes_by_instrument]
+    engine = PlaybackEngine([(iter(notes), instrument) for notes, instrument in zip(notes_by_instrument, instruments)],
+                            **engine_kwargs)
+    engine.run(clock)
+    return instruments
+
+
+def test_notes_end_before_others_start_on_the_same_beat():
+    instrument, = _play([[PerformanceNote(0, 1, 60, 0.5, {}), PerformanceNote(1, 1, 62, 0.5, {}),
+                          PerformanceNote(1.5, 0.5, 64, 0.5, {})]])
+    assert instrument.events == [("start", 0, 0), ("end", 1, 0), ("start", 1, 1), ("start", 1.5, 2),
+                                 ("end", 2, 1), ("end", 2, 2)]
+
+
+def test_notes_from_several_sources_are_merged_in_time_order():
+    first, second = _play([[PerformanceNote(0, 2, 60, 0.5, {})], [PerformanceNote(0.5, 0.5, 72, 0.5, {})]])
+    assert first.events == [("start", 0, 0), ("end", 2, 0)]
+    assert second.events == [("start", 0.5, 0), ("end", 1, 0)]
+
+
+def test_tied_segments_are_split_at_the_end_of_each_segment():
+    instrument, = _play([[PerformanceNote(1, (1, 0.5, 2), 60, 0.5, {})]], start_beat=1)
+    assert instrument.events == [("start", 0, 0), ("split", 1, 0), ("split", 1.5, 0), ("split", 3.5, 0),
+                                 ("end", 3.5, 0)]
+
+
+def test_chords_give_each_pitch_its_own_notehead():
+    instrument, = _play([[PerformanceNote(0, 1, (60, 64, 67), 0.5, {"noteheads": ["normal", "x", "diamond"]}),
+                          PerformanceNote(1, 1, (62, 65), 0.5, {"notehead": "x"})]])
+    assert [(pitch, noteheads) for pitch, _, noteheads, _ in instrument.started_notes] == \
+        [(60, ["normal"]), (64, ["x"]), (67, ["diamond"]), (62, ["x"]), (65, ["x"])]
+    assert instrument.events[:3] == [("start", 0, 0), ("start", 0, 1), ("start", 0, 2)]
+    with pytest.raises(ValueError):
+        _play([[PerformanceNote(0, 1, (60, 64, 67), 0.5, {"noteheads": ["normal", "x"]})]])
+
+
+def test_playback_adjustments_play_the_adjusted_note_and_transcribe_the_original():
+    adjustment = NotePlaybackAdjustment.scale_params(length=0.5)
+    instrument, = _play([[PerformanceNote(0, 2, 60, 0.5, {"playback_adjustments": [adjustment]})]])
+    assert [flags for _, _, _, flags in instrument.started_notes] == [["no_transcribe", "fixed"], ["silent", "fixed"]]
+    assert sorted(instrument.events) == [("end", 1, 0), ("end", 2, 1), ("start", 0, 0), ("start", 0, 1)]
+    # when fast-forwarding, only the (silent) original is played
+    instrument, = _play([[PerformanceNote(0, 2, 60, 0.5, {"playback_adjustments": [adjustment]})]],
+                        clock=_RecordingClock(fast_forwarding=True))
+    assert [flags for _, _, _, flags in instrument.started_notes] == [["silent", "fixed"]]
+
+
+def test_note_filter_is_applied_to_each_note_just_before_it_is_played():
+    filtered_notes = []
+
+    def _transpose_and_lengthen(note):
+        filtered_notes.append(note)
+        return PerformanceNote(note.start_beat, note.length * 2, note.pitch + 12, note.volume, note.properties)
+
+    notes = [PerformanceNote(0, 1, 60, 0.5, {}), PerformanceNote(3, 1, 62, 0.5, {})]
+    instrument, = _play([notes], note_filter=_transpose_and_lengthen)
+    assert len(filtered_notes) == 2 and all(a is b for a, b in zip(filtered_notes, notes))
+    assert [pitch for pitch, _, _, _ in instrument.started_notes] == [72, 74]
+    assert instrument.events == [("start", 0, 0), ("end", 2, 0), ("start", 3, 1), ("end", 5, 1)]
+
+
+def test_sounding_notes_are_ended_when_the_clock_is_killed():
+    notes = [PerformanceNote(0, 4, 60, 0.5, {}), PerformanceNote(1, 1, 62, 0.5, {}),
+             PerformanceNote(2, (1, 2), 64, 0.5, {}), PerformanceNote(5, 1, 65, 0.5, {})]
+    clock = _RecordingClock(kill_at_beat=2.5)
+    instrument = _RecordingInstrument(clock)
+    with pytest.raises(ClockKilledError):
+        PlaybackEngine([(iter(notes), instrument)]).run(clock)
+    # the notes still sounding (the first and third) are ended, and nothing else happens
+    assert instrument.events[:4] == [("start", 0, 0), ("start", 1, 1), ("end", 2, 1), ("start", 2, 2)]
+    assert sorted(instrument.events[4:]) == [("end", 2.5, 0), ("end", 2.5, 2)]
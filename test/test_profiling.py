@@ -0,0 +1,99 @@
+"""
+Tests of the profiling of the notation pipeline (see :mod:`scamp.profiling`).
+"""
+
+from scamp import profiling
+from scamp.profiling import _profiled_stage
+from scamp.performance import Performance, PerformancePart, PerformanceNote
+
+
+@_profiled_stage("outer stage", lambda notes: len(notes))
+def _outer_stage(notes):
+    # calls itself once and another function of the same stage, neither of which should be recorded separately
+    if len(notes) > 1:
+        _outer_stage(notes[:1])
+    _also_outer_stage(notes)
+    return _inner_stage(notes)
+
+
+@_profiled_stage("outer stage")
+def _also_outer_stage(notes):
+    return notes
+
+
+@_profiled_stage("inner stage", lambda notes: 2 * len(notes))
+def _inner_stage(notes):
+    return len(notes)
+
+
+def test_profiling_restores_the_previous_session():
+    assert not profiling.is_profiling()
+    outer_report = profiling.start_profiling()
+    try:
+        with profiling.profiling() as inner_report:
+            _outer_stage([1, 2, 3])
+        assert profiling.is_profiling() and profiling._active_profiler.report is outer_report
+        _inner_stage([1])
+    finally:
+        assert profiling.stop_profiling() is outer_report
+    assert not profiling.is_profiling()
+    assert sorted(inner_report.stages) == ["inner stage", "outer stage"]
+    assert list(outer_report.stages) == ["inner stage"]
+    with profiling.profiling():
+        pass
+    assert not profiling.is_profiling()
+
+
+def test_reentrant_stages_are_recorded_once_with_note_counts():
+    with profiling.profiling() as report:
+        assert _outer_stage([1, 2, 3]) == 3
+        _outer_stage([1, 2])
+        _also_outer_stage([1])
+    assert report.stages["outer stage"].calls == 3
+    # (the number of notes is only counted for the calls that were recorded, and only by those that can count them)
+    assert report.stages["outer stage"].num_notes == 5
+    # (the inner stage is recorded within the nested call of the outer stage as well)
+    assert report.stages["inner stage"].calls == 4
+    assert report.stages["inner stage"].num_notes == 14
+    assert report.stages["outer stage"].total_time >= report.stages["inner stage"].total_time
+    # nothing is recorded once profiling is off
+    _outer_stage([1])
+    assert report.stages["outer stage"].calls == 3
+
+
+def test_callback_receives_each_recorded_call():
+    calls = []
+    with profiling.profiling(lambda *args: calls.append(args)) as report:
+        _outer_stage([1, 2, 3])
+    assert [(stage_name, num_notes) for stage_name, _, num_notes in calls] == \
+        [("inner stage", 2), ("inner stage", 6), ("outer stage", 3)]
+    assert all(isinstance(duration, float) and duration >= 0 for _, duration, _ in calls)
+    assert report.stages["outer stage"].total_time == calls[2][1]
+
+
+def test_report_to_dict_and_str():
+    report = profiling.ProfilingReport()
+    assert str(report) == "ProfilingReport(no stages recorded)"
+    report.record("quantization", 0.5, 10)
+    report.record("quantization", 1.5, 30)
+    report.record("music xml export", 0.25)
+    assert report.to_dict() == {
+        "quantization": {"calls": 2, "total_time": 2.0, "mean_time": 1.0, "num_notes": 40},
+        "music xml export": {"calls": 1, "total_time": 0.25, "mean_time": 0.25, "num_notes": None}
+    }
+    lines = str(report).split("\n")
+    assert lines[0].split() == ["stage", "calls", "total", "(s)", "mean", "(s)", "notes"]
+    assert lines[1].split() == ["quantization", "2", "2.000000", "1.000000", "40"]
+    assert lines[2].split() == ["music", "xml", "export", "1", "0.250000", "0.250000", "-"]
+    report.clear()
+    assert report.to_dict() == {}
+
+
+def test_pipeline_stages_are_recorded():
+    part = PerformancePart(name="Piano", instrument_id=("Piano", 0))
+    for i in range(12):
+        part.add_note(PerformanceNote(i * 0.5, 0.5, 60 + i, 0.5, {}))
+    with profiling.profiling() as report:
+        Performance([part]).to_score(time_signature="4/4", title=None, composer=None)
+    assert report.stages["quantization"].calls >= 1
+    assert report.stages["quantization"].num_notes == 12
@@ -0,0 +1,128 @@
+"""
+Tests of the quantization of performances: the quantization cache and quantizing in worker processes should both give
+exactly the same result as quantizing from scratch, with the parts holding on to the same note objects.
+"""
+
+import random
+import copy
+import functools
+import pytest
+from scamp import QuantizationScheme
+from scamp.performance import PerformanceNote
+from scamp.quantization import clear_quantization_cache, MeasureQuantizationScheme, TimeSignature, \
+    IncrementalQuantizer, _collapse_chords, _separate_into_non_overlapping_voices
+
+
+@pytest.fixture
+def make_performance(random_music):
+    # two parts of notes whose lengths are slightly off the beat grid, including chords and a second voice
+    return functools.partial(random_music.performance, num_parts=2, num_notes=80, length_jitter=0.1,
+                             chord_probability=0.2, second_voice_probability=0.5)
+
+
+def _get_notes(performance):
+    return [note for part in performance.parts for voice in part.voices.values() for note in voice]
+
+
+def test_cache_hit_matches_miss(make_performance):
+    quantization_scheme = QuantizationScheme.from_time_signature("4/4", 8)
+    clear_quantization_cache()
+
+    missed = make_performance(1)
+    missed_notes = _get_notes(missed)
+    missed.quantize(quantization_scheme)
+
+    hit = make_performance(1)
+    hit_notes = _get_notes(hit)
+    hit.quantize(quantization_scheme)
+
+    assert str(hit) == str(missed)
+    # on the cache hit, the part holds on to its own notes, quantized in place, just as on a miss (notes that were
+    # merged into chords are the only ones to drop out)
+    hit_note_ids, missed_note_ids = set(map(id, _get_notes(hit))), set(map(id, _get_notes(missed)))
+    assert hit_note_ids <= set(map(id, hit_notes))
+    assert [id(note) in hit_note_ids for note in hit_notes] == [id(note) in missed_note_ids for note in missed_notes]
+    assert [(note.start_beat, note.length, note.pitch) for note in hit_notes if id(note) in hit_note_ids] == \
+        [(note.start_beat, note.length, note.pitch) for note in missed_notes if id(note) in missed_note_ids]
+
+
+def test_quantized_copy_leaves_original_untouched(make_performance):
+    quantization_scheme = QuantizationScheme.from_time_signature("3/4", 6)
+    clear_quantization_cache()
+    original = make_performance(2)
+    original_string = str(original)
+    first_copy = original.quantized(quantization_scheme)
+    second_copy = original.quantized(quantization_scheme)
+    assert str(original) == original_string
+    assert str(first_copy) == str(second_copy)
+    assert not set(map(id, _get_notes(first_copy))) & set(map(id, _get_notes(second_copy)))
+
+
+def test_worker_processes_match_in_place_quantization(make_performance):
+    quantization_scheme = QuantizationScheme.from_time_signature("4/4", 8)
+    clear_quantization_cache()
+    in_place = make_performance(3)
+    in_place.quantize(quantization_scheme)
+
+    clear_quantization_cache()
+    parallel = make_performance(3)
+    parallel_note_ids = set(map(id, _get_notes(parallel)))
+    parallel.quantize(quantization_scheme, workers=2)
+
+    assert str(parallel) == str(in_place)
+    assert set(map(id, _get_notes(parallel))) <= parallel_note_ids
+
+
+def test_beat_grid_follows_replaced_measure_schemes():
+    quantization_scheme = QuantizationScheme.from_time_signature("4/4", 8)
+    assert list(quantization_scheme.get_beat_grid(8).lengths) == [1.0] * 9
+    for time_signature in ("3/8", "6/8", "2/4"):
+        # replacing the measure schemes (whose ids may well be reused once the old ones are collected) must not leave
+        # a stale grid behind
+        quantization_scheme.measure_schemes = QuantizationScheme.from_time_signature(time_signature, 8).measure_schemes
+        expected = QuantizationScheme.from_time_signature(time_signature, 8).get_beat_grid(8)
+        assert list(quantization_scheme.get_beat_grid(8).start_beats) == list(expected.start_beats)
+        assert list(quantization_scheme.get_beat_grid(8).lengths) == list(expected.lengths)
+
+
+def test_interned_measure_schemes_are_read_only_and_do_not_share_the_callers_time_signature():
+    time_signature = TimeSignature(3, 4)
+    measure_scheme = MeasureQuantizationScheme.from_time_signature(time_signature, 8)
+    assert MeasureQuantizationScheme.from_time_signature("3/4", 8) is measure_scheme
+    # the caller's time signature can still be altered, without affecting the shared scheme
+    time_signature.numerator = 5
+    assert measure_scheme.time_signature.as_string() == "3/4"
+    for shared_object in (measure_scheme, measure_scheme.time_signature, measure_scheme.beat_schemes[0]):
+        with pytest.raises(AttributeError):
+            shared_object.length = 2
+    assert isinstance(measure_scheme.beat_schemes, tuple)
+    assert isinstance(measure_scheme.time_signature.beat_lengths, tuple)
+    # copies are free to be altered
+    copied_scheme = copy.deepcopy(measure_scheme)
+    copied_scheme.time_signature.numerator = 6
+    assert measure_scheme.time_signature.numerator == 3
+
+
+def test_incremental_previews_match_quantizing_the_finished_notes_from_scratch():
+    quantization_scheme = QuantizationScheme.from_time_signature("4/4", 8)
+    quantizer = IncrementalQuantizer(quantization_scheme)
+    voice_quantizer = None
+    rng = random.Random(3)
+    beat = 0
+    for step in range(60):
+        length = rng.choice([0.25, 0.5, 1, 1.5, 7]) * rng.uniform(0.9, 1.1)
+        for _ in range(rng.choice([1, 1, 2, 3])):
+            # (notes added together form a chord, unless their lengths get quantized differently)
+            quantizer.add_note("voice", PerformanceNote(beat, length, rng.randint(48, 84), 0.7, {}))
+        voice_quantizer = voice_quantizer or quantizer._voices["voice"]
+        beat += rng.choice([0, 0.25, 0.5, 0.75])
+        if step % 3 == 0:
+            quantizer.finalize_up_to(beat - 0.5)
+            expected_voice = copy.deepcopy([note for note in voice_quantizer.notes
+                                            if id(note) in voice_quantizer._quantized_note_ids])
+            _collapse_chords(expected_voice)
+            voices, _ = quantizer.get_quantized_voice("voice")
+            assert str(voices) == str(_separate_into_non_overlapping_voices(expected_voice))
+            # the preview holds copies, not the notes being quantized
+            assert not any(id(note) in voice_quantizer._quantized_note_ids for voice in voices for note in voice)
+    assert voice_quantizer._num_settled_notes > 0
@@ -0,0 +1,41 @@
+"""
+Tests of Score construction from quantized performances.
+"""
+
+import functools
+import pytest
+from scamp import engraving_settings, QuantizationScheme
+from scamp.score import Score, clear_measure_cache
+
+
+@pytest.fixture
+def make_performance(random_music):
+    # a single part, with some of the notes in a second voice
+    return functools.partial(random_music.performance, num_notes=120, second_voice_probability=0.15)
+
+
+def _build_without_cache(quantized_performance):
+    old_max_entries = engraving_settings.measure_cache_max_entries
+    engraving_settings.measure_cache_max_entries = 0
+    try:
+        return Score.from_quantized_performance(quantized_performance, title=None, composer=None)
+    finally:
+        engraving_settings.measure_cache_max_entries = old_max_entries
+
+
+def test_cached_rebuild_after_edit_matches_uncached_build(make_performance):
+    clear_measure_cache()
+    quantized_performance = make_performance(4).quantized(QuantizationScheme.from_time_signature("4/4", 8))
+    first_build = Score.from_quantized_performance(quantized_performance, title=None, composer=None)
+    assert str(first_build) == str(_build_without_cache(quantized_performance))
+
+    # change a single note, and build again: all the other measures now come out of the cache
+    edited_note = quantized_performance.parts[0].voices["_unspecified_"][40]
+    edited_note.pitch += 1
+    cached_build = Score.from_quantized_performance(quantized_performance, title=None, composer=None)
+    uncached_build = _build_without_cache(quantized_performance)
+
+    assert str(cached_build) != str(first_build)
+    assert str(cached_build) == str(uncached_build)
+    assert cached_build.to_lilypond() == uncached_build.to_lilypond()
+    assert cached_build.to_music_xml().to_xml() == uncached_build.to_music_xml().to_xml()
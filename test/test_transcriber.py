@@ -0,0 +1,57 @@
+"""
+Tests of live quantization during transcription (see :func:`scamp.transcriber.Transcriber.start_transcribing`).
+"""
+
+import gc
+import random
+from scamp import Session, QuantizationScheme, wait
+
+
+def _play_random_notes(session, parts, num_notes, seed):
+    for i, part in enumerate(parts):
+        def play_part(part=part, rng=random.Random(seed * 100 + i)):
+            for _ in range(num_notes):
+                if rng.random() < 0.2:
+                    wait(rng.choice([0.25, 0.5, 1 / 3]))
+                part.play_note(rng.randint(48, 84), 0.5, rng.choice([0.25, 0.5, 0.75, 1, 1 / 3, 2 / 3, 1.5]))
+        session.fork(play_part)
+    session.wait_for_children_to_finish()
+
+
+def test_live_quantization_matches_batch_quantization():
+    session = Session()
+    session.fast_forward_in_beats(float("inf"))
+    parts = [session.new_silent_part("piano"), session.new_silent_part("violin")]
+    quantization_scheme = QuantizationScheme.from_time_signature("3/4", 8)
+
+    performance = session.start_transcribing(quantization_scheme=quantization_scheme)
+    _play_random_notes(session, parts, 60, seed=5)
+    session.stop_transcribing()
+
+    live_quantized = session.get_live_quantized_performance()
+    batch_quantized = performance.quantized(quantization_scheme)
+    assert str(live_quantized) == str(batch_quantized)
+    assert live_quantized.to_score().to_lilypond() == batch_quantized.to_score().to_lilypond()
+
+
+def test_finished_live_quantizations_are_released():
+    session = Session()
+    session.fast_forward_in_beats(float("inf"))
+    parts = [session.new_silent_part("piano")]
+    quantization_scheme = QuantizationScheme.from_time_signature("4/4", 4)
+
+    kept_performance = None
+    for i in range(5):
+        performance = session.start_transcribing(quantization_scheme=quantization_scheme)
+        _play_random_notes(session, parts, 10, seed=i)
+        session.stop_transcribing()
+        if i == 1:
+            kept_performance = performance
+    del performance
+    gc.collect()
+
+    # only the most recently stopped transcription and the one we held on to are kept
+    assert len(session._finished_live_quantizers) == 2
+    assert str(session.get_live_quantized_performance(kept_performance)) == \
+        str(kept_performance.quantized(quantization_scheme))
+    assert session.get_live_quantized_performance() is not None
@@ -0,0 +1,34 @@
+"""
+Tests of the general-purpose utilities.
+"""
+
+from scamp.utilities import LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "a" is now more recently used than "b"
+    cache.put("c", 3)
+    assert "b" not in cache and cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.get("b", "missing") == "missing"
+
+
+def test_lru_cache_follows_callable_max_size():
+    max_size = [3]
+    cache = LRUCache(lambda: max_size[0])
+    for i in range(5):
+        cache.put(i, i)
+    assert len(cache) == 3
+    max_size[0] = 0
+    cache.put("x", "x")
+    assert len(cache) == 0
+
+
+def test_lru_cache_get_or_create_only_creates_once():
+    cache = LRUCache(4)
+    calls = []
+    assert cache.get_or_create("key", lambda: calls.append(1) or "value") == "value"
+    assert cache.get_or_create("key", lambda: calls.append(1) or "other value") == "value"
+    assert len(calls) == 1